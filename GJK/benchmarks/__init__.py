@@ -0,0 +1,5 @@
+"""
+Benchmarks for the GJK package.
+
+Run from the `GJK` directory, e.g. `python -m benchmarks.spatial_hash`.
+"""
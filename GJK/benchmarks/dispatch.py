@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Speedup of the closed-form tests of `gjk.dispatch.collide` over `GJK`.
+
+The scenes are random spheres, axis-aligned cuboids and circles, mostly spheres, queried on random
+pairs. Each pair type is timed separately, then the whole scene.
+
+Usage: python -m benchmarks.dispatch [--pairs N] [--spheres FRACTION] [--seed S]
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from gjk.dispatch import collide
+from gjk.geometry_shapes import Circle, Cuboid, Point, Sphere
+from gjk.GJK_algo import GJK
+
+
+def scene_pairs(count, spheres, seed, shapes=1000, spread=20):
+    rng = random.Random(seed)
+    def center():
+        return Point(rng.uniform(-spread, spread), rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+    def shape():
+        draw = rng.random()
+        if draw < spheres:
+            return Sphere(radius=rng.uniform(0.5, 4), center=center())
+        elif draw < spheres + (1 - spheres)*0.8:
+            return Cuboid(height=rng.uniform(0.5, 6), width=rng.uniform(0.5, 6), depth=rng.uniform(0.5, 6), center=center())
+        return Circle(radius=rng.uniform(0.5, 4), normal=center(), center=center())
+    scene = [shape() for _ in range(shapes)]
+    return [(rng.choice(scene), rng.choice(scene)) for _ in range(count)]
+
+def timed(test, pairs):
+    start = time.perf_counter()
+    for shape1, shape2 in pairs:
+        test(shape1, shape2)
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=100000, help="Number of pairs (default: 100000)")
+    parser.add_argument("--spheres", type=float, default=0.8, help="Fraction of spheres in the scene (default: 0.8)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = scene_pairs(args.pairs, args.spheres, args.seed)
+    groups = defaultdict(list)
+    for pair in pairs:
+        groups["-".join(sorted(type(shape).__name__ for shape in pair))].append(pair)
+
+    mismatches = sum(GJK(*pair) != collide(*pair) for pair in pairs)
+    print(f"{'pairs':<20}{'count':>8}{'GJK (us)':>12}{'dispatch (us)':>15}{'speedup':>10}")
+    for name, group in sorted(groups.items()) + [("scene", pairs)]:
+        gjk_time, dispatch_time = timed(GJK, group), timed(collide, group)
+        print(f"{name:<20}{len(group):>8}{gjk_time/len(group)*1e6:>12.2f}{dispatch_time/len(group)*1e6:>15.2f}{gjk_time/dispatch_time:>10.1f}")
+    print(f"{mismatches} answers differ from GJK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Scaling of `parallel_collide` with the number of worker processes.
+
+The scene is a set of random spheres, circles and cuboids, queried on random pairs. Each count of
+workers is timed on a first call, which starts the processes, and on a second call to the same
+`ParallelCollider`, which reuses them.
+
+Usage: python -m benchmarks.parallel [--pairs N] [--workers W [W ...]] [--seed S]
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import os
+import random
+import time
+
+from gjk.geometry_shapes import Circle, Cuboid, Point, Sphere
+from gjk.GJK_algo import GJK
+from gjk.parallel import ParallelCollider
+
+
+def random_pairs(count, seed, shapes=1000, spread=20):
+    rng = random.Random(seed)
+    def center():
+        return Point(rng.uniform(-spread, spread), rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+    def shape():
+        kind = rng.randrange(3)
+        if kind == 0:
+            return Sphere(radius=rng.uniform(0.5, 4), center=center())
+        elif kind == 1:
+            return Circle(radius=rng.uniform(0.5, 4), normal=center(), center=center())
+        return Cuboid(height=rng.uniform(0.5, 6), width=rng.uniform(0.5, 6), depth=rng.uniform(0.5, 6), center=center())
+    scene = [shape() for _ in range(shapes)]
+    return [(rng.choice(scene), rng.choice(scene)) for _ in range(count)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pairs", type=int, default=200000, help="Number of pairs (default: 200000)")
+    parser.add_argument("--workers", type=int, nargs="+", default=None, help="Worker counts to time (default: 1, 2, 4, ... up to the CPU count)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    workers = args.workers or [2**k for k in range((os.cpu_count() or 1).bit_length())]
+    pairs = random_pairs(args.pairs, args.seed)
+
+    start = time.perf_counter()
+    verified = [GJK(*pair) for pair in pairs]
+    serial_time = time.perf_counter() - start
+    print(f"{len(pairs)} pairs, {sum(verified)} intersecting, {os.cpu_count()} CPUs")
+
+    print(f"{'workers':<10}{'first [s]':>12}{'speedup':>10}{'reused [s]':>12}{'speedup':>10}")
+    print(f"{'serial':<10}{serial_time:>12.3f}{1:>10.1f}{serial_time:>12.3f}{1:>10.1f}")
+    for count in workers:
+        times = []
+        with ParallelCollider(count) as collider:
+            for _ in range(2):
+                start = time.perf_counter()
+                result = collider.collide(pairs)
+                times.append(time.perf_counter() - start)
+                assert result.tolist() == verified
+        first, reused = times
+        print(f"{count:<10}{first:>12.3f}{serial_time/first:>10.1f}{reused:>12.3f}{serial_time/reused:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Reproducible scenes of shape pairs for the benchmarks.
+
+Every pair is built from two shapes of the given kinds, with random sizes and orientations (the
+normal of circles, the rotation of cuboids and polyhedra), and the second shape is moved along a
+random direction. The contact offset along that direction is found by bisection, and the offset
+of the pair is set from it to get the wanted configuration.
+"""
+
+__author__ = "Abhijit Kale"
+
+import itertools
+import random
+
+from gjk.geometry_basic import Point, rotation_from_quaternion
+from gjk.geometry_shapes import Circle, ConvexPolyhedron, Cuboid, Sphere
+from gjk.GJK_algo import GJK
+
+KINDS = ("sphere", "circle", "cuboid", "polyhedron")
+
+# Offset of the pairs along their direction, as a function of the contact offset and of the size of the pair
+CONFIGURATIONS = {
+    "separated": lambda contact, size: contact + size,
+    "near_miss": lambda contact, size: contact + 1e-3*size,
+    "touching": lambda contact, size: contact,
+    "overlapping": lambda contact, size: 0.3*contact,
+}
+
+POLYHEDRON_VERTICES = 64
+
+
+def combinations():
+    """Unordered pairs of shape kinds, each kind paired with itself too."""
+    return list(itertools.combinations_with_replacement(KINDS, 2))
+
+def random_direction(rng):
+    while True:
+        direction = Point(rng.gauss(0, 1), rng.gauss(0, 1), rng.gauss(0, 1))
+        if direction.distance > 1e-6:
+            return direction.normalize()
+
+def random_rotation(rng):
+    return rotation_from_quaternion(*(rng.gauss(0, 1) for _ in range(4)))
+
+def random_shape(rng, kind):
+    """Shape of the given kind, centered on the origin."""
+    if kind == "sphere":
+        return Sphere(radius=rng.uniform(0.5, 3), center=Point())
+    elif kind == "circle":
+        return Circle(radius=rng.uniform(0.5, 3), normal=random_direction(rng), center=Point())
+    elif kind == "cuboid":
+        return Cuboid(height=rng.uniform(0.5, 4), width=rng.uniform(0.5, 4), depth=rng.uniform(0.5, 4), center=Point(), rotation=random_rotation(rng))
+    elif kind == "polyhedron":
+        axes = [rng.uniform(0.5, 2) for _ in range(3)] # Ellipsoid
+        vertices = [Point(*(axis*coord for axis, coord in zip(axes, random_direction(rng).coords))) for _ in range(POLYHEDRON_VERTICES)]
+        return ConvexPolyhedron(vertices, center=Point(), rotation=random_rotation(rng))
+    raise ValueError(f"Unknown shape kind: {kind}")
+
+def contact_offset(shape1, shape2, direction, size, iterations=60):
+    """Offset of `shape2` along `direction` at which the pair starts touching, by bisection."""
+    low, high = 0.0, 2*size # Intersecting at `low`, not at `high`
+    for _ in range(iterations):
+        middle = (low + high)/2
+        shape2.center = direction*middle
+        if GJK(shape1, shape2):
+            low = middle
+        else:
+            high = middle
+    return low
+
+def pair_scene(kind1, kind2, configuration, count, seed=0):
+    """ Pairs of shapes of the given kinds, in the given configuration.
+
+    PARAMETERS
+    ----------
+    kind{1, 2}: str
+    One of `KINDS`.
+
+    configuration: str
+    One of `CONFIGURATIONS`.
+
+    count: int
+    Number of pairs.
+
+    seed: int
+    Scenes with the same arguments are identical.
+
+    RETURN
+    ------
+    : list(tuple(Shape, Shape))
+    """
+    place = CONFIGURATIONS[configuration]
+    rng = random.Random(f"{seed}-{kind1}-{kind2}-{configuration}")
+
+    pairs = []
+    for _ in range(count):
+        shape1, shape2 = random_shape(rng, kind1), random_shape(rng, kind2)
+        size = sum(max(high - low for low, high in zip(lower.coords, upper.coords)) for lower, upper in (shape1.aabb, shape2.aabb))
+        direction = random_direction(rng)
+        contact = contact_offset(shape1, shape2, direction, size)
+        shape2.center = direction*place(contact, size)
+
+        offset = random_direction(rng)*rng.uniform(0, 10) # Away from the origin, where rounding matters
+        shape1.center = shape1.center + offset
+        shape2.center = shape2.center + offset
+        pairs.append((shape1, shape2))
+    return pairs
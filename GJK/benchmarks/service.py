@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Load generator for the collision query service (`gjk.service`).
+
+A server process is started on a Unix socket with a world of random spheres, circles and cuboids.
+Clients then send query requests of random pairs, each client keeping a number of requests in
+flight, and the throughput and latency of the requests are reported.
+
+Usage: python -m benchmarks.service [--shapes N] [--clients C] [--depth D] [--batch B] [--requests R] [--seed S]
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from gjk.geometry_shapes import Point
+from gjk.service import CollisionClient, serve
+
+from .scenes import random_shape
+
+SPREAD = 20
+
+
+def run_server(path):
+    asyncio.run(serve(path))
+
+async def wait_for_socket(path, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Server did not start listening on {path}")
+        await asyncio.sleep(0.01)
+
+async def client_load(path, ids, args, rng):
+    """Send `args.requests` queries, `args.depth` at a time. Returns their latencies in seconds."""
+    latencies = []
+    async with await CollisionClient.connect(path) as client:
+        async def worker(count):
+            for _ in range(count):
+                pairs = [(rng.choice(ids), rng.choice(ids)) for _ in range(args.batch)]
+                start = time.perf_counter()
+                await client.query(pairs)
+                latencies.append(time.perf_counter() - start)
+        share, extra = divmod(args.requests, args.depth)
+        await asyncio.gather(*(worker(share + (k < extra)) for k in range(args.depth)))
+    return latencies
+
+async def load(path, args):
+    await wait_for_socket(path)
+    rng = random.Random(args.seed)
+    shapes = {}
+    for k in range(args.shapes):
+        shape = random_shape(rng, rng.choice(("sphere", "circle", "cuboid"))) # Kinds supported by the service
+        shape.center = Point(*(rng.uniform(-SPREAD, SPREAD) for _ in range(3)))
+        shapes[k] = shape
+    async with await CollisionClient.connect(path) as client:
+        await client.update(shapes)
+
+    ids = list(shapes)
+    start = time.perf_counter()
+    per_client = await asyncio.gather(*(client_load(path, ids, args, random.Random(rng.random())) for _ in range(args.clients)))
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(latency for latencies in per_client for latency in latencies)
+    requests = len(latencies)
+    print(f"{requests} requests of {args.batch} pairs from {args.clients} clients, {args.depth} in flight each, in {elapsed:.2f} s")
+    print(f"{requests/elapsed:.0f} requests/s, {requests*args.batch/elapsed:.0f} queries/s")
+    for name, q in (("p50", 0.5), ("p99", 0.99), ("p99.9", 0.999)):
+        print(f"{name:>6} latency: {latencies[min(requests - 1, int(q*requests))]*1e3:.2f} ms")
+    print(f"  mean latency: {statistics.fmean(latencies)*1e3:.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", type=int, default=1000, help="Shapes in the world (default: 1000)")
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent client connections (default: 4)")
+    parser.add_argument("--depth", type=int, default=8, help="Requests in flight per client (default: 8)")
+    parser.add_argument("--batch", type=int, default=32, help="Pairs per request (default: 32)")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per client (default: 500)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "gjk.sock")
+        server = multiprocessing.Process(target=run_server, args=(path,), daemon=True)
+        server.start()
+        try:
+            asyncio.run(load(path, args))
+        finally:
+            server.terminate()
+            server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark of the spatial hash against brute-force all-pairs GJK and against sweep and prune.
+
+The scene is a tiled layout of boxes, where many boxes share coordinates along each axis.
+
+Usage: python -m benchmarks.spatial_hash [--tiles N] [--seed S]
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import itertools
+import random
+import time
+
+from gjk.geometry_shapes import Cuboid, Point
+from gjk.GJK_algo import GJK
+from gjk.broadphase import CollisionWorld
+from gjk.spatial_hash import SpatialHash
+
+
+def tiled_scene(tiles, seed):
+    """`tiles` x `tiles` planar boxes on a unit grid, slightly jittered so that neighbours may touch."""
+    rng = random.Random(seed)
+    return [Cuboid(height=0.95, width=0.95, center=Point(i + rng.uniform(-0.05, 0.05), j))
+            for i in range(tiles) for j in range(tiles)]
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tiles", type=int, default=30, help="Number of tiles along each side (default: 30)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    shapes = tiled_scene(args.tiles, args.seed)
+    print(f"{len(shapes)} shapes, {len(shapes)*(len(shapes) - 1)//2} pairs")
+
+    brute_force, brute_force_time = timed(lambda: {frozenset(pair) for pair in itertools.combinations(shapes, 2) if GJK(*pair)})
+
+    index, hash_build_time = timed(lambda: SpatialHash.from_shapes(shapes))
+    hashed, hash_query_time = timed(index.query_pairs)
+
+    def build_world():
+        world = CollisionWorld()
+        for shape in shapes:
+            world.add(shape)
+        return world
+    world, sap_build_time = timed(build_world)
+    swept, sap_query_time = timed(world.query_pairs)
+
+    assert {frozenset(pair) for pair in hashed} == brute_force
+    assert {frozenset(pair) for pair in swept} == brute_force
+
+    print(f"{'method':<20}{'build [s]':>12}{'query [s]':>12}{'speedup':>10}")
+    print(f"{'brute force':<20}{0:>12.4f}{brute_force_time:>12.4f}{1:>10.1f}")
+    for name, build, query in (("spatial hash", hash_build_time, hash_query_time), ("sweep and prune", sap_build_time, sap_query_time)):
+        print(f"{name:<20}{build:>12.4f}{query:>12.4f}{brute_force_time/(build + query):>10.1f}")
+    print(f"{len(brute_force)} intersecting pairs, cell size {index.cell_size:.3f}")
+
+
+if __name__ == "__main__":
+    main()
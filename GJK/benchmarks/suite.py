@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Benchmark suite of the GJK algorithm, with regression tracking.
+
+Every combination of shape kinds is timed on seeded scenes of separated, near-miss, touching and
+overlapping pairs (see `benchmarks.scenes`). For each group of pairs, the suite reports the
+throughput, the mean and 99th percentile latency, the support evaluations per query, and the
+memory allocated per query (peak traced by `tracemalloc`).
+
+Usage:
+    python -m benchmarks.suite run [--pairs N] [--repeat R] [--seed S] [--output FILE]
+    python -m benchmarks.suite compare BASELINE RESULTS [--threshold T]
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from gjk.GJK_algo import GJK, GJK_loop, initial_direction, support
+
+from .scenes import CONFIGURATIONS, combinations, pair_scene
+
+# Direction in which each metric improves
+METRICS = {
+    "pairs_per_sec": "higher",
+    "mean_us": "lower",
+    "p99_us": "lower",
+    "iterations": "lower",
+    "alloc_bytes": "lower",
+}
+
+
+def iterations(shape1, shape2):
+    """Support evaluations of a `GJK` query."""
+    direction = initial_direction(shape1, shape2)
+    A = support(shape1, shape2, direction)
+    return GJK_loop(shape1, shape2, [A], direction)[1] + 1
+
+def alloc_bytes(pairs):
+    """Mean peak of the memory allocated by a query, in bytes."""
+    total = 0
+    tracemalloc.start()
+    try:
+        for shape1, shape2 in pairs:
+            tracemalloc.reset_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            GJK(shape1, shape2)
+            total += tracemalloc.get_traced_memory()[1] - current
+    finally:
+        tracemalloc.stop()
+    return total/len(pairs)
+
+def measure(pairs, repeat):
+    """Metrics of `GJK` on a group of pairs. The latencies are the best of `repeat` runs per pair."""
+    clock = time.perf_counter_ns
+    latencies = [float("inf")]*len(pairs)
+    for _ in range(repeat):
+        for k, (shape1, shape2) in enumerate(pairs):
+            start = clock()
+            GJK(shape1, shape2)
+            latencies[k] = min(latencies[k], clock() - start)
+
+    latencies.sort()
+    mean = statistics.fmean(latencies)
+    return {
+        "pairs_per_sec": 1e9/mean,
+        "mean_us": mean/1e3,
+        "p99_us": latencies[min(len(latencies) - 1, int(0.99*len(latencies)))]/1e3,
+        "iterations": statistics.fmean(iterations(*pair) for pair in pairs),
+        "alloc_bytes": alloc_bytes(pairs),
+    }
+
+def run(args):
+    results = {}
+    for kind1, kind2 in combinations():
+        for configuration in CONFIGURATIONS:
+            name = f"{kind1}-{kind2}/{configuration}"
+            results[name] = measure(pair_scene(kind1, kind2, configuration, args.pairs, args.seed), args.repeat)
+            print(f"{name:<35}" + "".join(f"{results[name][metric]:>14.2f}" for metric in METRICS), flush=True)
+
+    report = {
+        "meta": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "pairs": args.pairs,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
+
+def compare(args):
+    """Print the relative change of every metric, and fail if any got worse by more than the threshold."""
+    with open(args.baseline) as file:
+        baseline = json.load(file)["results"]
+    with open(args.results) as file:
+        results = json.load(file)["results"]
+
+    regressions = 0
+    print(f"{'group':<35}{'metric':<16}{'baseline':>12}{'current':>12}{'change':>10}")
+    for name in sorted(baseline.keys() & results.keys()):
+        for metric, better in METRICS.items():
+            old, new = baseline[name].get(metric), results[name].get(metric)
+            if old is None or new is None or old == 0:
+                continue
+            change = (new - old)/old
+            worse = -change if better == "higher" else change
+            flag = ""
+            if worse > args.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{name:<35}{metric:<16}{old:>12.2f}{new:>12.2f}{change:>+10.1%}{flag}")
+
+    for name in sorted(baseline.keys() - results.keys()):
+        print(f"{name:<35}missing from the results")
+
+    print(f"{regressions} regression(s) beyond {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run the suite")
+    run_parser.add_argument("--pairs", type=int, default=200, help="Pairs per group (default: 200)")
+    run_parser.add_argument("--repeat", type=int, default=5, help="Timed runs per pair, the best is kept (default: 5)")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--output", help="JSON file to write the results to")
+
+    compare_parser = commands.add_parser("compare", help="Compare results against a baseline")
+    compare_parser.add_argument("baseline", help="JSON results of the baseline")
+    compare_parser.add_argument("results", help="JSON results to check")
+    compare_parser.add_argument("--threshold", type=float, default=0.1, help="Relative change counted as a regression (default: 0.1)")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        print(f"{'group':<35}" + "".join(f"{metric:>14}" for metric in METRICS))
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
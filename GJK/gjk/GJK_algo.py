@@ -14,10 +14,15 @@ Inspired from https://www.youtube.com/watch?v=ajv46BSqcK4
 
 __author__ = "Abhijit Kale"
 
+import math
+
 from .geometry_basic import *
 from .geometry_shapes import *
 
-def support(shape1, shape2, direction):
+# Support evaluations after which a query cycling on rounding errors is counted as touching
+MAX_ITERATIONS = 64
+
+def support(shape1, shape2, direction, out=None):
     """Find support for the Minkowski difference in the given direction.
     
     PARAMETERS
@@ -28,12 +33,44 @@ def support(shape1, shape2, direction):
     direction: Point
     The direction for finding the support.
     
+    out [out]: Point, optional
+    Receives the support, otherwise a new point is returned.
+    
     RETURN
     ------
     : Point
     Support for Minkowski difference in the given direction.
     """
-    return shape1.support(direction) - shape2.support(-direction)
+    point1 = shape1.support(direction)
+    direction.ineg() # Look up `shape2` in the opposite direction. Negation is exact, so restoring it is lossless.
+    try:
+        point2 = shape2.support(direction)
+    finally:
+        direction.ineg()
+    
+    if out is None:
+        return point1 - point2
+    out.x = point1.x - point2.x
+    out.y = point1.y - point2.y
+    out.z = point1.z - point2.z
+    return out
+
+def initial_direction(shape1, shape2):
+    """ First search direction, along the line between the centers of the shapes.
+    
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+    
+    RETURN
+    ------
+    : Vec
+    Unit vector. An arbitrary axis if the centers coincide.
+    """
+    direction = Vec(shape1.center, shape2.center)
+    if direction.length == 0:
+        direction.set_coords_from_coords(1.0, 0.0, 0.0)
+    return direction.normalize()
 
 def handle_simplex(simplex, direction):
     """ Dispatch simplex processing to the correct handler. 
@@ -51,14 +88,16 @@ def handle_simplex(simplex, direction):
     `True` if shapes intersect, otherwise update the direction towards the origin and return `False`.
     """
     
-    # If only two points in the simplex (2D), treat it as line case, else triangle case.
+    # Newest point is last. Handlers may reduce the simplex to the feature closest to the origin.
     if len(simplex) == 2:
         return line_case(simplex, direction)
-    else:
+    elif len(simplex) == 3:
         return triangle_case(simplex, direction)
+    else:
+        return tetrahedron_case(simplex, direction)
     
 def line_case(simplex, direction):
-    """ Handles degenerate simplex (a line in 2D).
+    """ Handles degenerate simplex (a line).
     
     PARAMETERS
     ----------
@@ -73,19 +112,19 @@ def line_case(simplex, direction):
     `True` if shapes intersect, otherwise update the direction towards the origin and return `False`.
     """
     BA = Vec(simplex[0], simplex[1])
-    BO = Vec(simplex[0], Point(0, 0, 0))
+    BO = Vec(simplex[0]) # Arrow to the origin
     
-    # If the points A, B and O are collinear, the shapes intersect and we are done. 
-    if BA.cross(BO).length == 0:
+    # If the points A, B and O are collinear, the shapes intersect and we are done. (`direction` is used as scratch space)
+    if BA.cross_into(BO, direction).length == 0:
         return True
     
-    towards_origin_arrow = triple_prod(BA, BO, BA) # Arrow towards origin. (non-normalized directions)
-    direction.coords = towards_origin_arrow.direction # Update direction
+    triple_prod_into(BA, BO, BA, direction) # Arrow towards origin. (non-normalized direction)
+    direction.normalize() # Update direction
     
     return False
 
 def triangle_case(simplex, direction):
-    """ Handles non-degenerate simplex case (triangle in 2D).
+    """ Handles triangle simplex.
     
     PARAMETERS
     ----------
@@ -101,53 +140,356 @@ def triangle_case(simplex, direction):
     A, B, C = simplex
     CB = Vec(C, B)
     CA = Vec(C, A)
-    CO = Vec(C, Point(0, 0, 0))
     
-    # Find perpendicular arrows (non-normalized directions) for sides CA and CB
-    CA_perp_arrow = triple_prod(CB, CA, CA)
-    CB_perp_arrow = triple_prod(CA, CB, CB)
+    # Perpendicular directions for sides CB and CA, within the triangle plane, are evaluated in turn into `direction`.
+    # C.(perp) < 0 is the same as CO.(perp) > 0, without building CO.
     
-    if CO.dot(CB_perp_arrow) > 0: # Check if origin contained in outside region swept by side CB
-        simplex.remove(A)
-        direction.coords = CB_perp_arrow.direction
-        return False
-    elif CO.dot(CA_perp_arrow) > 0: # Check if origin contained in outside region swept by side CA
-        simplex.remove(B)
-        direction.coords = CA_perp_arrow.direction
-        return False
-    else: # Origin is contained inside the simplex
+    triple_prod_into(CA, CB, CB, direction)
+    if C.inner(direction) < 0: # Check if origin contained in outside region swept by side CB
+        del simplex[0] # Remove A
+        return line_case(simplex, direction)
+    
+    triple_prod_into(CB, CA, CA, direction)
+    if C.inner(direction) < 0: # Check if origin contained in outside region swept by side CA
+        del simplex[1] # Remove B
+        return line_case(simplex, direction)
+    
+    # Origin is above, below or inside the triangle. Look for support along the normal facing it.
+    CA.cross_into(CB, direction)
+    height = C.inner(direction)
+    if height == 0:
+        if direction.length == 0: # Collinear points. Keep the newest side.
+            del simplex[0]
+            return line_case(simplex, direction)
+        return True # Origin inside the triangle
+    
+    if height > 0:
+        direction.ineg()
+    direction.normalize()
+    
+    return False
+
+def tetrahedron_case(simplex, direction):
+    """ Handles tetrahedron simplex.
+    
+    The face ABC was built before D, which was found looking from ABC towards the origin, so
+    only the three faces through D are checked.
+    
+    PARAMETERS
+    ----------
+    simplex: list(Point)
+    
+    direction [out]: Point
+    New direction to look for support.
+    
+    RETURN
+    ------
+    `True` if shapes intersect, otherwise update the direction towards the origin and return `False`.
+    """
+    A, B, C, D = simplex
+    DA = Vec(D, A)
+    DB = Vec(D, B)
+    DC = Vec(D, C)
+    
+    # Normals of the faces through D are evaluated in turn into `direction`, turned away from the opposite vertex.
+    for P, Q, DP, DQ, DR in ((A, B, DA, DB, DC), (B, C, DB, DC, DA), (C, A, DC, DA, DB)):
+        DP.cross_into(DQ, direction)
+        if dot_vec_dir(DR, direction) > 0:
+            direction.ineg()
+        if D.inner(direction) < 0: # Origin outside of face PQD
+            simplex[:] = [P, Q, D]
+            return triangle_case(simplex, direction)
+    
+    # Origin is contained inside the simplex
+    return True
+
+def simplex_contains_origin(simplex):
+    """ Check if a complete simplex contains the origin, whichever way it was built.
+    
+    Unlike the handlers, no side or face is assumed to face the origin already, so a simplex kept
+    from an earlier query can be tested again after its vertices moved.
+    
+    PARAMETERS
+    ----------
+    simplex: list(Point)
+    
+    RETURN
+    ------
+    : bool
+    `False` for a degenerate or incomplete simplex.
+    """
+    if len(simplex) == 3: # Origin within the triangle, in its plane
+        perp = Vec()
+        for P, Q, R in ((simplex[0], simplex[1], simplex[2]), (simplex[1], simplex[2], simplex[0]), (simplex[2], simplex[0], simplex[1])):
+            PQ = Vec(P, Q)
+            PR = Vec(P, R)
+            if PR.cross_into(PQ, perp).length == 0 or P.inner(perp) != 0: # Collinear points, or origin off the plane
+                return False
+            triple_prod_into(PR, PQ, PQ, perp) # Perpendicular to side PQ, away from R
+            if P.inner(perp) < 0: # Origin outside of side PQ
+                return False
         return True
+    if len(simplex) != 4:
+        return False
+    
+    normal = Vec()
+    for face, R in (((0, 1, 2), 3), ((1, 2, 3), 0), ((2, 3, 0), 1), ((3, 0, 1), 2)):
+        P, Q, S = (simplex[i] for i in face)
+        PR = Vec(P, simplex[R])
+        Vec(P, Q).cross_into(Vec(P, S), normal)
+        side = dot_vec_dir(PR, normal)
+        if side == 0: # Flat tetrahedron
+            return False
+        if side > 0:
+            normal.ineg()
+        if P.inner(normal) < 0: # Origin outside of face PQS
+            return False
+    
+    return True
 
-def GJK(shape1, shape2):
+def GJK(shape1, shape2, warm_start=None):
     """ Implementation of the GJK algorithm
     
     PARAMETERS
     ----------
     shape{1, 2}: Shape
     
+    warm_start: SimplexCache, optional
+    Cache of the final simplex and direction of earlier queries on the same pairs
+    (see `warm_start.SimplexCache`). If given, the search starts from them.
+    
     RETURN
     ------
     : bool
     Signifies if the given shapes intersect or not.
     """
+    if warm_start is not None:
+        return warm_start.query(shape1, shape2)
 
     # Initialize algorithm parameters
-    direction = Vec(shape1.center, shape2.center).direction
+    direction = initial_direction(shape1, shape2)
     A = support(shape1, shape2, direction)
-    simplex = [A]
-    direction = Vec(simplex[0], Point()).direction
+    
+    return GJK_loop(shape1, shape2, [A], direction)[0]
+
+def GJK_loop(shape1, shape2, simplex, direction, directions=None):
+    """ Iterations of the GJK algorithm, from a one-point simplex.
+    
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+    
+    simplex [in, out]: list(Point)
+    Initial simplex, holding a single support point. Holds the final simplex on return.
+    
+    direction [out]: Point
+    Scratch space for the search direction. Holds the last search direction on return.
+    
+    directions [in, out]: list(Point), optional
+    Directions in which the points of `simplex` were found. Kept in step with `simplex` if given.
+    
+    RETURN
+    ------
+    : (bool, int)
+    Signifies if the given shapes intersect or not, and the number of support evaluations.
+    """
+    if direction.set_coords_from_point(simplex[0]).ineg().length == 0: # The origin is a support point
+        return True, 0
+    direction.normalize() # Towards the origin
+    iterations = 0
 
-    while True: # while new valid support found. `direction` is updated each iteration.
-        B =  support(shape1, shape2, direction)
-        AB = Vec(simplex[0], B)
+    while iterations < MAX_ITERATIONS: # while new valid support found. `direction` is updated in place each iteration.
+        B = support(shape1, shape2, direction)
+        iterations += 1
         
-        if dot_vec_dir(AB, direction) <= 0: # No support past the origin
-            return False
+        if B.inner(direction) < 0: # No support past the origin
+            return False, iterations
         else:
             simplex.append(B)
         
+        if directions is None:
+            if handle_simplex(simplex, direction):
+                return True, iterations
+            continue
+        
+        directions.append(direction.copy())
+        previous = simplex[:]
         if handle_simplex(simplex, direction):
-            return True
+            return True, iterations
+        if len(simplex) < len(previous): # Drop the directions of the removed points
+            directions[:] = [d for p, d in zip(previous, directions) if any(p is q for q in simplex)]
+    
+    # Cycling between simplices within rounding of the boundary. Count as touching.
+    return True, iterations
+
+def closest_on_simplex(simplex):
+    """ Point of a simplex closest to the origin, as barycentric weights.
+    
+    Voronoi region tests, after Ericson, "Real-Time Collision Detection", chapter 5.1.
+    
+    PARAMETERS
+    ----------
+    simplex: list(Point)
+    One to four points.
+    
+    RETURN
+    ------
+    : list(tuple(int, float))
+    Indices in `simplex` of the points of the smallest feature holding the closest point, with
+    their weights. All four points are returned if the origin is inside the tetrahedron.
+    """
+    if len(simplex) == 1:
+        return [(0, 1.0)]
+    elif len(simplex) == 2:
+        return _closest_on_segment(*simplex)
+    elif len(simplex) == 3:
+        return _closest_on_triangle(*simplex)
+    else:
+        return _closest_on_tetrahedron(simplex)
+
+def _closest_on_segment(A, B):
+    AB = Vec(A, B)
+    t = -A.inner(AB)
+    if t <= 0:
+        return [(0, 1.0)]
+    length2 = AB.inner(AB)
+    if t >= length2:
+        return [(1, 1.0)]
+    t /= length2
+    return [(0, 1 - t), (1, t)]
+
+def _closest_on_triangle(A, B, C):
+    AB = Vec(A, B)
+    AC = Vec(A, C)
+    
+    d1, d2 = -AB.inner(A), -AC.inner(A)
+    if d1 <= 0 and d2 <= 0: # Vertex region of A
+        return [(0, 1.0)]
+    d3, d4 = -AB.inner(B), -AC.inner(B)
+    if d3 >= 0 and d4 <= d3: # Vertex region of B
+        return [(1, 1.0)]
+    vc = d1*d4 - d3*d2
+    if vc <= 0 and d1 >= 0 and d3 <= 0: # Edge region of AB
+        t = d1/(d1 - d3)
+        return [(0, 1 - t), (1, t)]
+    d5, d6 = -AB.inner(C), -AC.inner(C)
+    if d6 >= 0 and d5 <= d6: # Vertex region of C
+        return [(2, 1.0)]
+    vb = d5*d2 - d1*d6
+    if vb <= 0 and d2 >= 0 and d6 <= 0: # Edge region of AC
+        t = d2/(d2 - d6)
+        return [(0, 1 - t), (2, t)]
+    va = d3*d6 - d5*d4
+    if va <= 0 and d4 - d3 >= 0 and d5 - d6 >= 0: # Edge region of BC
+        t = (d4 - d3)/((d4 - d3) + (d5 - d6))
+        return [(1, 1 - t), (2, t)]
+    
+    denom = va + vb + vc
+    if denom <= 0: # Degenerate triangle. Closest of its sides.
+        sides = (_closest_on_segment(A, B), [(2*i, w) for i, w in _closest_on_segment(A, C)], [(1 + i, w) for i, w in _closest_on_segment(B, C)])
+        return min(sides, key=lambda weights: _closest_point((A, B, C), weights).distance)
+    v, w = vb/denom, vc/denom
+    return [(0, 1 - v - w), (1, v), (2, w)]
+
+def _closest_on_tetrahedron(simplex):
+    best, best_distance = None, math.inf
+    for face, opposite in (((0, 1, 2), 3), ((0, 1, 3), 2), ((0, 2, 3), 1), ((1, 2, 3), 0)):
+        P, Q, R = (simplex[i] for i in face)
+        normal = Vec(P, Q).cross(Vec(P, R))
+        side = dot_vec_dir(Vec(P, simplex[opposite]), normal)
+        if side == 0 or P.inner(normal)*side > 0: # Flat tetrahedron, or origin on the other side of the face (O-P).n*side < 0
+            weights = [(face[i], w) for i, w in _closest_on_triangle(P, Q, R)]
+            distance = _closest_point(simplex, weights).distance
+            if distance < best_distance:
+                best, best_distance = weights, distance
+    
+    if best is not None:
+        return best
+    
+    # Origin inside. Weights are the ratios of the volumes with the origin in place of each point.
+    origin = Point()
+    volumes = [_volume(*(origin if j == i else simplex[j] for j in range(4))) for i in range(4)]
+    total = sum(volumes)
+    return [(i, volume/total) for i, volume in enumerate(volumes)]
+
+def _volume(A, B, C, D):
+    """Signed volume of a tetrahedron, times six."""
+    return dot_vec_dir(Vec(A, B).cross(Vec(A, C)), Vec(A, D))
+
+def _closest_point(points, weights):
+    point = Point()
+    for i, weight in weights:
+        point.x += points[i].x*weight
+        point.y += points[i].y*weight
+        point.z += points[i].z*weight
+    return point
+
+def GJK_distance(shape1, shape2, tolerance=1e-9):
+    """ Distance between two shapes, and the closest points on both.
+    
+    The simplex is reduced to the feature closest to the origin at each iteration, and the
+    search goes on from that point until the support does not get closer by more than `tolerance`.
+    
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+    
+    tolerance: float
+    Relative tolerance on the distance.
+    
+    RETURN
+    ------
+    : (float, Point, Point)
+    Distance between the shapes, and the witness points on `shape1` and `shape2` at that distance.
+    Intersecting shapes are at distance 0, with both witness points on a common point.
+    """
+    direction = initial_direction(shape1, shape2)
+    vertices = [_support_pair(shape1, shape2, direction)] # (point1, point2, point1 - point2)
+    weights = [(0, 1.0)]
+    closest = vertices[0][2].copy()
+    distance2 = closest.inner(closest)
+    
+    for _ in range(MAX_ITERATIONS):
+        if distance2 == 0: # Touching or intersecting
+            break
+        
+        direction.set_coords_from_point(closest).ineg().normalize()
+        vertex = _support_pair(shape1, shape2, direction)
+        if distance2 - closest.inner(vertex[2]) <= tolerance*distance2: # No closer support
+            break
+        if any(vertex[2] == other[2] for other in vertices): # Already in the simplex
+            break
+        
+        candidates = vertices + [vertex]
+        points = [w for _, _, w in candidates]
+        new_weights = closest_on_simplex(points)
+        new_closest = _closest_point(points, new_weights)
+        new_distance2 = new_closest.inner(new_closest)
+        if len(new_weights) == 4: # Origin enclosed
+            new_distance2 = 0.0
+        elif new_distance2 >= distance2: # No progress left within rounding errors
+            break
+        
+        vertices = [candidates[i] for i, _ in new_weights]
+        weights = [(j, weight) for j, (_, weight) in enumerate(new_weights)]
+        closest, distance2 = new_closest, new_distance2
+    
+    if distance2 <= tolerance*tolerance*max(w.inner(w) for _, _, w in vertices): # Touching within rounding errors
+        distance2 = 0.0
+    
+    witness1 = _closest_point([p1 for p1, _, _ in vertices], weights)
+    witness2 = _closest_point([p2 for _, p2, _ in vertices], weights)
+    return math.sqrt(distance2), witness1, witness2
+
+def _support_pair(shape1, shape2, direction):
+    """Support of the Minkowski difference, with the supports of both shapes that built it."""
+    point1 = shape1.support(direction)
+    direction.ineg()
+    try:
+        point2 = shape2.support(direction)
+    finally:
+        direction.ineg()
+    return point1, point2, point1 - point2
     
 
 if __name__ == "__main__":
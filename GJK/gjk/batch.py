@@ -0,0 +1,318 @@
+"""
+Batched GJK intersection tests using NumPy.
+
+Shapes are packed into structure-of-arrays buffers (one array per field, coordinates
+along the first axis) and the steps of the scalar algorithm in `GJK_algo` are run as
+masked, vectorized operations over all the pairs that are still active.
+
+The arithmetic mirrors the scalar implementation operation by operation, so that the
+results agree exactly with `GJK_algo.GJK` for the supported shapes. Pairs on which the scalar
+code raises `ZeroDivisionError`, tiny simplices whose search direction underflows to zero, are
+counted as touching instead, so that they do not fail the rest of the batch.
+"""
+
+__author__ = "Abhijit Kale"
+
+import numpy as np
+
+from .geometry_shapes import Circle, Sphere, Cuboid
+from .GJK_algo import MAX_ITERATIONS
+
+# Shape kind codes used in `ShapeBuffer.kind`
+SPHERE, CIRCLE, CUBOID = 0, 1, 2
+
+_KINDS = {Sphere: SPHERE, Circle: CIRCLE, Cuboid: CUBOID}
+
+
+class ShapeBuffer:
+    """Structure-of-arrays packing of a list of shapes.
+
+    Coordinates are stored along the first axis, so `center[0]` holds the x coordinates of
+    all the shapes. Fields not used by a shape kind are left as zeros.
+
+    ATTRIBUTES
+    ----------
+    kind: ndarray(n,) of int8
+    One of `SPHERE`, `CIRCLE` or `CUBOID`.
+
+    center: ndarray(3, n)
+
+    radius: ndarray(n,)
+    Radius of spheres and circles.
+
+    half_dims: ndarray(3, n)
+    Half of the cuboid dimensions along x-axis, y-axis and z-axis.
+
+    normal: ndarray(3, n)
+    Unit normal of circles, in their local frame.
+
+    rotation: ndarray(3, 3, n)
+    Rows of the rotation matrices of the shapes. Identity for the shapes without rotation.
+
+    rotated: ndarray(n,) of bool
+    Shapes whose support goes through `rotation`. Spheres are never rotated.
+    """
+
+    def __init__(self, shapes):
+        n = len(shapes)
+        self.kind = np.empty(n, dtype=np.int8)
+        self.center = np.zeros((3, n))
+        self.radius = np.zeros(n)
+        self.half_dims = np.zeros((3, n))
+        self.normal = np.zeros((3, n))
+        self.rotation = np.zeros((3, 3, n))
+        self.rotated = np.zeros(n, dtype=bool)
+
+        for i, shape in enumerate(shapes):
+            self.pack(i, shape)
+
+    def __len__(self):
+        return len(self.kind)
+
+    def pack(self, i, shape):
+        """Write `shape` into slot `i` of the buffer.
+
+        Can be used to refresh the buffer after a shape has been moved or resized.
+        """
+        try:
+            kind = _KINDS[type(shape)]
+        except KeyError:
+            raise TypeError(f"Unsupported shape type for batched GJK: {type(shape).__name__}") from None
+
+        self.kind[i] = kind
+        self.center[:, i] = shape.center.coords
+        self.rotation[:, :, i] = shape.rotation
+        self.rotated[i] = kind != SPHERE and shape._rotation is not None
+        if kind == CUBOID:
+            self.half_dims[:, i] = [dim/2 for dim in shape.dims]
+        else:
+            self.radius[i] = shape.radius
+            if kind == CIRCLE:
+                self.normal[:, i] = shape.normal.coords
+
+
+def _as_buffer(shapes):
+    return shapes if isinstance(shapes, ShapeBuffer) else ShapeBuffer(shapes)
+
+def _dot(u, v):
+    return u[0]*v[0] + u[1]*v[1] + u[2]*v[2]
+
+def _cross(u, v):
+    return np.stack([u[1]*v[2] - u[2]*v[1],
+                     u[2]*v[0] - u[0]*v[2],
+                     u[0]*v[1] - u[1]*v[0]])
+
+def _length(v):
+    return np.sqrt(_dot(v, v))
+
+def _normalize(v):
+    """Normalize columns of `v`. Columns of zero length, where the scalar code raises `ZeroDivisionError`, are left as zeros."""
+    length = _length(v)
+    return v/np.where(length == 0, 1.0, length)
+
+def _shape_support(buf, idx, direction):
+    """Support of shapes `buf[idx]` in the given (3, m) directions.
+
+    Like `Shape.support`, the directions of rotated shapes are rotated into their local frame, and
+    their supports rotated back.
+    """
+    kind = buf.kind[idx]
+    rotated = buf.rotated[idx]
+    any_rotated = rotated.any()
+    if any_rotated:
+        rotation = buf.rotation[:, :, idx[rotated]]
+        direction = direction.copy()
+        d = direction[:, rotated]
+        direction[:, rotated] = np.stack([_dot(rotation[:, k], d) for k in range(3)]) # Transposed
+    out = np.empty_like(direction)
+
+    sel = kind == SPHERE
+    if sel.any():
+        i = idx[sel]
+        out[:, sel] = direction[:, sel]*buf.radius[i]
+
+    sel = kind == CIRCLE
+    if sel.any():
+        i = idx[sel]
+        d = direction[:, sel]
+        normal = buf.normal[:, i]
+        projected = d - normal*_dot(normal, d) # direction on the circle plane.
+        projected = projected - normal*_dot(normal, projected) # Projected again, like the scalar code
+        length = _length(projected)
+        along_normal = length == 0 # Every point of the disc is a support. Take the center.
+        out[:, sel] = np.where(along_normal, 0.0, projected/np.where(along_normal, 1.0, length)*buf.radius[i])
+
+    sel = kind == CUBOID
+    if sel.any():
+        i = idx[sel]
+        half_dims = buf.half_dims[:, i]
+        out[:, sel] = np.where(direction[:, sel] > 0, half_dims, -half_dims)
+
+    if any_rotated:
+        p = out[:, rotated]
+        out[:, rotated] = np.stack([_dot(rotation[k], p) for k in range(3)])
+    return out + buf.center[:, idx]
+
+def _support(buf1, idx1, buf2, idx2, direction):
+    """Vectorized counterpart of `GJK_algo.support`."""
+    return _shape_support(buf1, idx1, direction) - _shape_support(buf2, idx2, -direction)
+
+def _triple_prod(vec1, vec2, vec3):
+    return _cross(_cross(vec1, vec2), vec3)
+
+def _line_case(simplex, size, direction, hit, pairs):
+    """Vectorized counterpart of `GJK_algo.line_case` for the given pairs.
+
+    RETURN
+    ------
+    : ndarray of bool
+    Mask over `pairs` of the ones found to intersect.
+    """
+    size[pairs] = 2
+    A, B = simplex[0][:, pairs], simplex[1][:, pairs]
+    BA = B - A
+    BO = 0 - A
+
+    # If the points A, B and O are collinear, the shapes intersect.
+    collinear = _length(_cross(BA, BO)) == 0
+    hit[pairs[collinear]] = True
+
+    pending = ~collinear
+    arrow = _triple_prod(BA[:, pending], BO[:, pending], BA[:, pending])
+    direction[:, pairs[pending]] = _normalize(arrow)
+
+    return collinear
+
+def _triangle_case(simplex, size, direction, hit, pairs):
+    """Vectorized counterpart of `GJK_algo.triangle_case` for the given pairs.
+
+    RETURN
+    ------
+    : ndarray of bool
+    Mask over `pairs` of the ones found to intersect.
+    """
+    size[pairs] = 3
+    A, B, C = simplex[0][:, pairs], simplex[1][:, pairs], simplex[2][:, pairs]
+    CB = B - C
+    CA = A - C
+
+    outside_CB = _dot(C, _triple_prod(CA, CB, CB)) < 0
+    outside_CA = ~outside_CB & (_dot(C, _triple_prod(CB, CA, CA)) < 0)
+
+    normal = _cross(CA, CB)
+    height = _dot(C, normal)
+    in_plane = ~(outside_CB | outside_CA) & (height == 0)
+    collinear = in_plane & (_length(normal) == 0)
+    inside = in_plane & ~collinear
+    hit[pairs[inside]] = True
+
+    # Outside side CB, or collinear points: drop A
+    drop_A = outside_CB | collinear
+    sel = pairs[drop_A]
+    simplex[0][:, sel] = B[:, drop_A]
+    simplex[1][:, sel] = C[:, drop_A]
+
+    # Outside side CA: drop B
+    sel = pairs[outside_CA]
+    simplex[1][:, sel] = C[:, outside_CA]
+
+    # Above or below the triangle: look along the normal facing the origin
+    facing = ~(drop_A | outside_CA | inside)
+    normal = np.where(height > 0, -normal, normal)
+    direction[:, pairs[facing]] = _normalize(normal[:, facing])
+
+    done = inside
+    to_line = drop_A | outside_CA
+    done[to_line] = _line_case(simplex, size, direction, hit, pairs[to_line])
+    return done
+
+def _tetrahedron_case(simplex, size, direction, hit, pairs):
+    """Vectorized counterpart of `GJK_algo.tetrahedron_case` for the given pairs.
+
+    RETURN
+    ------
+    : ndarray of bool
+    Mask over `pairs` of the ones found to intersect.
+    """
+    A, B, C, D = (simplex[i][:, pairs] for i in range(4))
+    DA, DB, DC = A - D, B - D, C - D
+
+    done = np.zeros(pairs.size, dtype=bool)
+    pending = np.ones(pairs.size, dtype=bool) # Inside the faces checked so far
+    for P, Q, DP, DQ, DR in ((A, B, DA, DB, DC), (B, C, DB, DC, DA), (C, A, DC, DA, DB)):
+        normal = _cross(DP, DQ)
+        normal = np.where(_dot(DR, normal) > 0, -normal, normal)
+        outside = pending & (_dot(D, normal) < 0)
+        pending &= ~outside
+
+        sel = pairs[outside]
+        simplex[0][:, sel] = P[:, outside]
+        simplex[1][:, sel] = Q[:, outside]
+        simplex[2][:, sel] = D[:, outside]
+        done[outside] = _triangle_case(simplex, size, direction, hit, sel)
+
+    # Origin is contained inside the simplex
+    hit[pairs[pending]] = True
+    done[pending] = True
+    return done
+
+def GJK_batch(shapes_a, shapes_b):
+    """ Batched implementation of the GJK algorithm.
+
+    PARAMETERS
+    ----------
+    shapes_a, shapes_b: sequence(Shape) or ShapeBuffer
+    Pairs to test, `shapes_a[i]` against `shapes_b[i]`. Supported shapes are `Sphere`,
+    `Circle` and `Cuboid`. Packing the shapes once into a `ShapeBuffer` avoids repeating
+    the conversion when the same set is tested several times.
+
+    RETURN
+    ------
+    : ndarray of bool
+    `True` at index `i` if `shapes_a[i]` and `shapes_b[i]` intersect.
+    """
+    buf1, buf2 = _as_buffer(shapes_a), _as_buffer(shapes_b)
+    if len(buf1) != len(buf2):
+        raise ValueError(f"Expected the same number of shapes on both sides. Given {len(buf1)} and {len(buf2)}")
+
+    m = len(buf1)
+    idx = np.arange(m)
+    hit = np.zeros(m, dtype=bool)
+    simplex = np.zeros((4, 3, m)) # [vertex, coordinate, pair]
+    size = np.ones(m, dtype=np.intp) # Number of vertices in each simplex
+
+    # Initialize algorithm parameters
+    direction = buf2.center - buf1.center
+    coincident = _length(direction) == 0
+    direction[:, coincident] = [[1.0], [0.0], [0.0]] # Any axis will do
+    direction = _normalize(direction)
+    simplex[0] = _support(buf1, idx, buf2, idx, direction)
+
+    direction = -simplex[0] # Towards the origin
+    at_origin = _length(direction) == 0 # The origin is a support point
+    hit[at_origin] = True
+    active = idx[~at_origin]
+    direction[:, active] = _normalize(direction[:, active])
+
+    iterations = 0
+    while active.size and iterations < MAX_ITERATIONS: # Pairs still looking for a new valid support.
+        B = _support(buf1, active, buf2, active, direction[:, active])
+        iterations += 1
+
+        past_origin = _dot(B, direction[:, active]) >= 0 # Pairs without support past the origin do not intersect
+        active, B = active[past_origin], B[:, past_origin]
+
+        n = size[active]
+        done = np.zeros(active.size, dtype=bool)
+        for count, case in ((1, _line_case), (2, _triangle_case), (3, _tetrahedron_case)):
+            sel = n == count
+            simplex[count][:, active[sel]] = B[:, sel]
+            done[sel] = case(simplex, size, direction, hit, active[sel])
+
+        # No direction left towards the origin, lost to underflow on tiny simplices. Counted as touching, like cycling.
+        lost = ~done & (_length(direction[:, active]) == 0)
+        hit[active[lost]] = True
+        active = active[~(done | lost)]
+
+    hit[active] = True # Cycling within rounding of the boundary. Counted as touching, like the scalar code.
+    return hit
@@ -0,0 +1,234 @@
+"""
+Sweep-and-prune broad phase for the GJK algorithm.
+
+The bounding boxes of all the shapes in a world are kept as sorted lists of interval endpoints,
+one list per axis. Two boxes overlap if their intervals overlap on all three axes, and only
+those pairs are handed to the narrow phase (`GJK`).
+
+When shapes move, their endpoints are moved to the new position with insertion sort. Every swap
+of a lower endpoint with an upper endpoint of another box starts or ends an overlap on that axis,
+so the set of overlapping pairs is maintained incrementally. With small motion between updates
+only a few swaps happen, which keeps an update of the whole world close to O(n + k) for n shapes
+and k overlapping pairs. Adding or removing a shape bisects the lists and only checks the boxes
+within the largest box size of it.
+"""
+
+__author__ = "Abhijit Kale"
+
+from bisect import bisect_left
+
+from .GJK_algo import GJK
+
+NUM_AXES = 3
+_SLACK = 1e-9
+
+
+def _sort_key(endpoint):
+    return endpoint.key
+
+class _Endpoint:
+    """Lower or upper end of the interval of a box along one axis."""
+
+    __slots__ = ("value", "key", "is_upper", "proxy")
+
+    def __init__(self, value, is_upper, proxy):
+        self.is_upper = is_upper
+        self.proxy = proxy
+        self.set_value(value)
+
+    def set_value(self, value):
+        # Lower endpoints sort before upper endpoints of equal value, so touching boxes overlap.
+        # The handle makes the order total, so that an endpoint can be found by bisection.
+        self.value = value
+        self.key = (value, self.is_upper, self.proxy.handle)
+
+
+class _Proxy:
+    """Book-keeping for one shape of the world."""
+
+    __slots__ = ("shape", "handle", "endpoints")
+
+    def __init__(self, shape, handle):
+        self.shape = shape
+        self.handle = handle # Insertion order. Used to order the shapes in pairs.
+        self.endpoints = [] # (lower, upper) endpoints per axis
+
+
+class CollisionWorld:
+    """Set of shapes with a sweep-and-prune broad phase in front of the narrow phase.
+
+    Shapes are keyed by identity. After moving or resizing a shape through its setters, call
+    `update` to move its bounding box. If its center point was modified in place, call
+    `shape.touch()` first so that the cached bounding box is recomputed.
+
+    PARAMETERS
+    ----------
+    collide: callable(Shape, Shape) -> bool
+    Narrow phase test run on the pairs with overlapping bounding boxes.
+    """
+
+    def __init__(self, collide=GJK):
+        self.collide = collide
+        self._axes = [[] for _ in range(NUM_AXES)] # Sorted endpoints per axis
+        self._max_extent = [0.0]*NUM_AXES # Upper bound on the box sizes along each axis
+        self._proxies = {} # shape -> _Proxy
+        self._overlaps = {} # (handle1, handle2) -> number of axes on which the boxes overlap
+        self._candidates = {} # (handle1, handle2) -> (proxy1, proxy2) overlapping on all the axes
+        self._next_handle = 0
+
+    def __len__(self):
+        return len(self._proxies)
+
+    def __contains__(self, shape):
+        return shape in self._proxies
+
+    @property
+    def shapes(self):
+        return list(self._proxies)
+
+    def add(self, shape):
+        """Add a shape to the world."""
+        if shape in self._proxies:
+            raise ValueError("Shape already in the world")
+
+        proxy = _Proxy(shape, self._next_handle)
+        self._next_handle += 1
+        self._proxies[shape] = proxy
+
+        lower_corner, upper_corner = shape.aabb
+        for axis, (low, high) in enumerate(zip(lower_corner.coords, upper_corner.coords)):
+            lower, upper = _Endpoint(low, False, proxy), _Endpoint(high, True, proxy)
+            proxy.endpoints.append((lower, upper))
+            self._max_extent[axis] = max(self._max_extent[axis], high - low)
+
+            for other in self._overlapping(axis, low, high):
+                self._begin_overlap(proxy, other)
+
+            endpoints = self._axes[axis]
+            endpoints.insert(bisect_left(endpoints, lower.key, key=_sort_key), lower)
+            endpoints.insert(bisect_left(endpoints, upper.key, key=_sort_key), upper)
+
+    def remove(self, shape):
+        """Remove a shape from the world."""
+        proxy = self._proxies.pop(shape)
+
+        for axis, (lower, upper) in enumerate(proxy.endpoints):
+            endpoints = self._axes[axis]
+            del endpoints[bisect_left(endpoints, upper.key, key=_sort_key)]
+            del endpoints[bisect_left(endpoints, lower.key, key=_sort_key)]
+
+            for other in self._overlapping(axis, lower.value, upper.value):
+                self._end_overlap(proxy, other)
+
+    def update(self, shape):
+        """Move the bounding box of a shape of the world to its current position."""
+        proxy = self._proxies[shape]
+        lower_corner, upper_corner = shape.aabb
+
+        for axis, (low, high) in enumerate(zip(lower_corner.coords, upper_corner.coords)):
+            lower, upper = proxy.endpoints[axis]
+            self._max_extent[axis] = max(self._max_extent[axis], high - low)
+            # Grow the interval before shrinking it, so that the endpoints never cross each other.
+            if low < lower.value:
+                self._move(axis, lower, low)
+            if high > upper.value:
+                self._move(axis, upper, high)
+            if low > lower.value:
+                self._move(axis, lower, low)
+            if high < upper.value:
+                self._move(axis, upper, high)
+
+    def candidate_pairs(self):
+        """Pairs of shapes with overlapping bounding boxes.
+
+        RETURN
+        ------
+        : list(tuple(Shape, Shape))
+        """
+        return [(proxy1.shape, proxy2.shape) for proxy1, proxy2 in self._candidates.values()]
+
+    def query_pairs(self):
+        """Pairs of intersecting shapes.
+
+        Only the pairs with overlapping bounding boxes are passed to the narrow phase.
+
+        RETURN
+        ------
+        : list(tuple(Shape, Shape))
+        """
+        collide = self.collide
+        return [(shape1, shape2) for shape1, shape2 in self.candidate_pairs() if collide(shape1, shape2)]
+
+    def _overlapping(self, axis, low, high):
+        """Proxies in the world whose interval along `axis` overlaps [low, high].
+
+        Only the lower endpoints within the largest box size below `low` can belong to such an
+        interval, so the scan is limited to that window.
+        """
+        endpoints = self._axes[axis]
+        window = self._max_extent[axis]*(1 + _SLACK) + abs(low)*_SLACK # Widened to absorb rounding of the extents
+        stop = bisect_left(endpoints, (high, True), key=_sort_key) # Past the lower endpoints at `high`
+        i = bisect_left(endpoints, (low - window,), key=_sort_key)
+
+        for endpoint in endpoints[i:stop]:
+            if not endpoint.is_upper and endpoint.proxy.endpoints[axis][1].value >= low:
+                yield endpoint.proxy
+
+    def _move(self, axis, endpoint, value):
+        """Set the value of an endpoint and restore the order with insertion sort."""
+        endpoints = self._axes[axis]
+        i = bisect_left(endpoints, endpoint.key, key=_sort_key)
+        is_upper = endpoint.is_upper
+        proxy = endpoint.proxy
+        old_value = endpoint.value
+        endpoint.set_value(value)
+        key = endpoint.key
+
+        if value < old_value: # Sweep towards the start
+            while i > 0:
+                other = endpoints[i - 1]
+                if other.key < key:
+                    break
+                if is_upper != other.is_upper:
+                    if is_upper: # Upper end passed below a lower end
+                        self._end_overlap(proxy, other.proxy)
+                    else: # Lower end passed below an upper end
+                        self._begin_overlap(proxy, other.proxy)
+                endpoints[i] = other
+                i -= 1
+        else: # Sweep towards the end
+            last = len(endpoints) - 1
+            while i < last:
+                other = endpoints[i + 1]
+                if other.key > key:
+                    break
+                if is_upper != other.is_upper:
+                    if is_upper: # Upper end passed above a lower end
+                        self._begin_overlap(proxy, other.proxy)
+                    else: # Lower end passed above an upper end
+                        self._end_overlap(proxy, other.proxy)
+                endpoints[i] = other
+                i += 1
+
+        endpoints[i] = endpoint
+
+    @staticmethod
+    def _key(proxy1, proxy2):
+        return (proxy1.handle, proxy2.handle) if proxy1.handle < proxy2.handle else (proxy2.handle, proxy1.handle)
+
+    def _begin_overlap(self, proxy1, proxy2):
+        key = self._key(proxy1, proxy2)
+        count = self._overlaps.get(key, 0) + 1
+        self._overlaps[key] = count
+        if count == NUM_AXES:
+            self._candidates[key] = (proxy1, proxy2) if proxy1.handle < proxy2.handle else (proxy2, proxy1)
+
+    def _end_overlap(self, proxy1, proxy2):
+        key = self._key(proxy1, proxy2)
+        count = self._overlaps[key]
+        if count == NUM_AXES:
+            del self._candidates[key]
+        if count == 1:
+            del self._overlaps[key]
+        else:
+            self._overlaps[key] = count - 1
@@ -0,0 +1,218 @@
+"""
+Compound shapes: unions of convex parts, with a bounding volume hierarchy over the parts.
+
+A `CompoundShape` is not convex, so it cannot go through `GJK` directly (its support is the one of
+the convex hull of its parts). `compound_collide` descends the hierarchies of both shapes,
+skipping the pairs of subtrees whose bounding boxes do not overlap, and only runs `GJK` on pairs
+of parts.
+"""
+
+__author__ = "Abhijit Kale"
+
+from .geometry_basic import Point
+from .geometry_shapes import Shape
+from .GJK_algo import GJK
+
+
+class _Node:
+    """Node of a bounding volume hierarchy. Leaves hold a single part."""
+
+    __slots__ = ("lower", "upper", "left", "right", "part")
+
+    def __init__(self, lower, upper, left=None, right=None, part=None):
+        self.lower = lower # World bounding box, as tuples of coordinates
+        self.upper = upper
+        self.left = left
+        self.right = right
+        self.part = part
+
+    def refresh(self):
+        """Evaluate the bounding boxes of the subtree, from the boxes of its parts."""
+        if self.part is not None:
+            lower, upper = self.part.aabb
+            self.lower, self.upper = lower.coords, upper.coords
+        else:
+            left, right = self.left, self.right
+            left.refresh()
+            right.refresh()
+            self.lower = tuple(map(min, left.lower, right.lower))
+            self.upper = tuple(map(max, left.upper, right.upper))
+
+
+class CompoundShape(Shape):
+    """Union of convex parts, moved as a whole.
+
+    The parts are placed relative to the compound: their `center` and `rotation` when the compound
+    is built are their placement in its local frame. From then on, the compound owns the parts and
+    sets their transforms from its own, on the first query after it was moved.
+    """
+
+    def __init__(self, parts, center=None, rotation=None):
+        """
+        PARAMETERS
+        ----------
+        parts: sequence(Shape)
+        Convex shapes, or compound shapes.
+
+        center: Point, optional
+        Origin of the local frame of the parts. Defaults to the origin.
+
+        rotation: sequence(sequence(float)), optional
+        """
+        if not parts:
+            raise ValueError("Expected at least one part")
+        self._parts = list(parts)
+        self._local = [(part.center.copy(), part._rotation) for part in self._parts] # Placement in the local frame
+        self._root = self._build([(part, part.aabb) for part in self._parts])
+        self.center = Point() if center is None else center
+        if rotation is not None:
+            self.rotation = rotation
+
+    @property
+    def center(self):
+        return self._center
+    @center.setter
+    def center(self, c):
+        self._center = c.copy() # Owned by the shape, so that moving it always goes through `touch`
+        self.touch()
+
+    @property
+    def parts(self):
+        """Parts, placed in the world frame.
+
+        RETURN
+        ------
+        : list(Shape)
+        """
+        self._refresh()
+        return list(self._parts)
+
+    def touch(self):
+        self._dirty = True
+        super().touch()
+
+    def _build(self, items):
+        """Hierarchy over (part, local bounding box) items, split at the median along the widest axis of their centers."""
+        if len(items) == 1:
+            return _Node(None, None, part=items[0][0])
+        centers = [tuple(low + high for low, high in zip(lower.coords, upper.coords)) for _, (lower, upper) in items]
+        axis = max(range(3), key=lambda k: max(center[k] for center in centers) - min(center[k] for center in centers))
+        order = sorted(range(len(items)), key=lambda i: centers[i][axis])
+        middle = len(items)//2
+        return _Node(None, None, left=self._build([items[i] for i in order[:middle]]), right=self._build([items[i] for i in order[middle:]]))
+
+    def _refresh(self):
+        """Place the parts from the transform of the compound, and update the bounding boxes."""
+        if not self._dirty:
+            return
+        rotation = self._rotation
+        for part, (offset, part_rotation) in zip(self._parts, self._local):
+            if rotation is None:
+                part._rotation = part_rotation
+            elif part_rotation is None:
+                part._rotation = rotation
+            else:
+                part._rotation = _compose(rotation, part_rotation) # Product of checked rotations. Not checked again.
+            part.center = self.to_world(offset)
+        self._root.refresh()
+        self._dirty = False
+
+    def support(self, direction):
+        """Support of the convex hull of the parts."""
+        self._refresh()
+        best, best_value = None, None
+        for part in self._parts:
+            point = part.support(direction)
+            value = point.inner(direction)
+            if best is None or value > best_value:
+                best, best_value = point, value
+        return best
+
+    def calc_aabb(self):
+        self._refresh()
+        return (Point(*self._root.lower), Point(*self._root.upper))
+
+
+def _compose(rotation1, rotation2):
+    """Rows of the product of two rotation matrices."""
+    columns = tuple(zip(*rotation2))
+    return tuple(tuple(sum(a*b for a, b in zip(row, column)) for column in columns) for row in rotation1)
+
+def _tree(shape):
+    if isinstance(shape, CompoundShape):
+        shape._refresh()
+        return shape._root
+    lower, upper = shape.aabb
+    return _Node(lower.coords, upper.coords, part=shape)
+
+def _overlap(node1, node2):
+    return all(l1 <= u2 and l2 <= u1 for l1, u1, l2, u2 in zip(node1.lower, node1.upper, node2.lower, node2.upper))
+
+def _volume(node):
+    return (node.upper[0] - node.lower[0])*(node.upper[1] - node.lower[1])*(node.upper[2] - node.lower[2])
+
+def candidate_parts(shape1, shape2):
+    """ Pairs of parts of two shapes whose bounding boxes overlap.
+
+    Descends both hierarchies, always splitting the larger of two internal nodes.
+
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+    Compound or convex shapes. A convex shape is its own single part.
+
+    RETURN
+    ------
+    : iterator(tuple(Shape, Shape))
+    """
+    stack = [(_tree(shape1), _tree(shape2))]
+    while stack:
+        node1, node2 = stack.pop()
+        if not _overlap(node1, node2):
+            continue
+        if node1.part is not None and node2.part is not None:
+            yield node1.part, node2.part
+        elif node2.part is not None or (node1.part is None and _volume(node1) >= _volume(node2)):
+            stack.append((node1.right, node2))
+            stack.append((node1.left, node2))
+        else:
+            stack.append((node1, node2.right))
+            stack.append((node1, node2.left))
+
+def compound_collide(shape1, shape2, collide=GJK):
+    """ Intersection test of compound shapes, stopping at the first pair of intersecting parts.
+
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+    Compound or convex shapes.
+
+    collide: callable(Shape, Shape) -> bool
+    Test run on the pairs of convex parts.
+
+    RETURN
+    ------
+    : bool
+    """
+    return any(_collide_parts(part1, part2, collide) for part1, part2 in candidate_parts(shape1, shape2))
+
+def colliding_parts(shape1, shape2, collide=GJK):
+    """ Every pair of intersecting parts of two compound shapes.
+
+    RETURN
+    ------
+    : list(tuple(Shape, Shape))
+    Convex parts, nested compound shapes being descended too.
+    """
+    pairs = []
+    for part1, part2 in candidate_parts(shape1, shape2):
+        if isinstance(part1, CompoundShape) or isinstance(part2, CompoundShape):
+            pairs.extend(colliding_parts(part1, part2, collide))
+        elif collide(part1, part2):
+            pairs.append((part1, part2))
+    return pairs
+
+def _collide_parts(part1, part2, collide):
+    if isinstance(part1, CompoundShape) or isinstance(part2, CompoundShape): # Nested compound
+        return compound_collide(part1, part2, collide)
+    return collide(part1, part2)
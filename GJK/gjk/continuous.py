@@ -0,0 +1,112 @@
+"""
+Continuous collision detection: time of impact of shapes moving between two positions.
+
+Discrete `GJK` tests at the start and end of a step miss the thin or fast shapes that pass through
+each other in between (tunneling). `time_of_impact` finds the first contact along the whole
+motion by conservative advancement: the distance between the shapes, divided by the speed at
+which they close in along the line of their closest points, is a time during which they cannot
+touch, so the shapes are advanced by it until they do.
+"""
+
+__author__ = "Abhijit Kale"
+
+from .geometry_basic import Point
+from .geometry_shapes import Shape
+from .GJK_algo import GJK_distance, MAX_ITERATIONS
+
+
+class _Moved(Shape):
+    """View of a shape translated by `offset`, leaving the shape itself in place."""
+
+    def __init__(self, shape):
+        self.shape = shape
+        self.offset = Point()
+
+    @property
+    def center(self):
+        return self.shape.center + self.offset
+
+    def support(self, direction):
+        return self.shape.support(direction).iadd(self.offset)
+
+
+def time_of_impact(shape1, shape2, end1, end2, tolerance=1e-6):
+    """ Earliest contact of two shapes moving linearly from their current centers to `end1` and `end2`.
+
+    Only the centers move. The rotations of the shapes are the same all along the motion. The
+    shapes are not modified.
+
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+
+    end{1, 2}: Point
+    Centers of the shapes at the end of the motion.
+
+    tolerance: float
+    Distance at which the shapes are considered in contact.
+
+    RETURN
+    ------
+    : float, None
+    Fraction of the motion, in [0, 1], at which the shapes come within `tolerance` of each other.
+    0 if they already do at the start, `None` if they do not before the end.
+    """
+    motion1, motion2 = end1 - shape1.center, end2 - shape2.center
+    if not _swept_boxes_overlap(shape1, motion1, shape2, motion2):
+        return None
+    contact = advance(shape1, shape2, motion1, motion2, 1.0, tolerance)
+    return contact[0] if contact is not None else None
+
+def advance(shape1, shape2, motion1, motion2, max_t, tolerance=1e-6):
+    """ Conservative advancement of two shapes translated by `motion{1, 2}` per unit of time.
+
+    PARAMETERS
+    ----------
+    shape{1, 2}: Shape
+
+    motion{1, 2}: Point
+    Translations of the shapes per unit of time.
+
+    max_t: float
+    End of the motion. May be infinite.
+
+    tolerance: float
+    Distance at which the shapes are considered in contact.
+
+    RETURN
+    ------
+    : (float, Point), None
+    Time of the contact, and the direction from `shape1` to `shape2` before they touched, of unit
+    length (zero for shapes in contact from the start). `None` without contact up to `max_t`.
+    """
+    relative_motion = motion2 - motion1 # Motion of shape2 seen from shape1
+    moved1, moved2 = _Moved(shape1), _Moved(shape2)
+
+    t = 0.0
+    normal = Point()
+    for _ in range(MAX_ITERATIONS):
+        moved1.offset = motion1*t
+        moved2.offset = motion2*t
+        distance, witness1, witness2 = GJK_distance(moved1, moved2)
+        if distance <= tolerance:
+            return t, normal
+
+        # The shapes close in by at most `closing` per unit of time along the direction of their closest points.
+        normal = (witness2 - witness1).imul(1/distance)
+        closing = -relative_motion.inner(normal)
+        if closing <= 0: # Moving apart along the separating direction. They never meet.
+            return None
+        t += distance/closing
+        if t > max_t:
+            return None
+
+    return t, normal # Still apart, but closer than the motion of the last steps can resolve
+
+def _swept_boxes_overlap(shape1, motion1, shape2, motion2):
+    """Whether the boxes swept by the bounding boxes of the shapes over their motions overlap."""
+    (lower1, upper1), (lower2, upper2) = shape1.aabb, shape2.aabb
+    for l1, u1, m1, l2, u2, m2 in zip(lower1.coords, upper1.coords, motion1.coords, lower2.coords, upper2.coords, motion2.coords):
+        if u1 + max(m1, 0.0) < l2 + min(m2, 0.0) or u2 + max(m2, 0.0) < l1 + min(m1, 0.0):
+            return False
+    return True
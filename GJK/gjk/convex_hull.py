@@ -0,0 +1,188 @@
+"""
+Convex hull of a set of points in 3D space.
+
+Quickhull: starting from a tetrahedron of extreme points, the hull is grown by the point furthest
+outside of a face, replacing the faces it can see with a fan of faces on their horizon. Used by
+`ConvexPolyhedron` to find the vertices of a mesh and the edges between them.
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+
+
+class _Face:
+    """Triangle of the hull, counterclockwise seen from outside."""
+
+    __slots__ = ("vertices", "normal", "offset", "outside", "alive")
+
+    def __init__(self, a, b, c, points):
+        self.vertices = (a, b, c)
+        self.normal = _cross(_sub(points[b], points[a]), _sub(points[c], points[a]))
+        length = math.sqrt(_dot(self.normal, self.normal))
+        if length:
+            self.normal = (self.normal[0]/length, self.normal[1]/length, self.normal[2]/length)
+        self.offset = _dot(self.normal, points[a])
+        self.outside = [] # Indices of the points above the face
+        self.alive = True
+
+    def height(self, point):
+        return _dot(self.normal, point) - self.offset
+
+    def edges(self):
+        a, b, c = self.vertices
+        return ((a, b), (b, c), (c, a))
+
+
+def convex_hull(points, tolerance=1e-10):
+    """ Convex hull of a set of points.
+
+    PARAMETERS
+    ----------
+    points: sequence(tuple(float, float, float))
+
+    tolerance: float
+    Points closer than `tolerance` times the size of the point set to a face of the hull are
+    considered on it.
+
+    RETURN
+    ------
+    : (list(int), list(tuple(int, int, int)), list(tuple(int, int)))
+    Indices in `points` of the vertices of the hull, its triangles counterclockwise seen from
+    outside, and its edges. Flat point sets give a polygon, a segment or a single point, without
+    triangles.
+    """
+    if not points:
+        raise ValueError("Expected at least one point")
+
+    lows = [min(point[k] for point in points) for k in range(3)]
+    highs = [max(point[k] for point in points) for k in range(3)]
+    eps = tolerance*max(max(abs(coord) for coord in lows + highs), 1.0)
+
+    # Initial simplex, grown from the extreme points along the widest axis
+    axis = max(range(3), key=lambda k: highs[k] - lows[k])
+    i0 = min(range(len(points)), key=lambda i: points[i][axis])
+    i1 = max(range(len(points)), key=lambda i: points[i][axis])
+    p0 = points[i0]
+    if highs[axis] - lows[axis] <= eps: # Single point
+        return [i0], [], []
+
+    line = _sub(points[i1], p0)
+    i2 = max(range(len(points)), key=lambda i: _norm2(_cross(_sub(points[i], p0), line)))
+    if math.sqrt(_norm2(_cross(_sub(points[i2], p0), line))/_norm2(line)) <= eps: # Segment
+        return sorted((i0, i1)), [], [(min(i0, i1), max(i0, i1))]
+
+    normal = _cross(line, _sub(points[i2], p0))
+    normal_length = math.sqrt(_norm2(normal))
+    i3 = max(range(len(points)), key=lambda i: abs(_dot(_sub(points[i], p0), normal)))
+    if abs(_dot(_sub(points[i3], p0), normal))/normal_length <= eps: # Polygon
+        return _polygon(points, p0, line, normal, eps)
+
+    faces = []
+    edges = {} # Directed edge (a, b) -> face holding it
+    simplex = (i0, i1, i2, i3)
+    for a, b, c, opposite in ((i0, i1, i2, i3), (i0, i3, i1, i2), (i1, i3, i2, i0), (i2, i3, i0, i1)):
+        face = _Face(a, b, c, points)
+        if face.height(points[opposite]) > 0:
+            face = _Face(a, c, b, points)
+        faces.append(face)
+    for face in faces:
+        for edge in face.edges():
+            edges[edge] = face
+
+    for i in range(len(points)):
+        if i not in simplex:
+            _assign(i, faces, points, eps)
+
+    pending = [face for face in faces if face.outside]
+    while pending:
+        face = pending.pop()
+        if not face.alive or not face.outside:
+            continue
+
+        eye = max(face.outside, key=lambda i: face.height(points[i]))
+        eye_point = points[eye]
+
+        # Faces seen from the eye point, and the edges on their horizon
+        visible = [face]
+        seen = {id(face)}
+        horizon = []
+        stack = [face]
+        while stack:
+            current = stack.pop()
+            for a, b in current.edges():
+                neighbour = edges[(b, a)]
+                if id(neighbour) in seen:
+                    continue
+                if neighbour.height(eye_point) > eps:
+                    seen.add(id(neighbour))
+                    visible.append(neighbour)
+                    stack.append(neighbour)
+                else:
+                    horizon.append((a, b))
+
+        orphans = []
+        for current in visible:
+            current.alive = False
+            orphans.extend(i for i in current.outside if i != eye)
+            for edge in current.edges():
+                del edges[edge]
+
+        new_faces = [_Face(a, b, eye, points) for a, b in horizon]
+        for new_face in new_faces:
+            for edge in new_face.edges():
+                edges[edge] = new_face
+        faces.extend(new_faces)
+
+        for i in orphans:
+            _assign(i, new_faces, points, eps)
+        pending.extend(new_face for new_face in new_faces if new_face.outside)
+
+    triangles = [face.vertices for face in faces if face.alive]
+    vertices = sorted({i for triangle in triangles for i in triangle})
+    hull_edges = sorted({(min(a, b), max(a, b)) for triangle in triangles for a, b in ((triangle[0], triangle[1]), (triangle[1], triangle[2]), (triangle[2], triangle[0]))})
+    return vertices, triangles, hull_edges
+
+def _assign(i, faces, points, eps):
+    """Add point `i` to the outside set of the first face it is above."""
+    point = points[i]
+    for face in faces:
+        if face.height(point) > eps:
+            face.outside.append(i)
+            return
+
+def _polygon(points, origin, line, normal, eps):
+    """Convex hull of coplanar points, by monotone chain in the coordinates of their plane."""
+    u = _scale(line, 1/math.sqrt(_norm2(line)))
+    v = _cross(_scale(normal, 1/math.sqrt(_norm2(normal))), u)
+    planar = sorted((_dot(_sub(point, origin), u), _dot(_sub(point, origin), v), i) for i, point in enumerate(points))
+
+    def chain(sequence):
+        hull = []
+        for point in sequence:
+            while len(hull) >= 2 and _turn(hull[-2], hull[-1], point) <= eps*eps:
+                hull.pop()
+            hull.append(point)
+        return hull[:-1]
+
+    ring = [i for _, _, i in chain(planar) + chain(reversed(planar))]
+    edges = sorted({(min(a, b), max(a, b)) for a, b in zip(ring, ring[1:] + ring[:1])})
+    return sorted(ring), [], edges
+
+def _turn(a, b, c):
+    return (b[0] - a[0])*(c[1] - a[1]) - (b[1] - a[1])*(c[0] - a[0])
+
+def _sub(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def _scale(a, k):
+    return (a[0]*k, a[1]*k, a[2]*k)
+
+def _dot(a, b):
+    return a[0]*b[0] + a[1]*b[1] + a[2]*b[2]
+
+def _norm2(a):
+    return a[0]*a[0] + a[1]*a[1] + a[2]*a[2]
+
+def _cross(a, b):
+    return (a[1]*b[2] - a[2]*b[1], a[2]*b[0] - a[0]*b[2], a[0]*b[1] - a[1]*b[0])
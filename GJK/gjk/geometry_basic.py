@@ -5,192 +5,373 @@ Defines basic geometric entities and operations.
 __author__ = "Abhijit Kale"
 
 import math
+import warnings
 
 class Point:
-    """Represents a point in 3D space"""
-    
-    def __init__(self, x=0, y=0, z=0):
-        self._coords = [x, y, z]
-    
+    """Represents a point in 3D space.
+
+    Coordinates are stored as three float fields. Operators (`+`, `-`, `*`, ...) return new points,
+    while the in-place methods (`iadd`, `isub`, `imul`, `ineg`, `normalize`, ...) modify the point
+    and return it, which avoids allocations in hot loops.
+
+    Derived values (`distance`, `get_normalized`) are evaluated on demand, so they always reflect
+    the current coordinates.
+    """
+
+    __slots__ = ("x", "y", "z")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = float(x)
+        self.y = float(y)
+        self.z = float(z)
+
     @property
     def coords(self):
-        return self._coords
-        
+        """Coordinates, as a new list. Modify the point through the setter or the fields."""
+        return [self.x, self.y, self.z]
+
     @coords.setter
-    def coords(self, *args):
-        if len(args) == 3:
-            self.set_coords_from_coords(*args)
-        elif len(args) == 1:
-            self.set_coords_from_point(*args)
+    def coords(self, value):
+        if isinstance(value, Point):
+            self.set_coords_from_point(value)
+        elif len(value) == 3:
+            self.set_coords_from_coords(*value)
         else:
             raise RuntimeError("Wrong number of arguments. Expecting a point or three coords.")
-    
+
     def set_coords_from_coords(self, x, y, z):
-        self._coords[:] = x, y, z
+        self.x = x
+        self.y = y
+        self.z = z
+        return self
     def set_coords_from_point(self, point):
-        self._coords[:] = point.coords
-    
+        self.x = point.x
+        self.y = point.y
+        self.z = point.z
+        return self
+
+    def copy(self):
+        return Point(self.x, self.y, self.z)
+
     @property
     def distance(self):
-        if hasattr(self, "_distance"): # Return if already exists.
-            return self._distance
-        else: # Evaluate and return.
-            self._distance = 0
-            for coord in self.coords:
-                self._distance += coord**2
-            self._distance = math.sqrt(self._distance)
-            return self._distance
-    
+        """Distance from the origin."""
+        return math.sqrt(self.x*self.x + self.y*self.y + self.z*self.z)
+
     def get_normalized(self):
-        if hasattr(self, "_direction"): # Return if already exists.
-            return self._direction
-        else:
-            self._direction = Point(*(coord/self.distance for coord in self.coords))
-            return self._direction
-    
+        distance = self.distance
+        return Point(self.x/distance, self.y/distance, self.z/distance)
+
+    def inner(self, other):
+        """Inner (dot) product, treating both points as arrows from the origin.
+
+        Unlike `Vec.dot`, the other point is not normalized.
+        """
+        return self.x*other.x + self.y*other.y + self.z*other.z
+
+    # In-place operations. Return `self` to allow chaining.
+
+    def iadd(self, other_point):
+        self.x += other_point.x
+        self.y += other_point.y
+        self.z += other_point.z
+        return self
+
+    def isub(self, other_point):
+        self.x -= other_point.x
+        self.y -= other_point.y
+        self.z -= other_point.z
+        return self
+
+    def imul(self, magnitude):
+        self.x *= magnitude
+        self.y *= magnitude
+        self.z *= magnitude
+        return self
+
+    def ineg(self):
+        self.x = -self.x
+        self.y = -self.y
+        self.z = -self.z
+        return self
+
+    def normalize(self):
+        """Scale to unit length in place."""
+        distance = self.distance
+        self.x /= distance
+        self.y /= distance
+        self.z /= distance
+        return self
+
     def __eq__(self, other_point):
-        return True if self.coords == other_point.coords else False
-    
+        return self.x == other_point.x and self.y == other_point.y and self.z == other_point.z
+
     def __neg__(self):
-        return Point(*(-coord for coord in self.coords))
-    
+        return Point(-self.x, -self.y, -self.z)
+
     def __add__(self, other_point):
-        return Point(*(coord1+coord2 for coord1, coord2 in zip(self.coords, other_point.coords)))
-    
+        return Point(self.x + other_point.x, self.y + other_point.y, self.z + other_point.z)
+
     def __sub__(self, other_point):
-        return self + (-other_point)
-    
+        return Point(self.x - other_point.x, self.y - other_point.y, self.z - other_point.z)
+
     def __mul__(self, magnitude):
-        return Point(*(coord*magnitude for coord in self.coords))
-    
+        return Point(self.x*magnitude, self.y*magnitude, self.z*magnitude)
+
     def __abs__(self):
-        return Point(*(abs(coord) for coord in self.coords))
-    
+        return Point(abs(self.x), abs(self.y), abs(self.z))
+
     def __round__(self, ndigits=0):
-        return Point(*(round(coord, ndigits) for coord in self.coords))
-        
+        return Point(round(self.x, ndigits), round(self.y, ndigits), round(self.z, ndigits))
+
     def __repr__(self):
-        return f"Point(*{self._coords})"
-    
+        return f"Point({self.x}, {self.y}, {self.z})"
 
-class Vec:
+
+class Vec(Point):
     """Represents a vector in 3D space.
-    
-    Internally stored as a start point and end point pair.
+
+    Built from a start point and an end point, but only the components (end - start) are stored,
+    so a vector shares the float fields and in-place operations of `Point`.
     """
-    
-    def __init__(self, start=Point(0,0,0), end=Point(0,0,0)):
-        self._start = start
-        self._end = end
-    
+
+    __slots__ = ()
+
+    def __init__(self, start=None, end=None):
+        if start is None:
+            start = _ORIGIN
+        if end is None:
+            end = _ORIGIN
+        self.x = end.x - start.x
+        self.y = end.y - start.y
+        self.z = end.z - start.z
+
     @property
     def start(self):
-        return self._start
+        """Deprecated. A vector only stores its components: it starts at the origin."""
+        warnings.warn("Vec.start is deprecated, vectors are stored as components starting at the origin", DeprecationWarning, stacklevel=2)
+        return Point()
     @start.setter
     def start(self, s):
-        self._start = s
-    
+        """Deprecated. Moves the start, keeping the end: the components become (end - s)."""
+        warnings.warn("Vec.start is deprecated, vectors are stored as components starting at the origin", DeprecationWarning, stacklevel=2)
+        self.isub(s)
+
     @property
     def end(self):
-        return self._end
+        """Deprecated. A vector only stores its components: it ends at them."""
+        warnings.warn("Vec.end is deprecated, use the components of the vector", DeprecationWarning, stacklevel=2)
+        return Point(self.x, self.y, self.z)
     @end.setter
     def end(self, e):
-        self._end = e
-    
+        warnings.warn("Vec.end is deprecated, use the components of the vector", DeprecationWarning, stacklevel=2)
+        self.set_coords_from_point(e)
+
+    @classmethod
+    def from_coords(cls, x, y, z):
+        vec = cls.__new__(cls)
+        vec.x = x
+        vec.y = y
+        vec.z = z
+        return vec
+
+    def copy(self):
+        return Vec.from_coords(self.x, self.y, self.z)
+
     @property
     def length(self):
-        if hasattr(self, "_length"): # Return if already exists.
-            return self._length
-        else: # Evaluate and return.
-            self._length = 0
-            for (s, e) in zip(self.start.coords, self.end.coords):
-                self._length += (e-s)**2
-            self._length = math.sqrt(self._length)
-            return self._length
-    
-    @property    
+        return self.distance
+
+    @property
     def direction(self):
         """Get vector direction.
-        
+
         Represented by a point on unit sphere.
-        
+
         RETURN
         ------
         : Point
         """
-        if hasattr(self, "_direction"): # Return if already exists.
-            return self._direction
-        else: # Evaluate and return.
-            self._direction = Point(*((e-s)/self.length for (s, e) in zip(self.start.coords, self.end.coords))) #TODO: length could go to zero
-            return self._direction
-    
+        return self.get_normalized() #TODO: length could go to zero
+
     def dot(self, vec):
         """Dot product with another vector
-        
+
+        Projection on the direction of `vec`, i.e. `dot_vec_dir(self, vec.direction)`. Use `inner`
+        for the plain product of the components.
+
         PARAMETERS
         ----------
         vec: Vec
         """
         return dot_vec_dir(self, vec.direction)
-    
+
     def cross(self, vec):
         """Cross product with another vector
-        
+
         PARAMETERS
         ----------
         vec: Vec
         """
-        self_arrow = self.end - self.start 
-        vec_arrow = vec.end - vec.start
-        
-        s_x, s_y, s_z = self_arrow.coords
-        v_x, v_y, v_z = vec_arrow.coords
-        
-        cross_coords = [s_y*v_z - s_z*v_y,
-                        s_z*v_x - s_x*v_z,
-                        s_x*v_y - s_y*v_x]
-                        
-        return Vec(Point(0, 0, 0), Point(*cross_coords))
-    
+        return self.cross_into(vec, Vec())
+
+    def cross_into(self, vec, out):
+        """Cross product with another vector, written into `out`.
+
+        PARAMETERS
+        ----------
+        vec: Vec
+
+        out [out]: Point
+        Receives the product. May be `self` or `vec`.
+
+        RETURN
+        ------
+        : Point
+        `out`
+        """
+        s_x, s_y, s_z = self.x, self.y, self.z
+        v_x, v_y, v_z = vec.x, vec.y, vec.z
+
+        out.x = s_y*v_z - s_z*v_y
+        out.y = s_z*v_x - s_x*v_z
+        out.z = s_x*v_y - s_y*v_x
+        return out
+
     def __repr__(self):
-        return f"Vec({self.start}, {self.end})"
-    
+        return f"Vec({self.x}, {self.y}, {self.z})"
+
+
+_ORIGIN = Point(0, 0, 0) # Read-only. Default start and end of vectors.
 
 def dot_dir_dir(direction1, direction2):
     """ Evaluates the dot product of a direction with another direction.
-    
+
     PARAMETERS
     ----------
     direction{1, 2}: Point
-    
+
     RETURN
     ------
     : float
     """
-    return sum((dir_coord1*dir_coord2 for dir_coord1, dir_coord2 in zip(direction1.coords, direction2.coords)))
+    return direction1.x*direction2.x + direction1.y*direction2.y + direction1.z*direction2.z
 
 def dot_vec_dir(vec, direction):
     """ Evaluates the dot product of a vector with a direction.
-    
+
     PARAMETERS
     ----------
     vec: Vec
-    
+
     direction: Point
-    
+
     RETURN
     ------
     : float
     """
-    return sum(((end_coord-start_coord)*dir_coord for start_coord, end_coord, dir_coord in zip(vec.start.coords, vec.end.coords, direction.coords)))
+    return vec.x*direction.x + vec.y*direction.y + vec.z*direction.z
 
 def triple_prod(vec1, vec2, vec3):
     """ Triple cross product (vec1 x vec2) x vec3.
-     
+
     PARAMETERS
     ----------
     vec{1, 2, 3}: Vec
     Vectors for triple cross product. Order is important
     """
-    cross_vec = vec1.cross(vec2)
-    return cross_vec.cross(vec3)
\ No newline at end of file
+    return triple_prod_into(vec1, vec2, vec3, Vec())
+
+def triple_prod_into(vec1, vec2, vec3, out):
+    """ Triple cross product (vec1 x vec2) x vec3, written into `out` without temporaries.
+
+    PARAMETERS
+    ----------
+    vec{1, 2, 3}: Vec
+    Vectors for triple cross product. Order is important
+
+    out [out]: Point
+    Receives the product. May be any of the inputs.
+
+    RETURN
+    ------
+    : Point
+    `out`
+    """
+    a_x, a_y, a_z = vec1.x, vec1.y, vec1.z
+    b_x, b_y, b_z = vec2.x, vec2.y, vec2.z
+
+    c_x = a_y*b_z - a_z*b_y
+    c_y = a_z*b_x - a_x*b_z
+    c_z = a_x*b_y - a_y*b_x
+
+    v_x, v_y, v_z = vec3.x, vec3.y, vec3.z
+
+    out.x = c_y*v_z - c_z*v_y
+    out.y = c_z*v_x - c_x*v_z
+    out.z = c_x*v_y - c_y*v_x
+    return out
+
+
+IDENTITY = ((1.0, 0.0, 0.0), (0.0, 1.0, 0.0), (0.0, 0.0, 1.0))
+
+def as_rotation(matrix, tolerance=1e-9):
+    """ Checks a rotation matrix.
+
+    PARAMETERS
+    ----------
+    matrix: sequence(sequence(float))
+    Rows of a 3x3 orthonormal matrix, of determinant 1.
+
+    tolerance: float
+    Accepted deviation of the products of the rows.
+
+    RETURN
+    ------
+    : tuple(tuple(float)), None
+    Rows of the matrix, or `None` for the identity.
+    """
+    rows = tuple(tuple(float(value) for value in row) for row in matrix)
+    if len(rows) != 3 or any(len(row) != 3 for row in rows):
+        raise ValueError("Expected the rows of a 3x3 matrix")
+    for i in range(3):
+        for j in range(3):
+            product = rows[i][0]*rows[j][0] + rows[i][1]*rows[j][1] + rows[i][2]*rows[j][2]
+            if abs(product - (i == j)) > tolerance:
+                raise ValueError("Rotation matrix must be orthonormal")
+    r0, r1, r2 = rows
+    if r0[0]*(r1[1]*r2[2] - r1[2]*r2[1]) - r0[1]*(r1[0]*r2[2] - r1[2]*r2[0]) + r0[2]*(r1[0]*r2[1] - r1[1]*r2[0]) < 0:
+        raise ValueError("Rotation matrix must not be a reflection")
+    return None if rows == IDENTITY else rows
+
+def rotation_from_quaternion(w, x, y, z):
+    """ Rotation matrix of a quaternion, normalized first.
+
+    RETURN
+    ------
+    : tuple(tuple(float))
+    Rows of the matrix.
+    """
+    norm = math.sqrt(w*w + x*x + y*y + z*z)
+    w, x, y, z = w/norm, x/norm, y/norm, z/norm
+    return ((1 - 2*(y*y + z*z), 2*(x*y - w*z), 2*(x*z + w*y)),
+            (2*(x*y + w*z), 1 - 2*(x*x + z*z), 2*(y*z - w*x)),
+            (2*(x*z - w*y), 2*(y*z + w*x), 1 - 2*(x*x + y*y)))
+
+def rotation_from_axis_angle(axis, angle):
+    """ Rotation matrix of a rotation by `angle` radians around `axis`, counterclockwise seen from its tip.
+
+    PARAMETERS
+    ----------
+    axis: Point
+    Needs not be normalized.
+
+    angle: float
+
+    RETURN
+    ------
+    : tuple(tuple(float))
+    Rows of the matrix.
+    """
+    s = math.sin(angle/2)/axis.distance
+    return rotation_from_quaternion(math.cos(angle/2), axis.x*s, axis.y*s, axis.z*s)
@@ -4,10 +4,35 @@ Shape library for GJK algorithm
 
 __author__ = "Abhijit Kale"
 
-from .geometry_basic import Point, dot_dir_dir
+import math
+
+try:
+    import numpy as np
+except ImportError: # Optional. Speeds up the cold starts of `ConvexPolyhedron.support`.
+    np = None
+
+from .geometry_basic import IDENTITY, Point, as_rotation, dot_dir_dir
+from .convex_hull import convex_hull
+
+def _rotate(rotation, point):
+    """New point, rotated by the rows of a rotation matrix."""
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = rotation
+    x, y, z = point.x, point.y, point.z
+    return Point(r00*x + r01*y + r02*z, r10*x + r11*y + r12*z, r20*x + r21*y + r22*z)
+
 
 class Shape:
-    """Interface for shape objects"""
+    """Interface for shape objects
+    
+    The geometry of a shape is defined in its local frame, around the origin. The transform of the
+    shape, its `center` (translation) and `rotation`, places it in the world frame. Moving or
+    rotating a shape only stores the new transform; the support rotates the direction into the
+    local frame, evaluates `local_support`, and transforms the result back.
+    """
+    
+    _aabb = None # Cached bounding box
+    _rotation = None # Rows of the rotation matrix, `None` for the identity
+    _version = 0 # Number of modifications
     
     def __init__(self):
         pass
@@ -16,6 +41,75 @@ class Shape:
     def center(self):
         pass
     
+    @property
+    def rotation(self):
+        """Rotation from the local frame to the world frame.
+        
+        Set from the rows of a 3x3 matrix, e.g. from `rotation_from_quaternion` or
+        `rotation_from_axis_angle`.
+        
+        RETURN
+        ------
+        : tuple(tuple(float))
+        Rows of the matrix.
+        """
+        return self._rotation or IDENTITY
+    @rotation.setter
+    def rotation(self, matrix):
+        self._rotation = as_rotation(matrix)
+        self.touch()
+    
+    @property
+    def version(self):
+        """Modification counter, increased by every call to `touch`.
+        
+        A shape with the same version as before has not been modified since, through its setters.
+        """
+        return self._version
+    
+    def touch(self):
+        """Mark the shape as modified.
+        
+        Called by the setters. Call it explicitly after modifying the center point in place.
+        """
+        self._version += 1
+        self._aabb = None
+    
+    def to_world(self, point):
+        """Position in the world frame of a point given in the local frame.
+        
+        RETURN
+        ------
+        : Point
+        """
+        rotation = self._rotation
+        if rotation is None:
+            return point + self.center
+        return _rotate(rotation, point).iadd(self.center)
+    
+    @property
+    def aabb(self):
+        """Axis-aligned bounding box, cached until the shape is modified.
+        
+        RETURN
+        ------
+        : tuple(Point, Point)
+        Lower and upper corners of the box.
+        """
+        if self._aabb is None:
+            self._aabb = self.calc_aabb()
+        return self._aabb
+    
+    def calc_aabb(self):
+        """Evaluate the axis-aligned bounding box.
+        
+        The default implementation queries the support along the six axis directions. Shapes
+        override it with a closed form.
+        """
+        lower = Point(self.support(Point(-1, 0, 0)).x, self.support(Point(0, -1, 0)).y, self.support(Point(0, 0, -1)).z)
+        upper = Point(self.support(Point(1, 0, 0)).x, self.support(Point(0, 1, 0)).y, self.support(Point(0, 0, 1)).z)
+        return (lower, upper)
+    
     def support(self, direction):
         """Find the support for the shape in the given direction
         
@@ -29,21 +123,54 @@ class Shape:
         : Point
         Support in the given direction
         """
-        pass
+        c = self.center
+        rotation = self._rotation
+        if rotation is None:
+            return self.local_support(direction).iadd(c)
+        
+        (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = rotation
+        dx, dy, dz = direction.x, direction.y, direction.z
+        point = self.local_support(Point(r00*dx + r10*dy + r20*dz, r01*dx + r11*dy + r21*dz, r02*dx + r12*dy + r22*dz))
+        x, y, z = point.x, point.y, point.z
+        return point.set_coords_from_coords(r00*x + r01*y + r02*z + c.x, r10*x + r11*y + r12*z + c.y, r20*x + r21*y + r22*z + c.z)
+    
+    def local_support(self, direction):
+        """Find the support of the shape in its local frame
+        
+        PARAMETERS
+        ----------
+        direction: Point
+        The direction for finding the support, in the local frame
+        
+        RETURN
+        ------
+        : Point
+        New point, free to be modified by the caller
+        """
+        raise NotImplementedError
     
 
 class Circle(Shape):
-    def __init__(self, radius, normal=Point(0,0,1), center=Point(0,0,0)):
-        self.center = center
+    def __init__(self, radius, normal=Point(0,0,1), center=None, rotation=None):
+        """
+        PARAMETERS
+        ----------
+        normal: Point
+        Normal of the disc, in the local frame.
+        """
+        self.center = Point() if center is None else center
         self.radius = radius
         self.normal = normal
+        if rotation is not None:
+            self.rotation = rotation
     
     @property
     def center(self):
         return self._center
     @center.setter
     def center(self, c):
-        self._center = c
+        self._center = c.copy() # Owned by the shape, so that moving it always goes through `touch`
+        self.touch()
     
     @property    
     def radius(self):
@@ -54,6 +181,7 @@ class Circle(Shape):
             raise ValueError("Radius must be positive")
         else:
             self._radius = r
+            self.touch()
     
     @property
     def normal(self):
@@ -61,30 +189,50 @@ class Circle(Shape):
     @normal.setter
     def normal(self, n):
         self._normal = n.get_normalized()
+        self.touch()
     
-    def support(self, direction):
+    def local_support(self, direction):
         """
         PARAMETERS
         ----------
         direction: Point
         Needs to be normalized (i.e. of unit length)
         """
-        projected_direction = direction - self._normal*dot_dir_dir(self._normal, direction) # direction on the circle plane.
-        projected_direction = projected_direction.get_normalized()
-        return self.center + projected_direction*self._radius
+        normal = self._normal
+        k = dot_dir_dir(normal, direction)
+        projected_direction = Point(direction.x - normal.x*k, direction.y - normal.y*k, direction.z - normal.z*k) # direction on the circle plane.
+        # Project again, as the rounding left along the normal dominates when the direction is close to it.
+        k = dot_dir_dir(normal, projected_direction)
+        projected_direction.set_coords_from_coords(projected_direction.x - normal.x*k, projected_direction.y - normal.y*k, projected_direction.z - normal.z*k)
+        if projected_direction.distance == 0: # Direction along the normal. Every point of the disc is a support. Take the center.
+            return projected_direction
+        projected_direction.normalize()
+        return projected_direction.imul(self._radius)
+    
+    def calc_aabb(self):
+        # Extent of the rim along an axis is r*sin(angle between the axis and the normal)
+        n = self._normal
+        if self._rotation is not None:
+            n = _rotate(self._rotation, n)
+        r = self._radius
+        extent = Point(r*math.sqrt(max(0.0, 1 - n.x*n.x)), r*math.sqrt(max(0.0, 1 - n.y*n.y)), r*math.sqrt(max(0.0, 1 - n.z*n.z)))
+        return (self._center - extent, self._center + extent)
     
 
 class Sphere(Shape):
-    def __init__(self, radius, center=Point(0,0,0)):
-        self.center = center
+    def __init__(self, radius, center=None, rotation=None):
+        self.center = Point() if center is None else center
         self.radius = radius
+        if rotation is not None:
+            self.rotation = rotation
     
     @property
     def center(self):
         return self._center
     @center.setter
     def center(self, c):
-        self._center = c
+        self._center = c.copy() # Owned by the shape, so that moving it always goes through `touch`
+        self.touch()
     
     @property    
     def radius(self):
@@ -95,22 +243,34 @@ class Sphere(Shape):
             raise ValueError("Radius must be positive")
         else:
             self._radius = r
+            self.touch()
     
-    def support(self, direction):
-        return self.center + direction*self.radius
+    def support(self, direction): # Unchanged by rotations
+        center, radius = self._center, self._radius
+        return Point(center.x + direction.x*radius, center.y + direction.y*radius, center.z + direction.z*radius)
+    
+    def local_support(self, direction):
+        radius = self._radius
+        return Point(direction.x*radius, direction.y*radius, direction.z*radius)
+    
+    def calc_aabb(self):
+        c, r = self._center, self._radius
+        return (Point(c.x - r, c.y - r, c.z - r), Point(c.x + r, c.y + r, c.z + r))
         
 
 class Cuboid(Shape):
-    def __init__(self, height, width, depth=0, center=Point(0,0,0)):
+    def __init__(self, height, width, depth=0, center=None, rotation=None):
         """"
         PARAMETERS
         ----------
         height, width, depth: int, float
-        Dimension along x-axis, y-axis, and z-axis respectively
+        Dimension along x-axis, y-axis, and z-axis respectively, of the local frame
         """
-        self._center = center # by-pass setter method, since it calls calc_vertices which needs both `_center` and `_dims` attributes to be set.
+        self._vertices = None
+        self.center = Point() if center is None else center
         self.dims = (height, width, depth)
-        self.calc_vertices()
+        if rotation is not None:
+            self.rotation = rotation
     
     @property
     def dims(self):
@@ -122,10 +282,19 @@ class Cuboid(Shape):
             raise ValueError(f"Dimensions must be positive. Given height={h}, width={w}, depth={d}")
         else:
             self._dims = (h, w, d)
-            self.calc_vertices()
+            self._half_dims = (h/2, w/2, d/2)
+            self.touch()
     
     @property 
     def vertices(self):
+        """Vertices of the top and bottom faces (along z in the local frame), evaluated on first access after a change.
+        
+        RETURN
+        ------
+        : list(list(Point))
+        """
+        if self._vertices is None:
+            self.calc_vertices()
         return self._vertices
     @vertices.setter
     def vertices(self):
@@ -136,17 +305,18 @@ class Cuboid(Shape):
         return self._center
     @center.setter
     def center(self, c):
-        self._center = c
-        self.calc_vertices()
+        self._center = c.copy() # Owned by the shape, so that moving it always goes through `touch`
+        self.touch()
+    
+    def touch(self):
+        self._vertices = None
+        super().touch()
              
     def calc_vertices(self):
-        cx, cy, cz = self.center.coords
-        delta_x, delta_y, delta_z = (dim/2 for dim in self.dims)
+        delta_x, delta_y, delta_z = self._half_dims
         
-        top_z, bottom_z = cz+delta_z, cz-delta_z 
-        
-        self._vertices = [self.get_face_vertices(cx, cy, top_z, delta_x, delta_y),
-                         self.get_face_vertices(cx, cy, bottom_z, delta_x, delta_y)]
+        self._vertices = [[self.to_world(vertex) for vertex in self.get_face_vertices(0.0, 0.0, delta_z, delta_x, delta_y)],
+                          [self.to_world(vertex) for vertex in self.get_face_vertices(0.0, 0.0, -delta_z, delta_x, delta_y)]]
     
     def get_face_vertices(self, c1, c2, c3, delta_1, delta_2): # order: tr, tl, br, bl
         face_vertices = [Point(c1+delta_1, c2+delta_2, c3),
@@ -155,13 +325,132 @@ class Cuboid(Shape):
                         Point(c1-delta_1, c2-delta_2, c3)]
         return face_vertices
     
-    def support(self, direction):
-        d_x, d_y, d_z = direction.coords
-        vertices = self.vertices
+    def local_support(self, direction):
+        hx, hy, hz = self._half_dims
+        return Point(hx if direction.x > 0 else -hx, hy if direction.y > 0 else -hy, hz if direction.z > 0 else -hz)
+    
+    def calc_aabb(self):
+        c = self._center
+        hx, hy, hz = self._half_dims
+        if self._rotation is not None: # Extent of the rotated box along each axis
+            (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = self._rotation
+            hx, hy, hz = (abs(r00)*hx + abs(r01)*hy + abs(r02)*hz,
+                          abs(r10)*hx + abs(r11)*hy + abs(r12)*hz,
+                          abs(r20)*hx + abs(r21)*hy + abs(r22)*hz)
+        return (Point(c.x - hx, c.y - hy, c.z - hz), Point(c.x + hx, c.y + hy, c.z + hz))
+
+    
+    
+
+class ConvexPolyhedron(Shape):
+    """Convex hull of a set of vertices, e.g. the vertices of a convex mesh.
+    
+    The hull and the graph of its edges are built once. The support is found by hill climbing
+    along the edges from the previous support vertex, which takes a few steps when the direction
+    changes little between calls. The first call scans all the vertices instead (vectorized when
+    NumPy is available).
+    """
+    
+    def __init__(self, vertices, center=None, rotation=None):
+        """
+        PARAMETERS
+        ----------
+        vertices: sequence(Point)
+        Points inside the hull are dropped.
+        
+        center: Point, optional
+        Reference point moved by the `center` setter, and origin of the local frame. Defaults to
+        the mean of the hull vertices.
         
-        face = vertices[0] if d_z > 0 else vertices[1]
-        side = face[:2] if d_y > 0 else face[2:]
-        vertex = side[0] if d_x > 0 else side[1]
+        rotation: sequence(sequence(float)), optional
+        Rotation applied to the vertices around the center.
+        """
+        points = [(vertex.x, vertex.y, vertex.z) for vertex in vertices]
+        indices, self._faces, edges = convex_hull(points)
+        hull = [points[i] for i in indices]
+        
+        if center is None:
+            center = Point(*(sum(point[k] for point in hull)/len(hull) for k in range(3)))
+        cx, cy, cz = center.coords
+        self._xs = [x - cx for x, _, _ in hull] # Offsets of the vertices from the center
+        self._ys = [y - cy for _, y, _ in hull]
+        self._zs = [z - cz for _, _, z in hull]
+        self._offsets = np.array([self._xs, self._ys, self._zs]) if np is not None else None
+        
+        # Edge graph, in positions of `hull`
+        position = {index: k for k, index in enumerate(indices)}
+        neighbours = [[] for _ in hull]
+        for a, b in edges:
+            neighbours[position[a]].append(position[b])
+            neighbours[position[b]].append(position[a])
+        self._neighbours = [tuple(vertex_neighbours) for vertex_neighbours in neighbours]
+        self._faces = [tuple(position[i] for i in face) for face in self._faces]
+        self._last = None # Position of the previous support vertex
+        
+        self.center = center
+        if rotation is not None:
+            self.rotation = rotation
+    
+    @property
+    def center(self):
+        return self._center
+    @center.setter
+    def center(self, c):
+        self._center = c.copy() # Owned by the shape, so that moving it always goes through `touch`
+        self.touch()
+    
+    @property
+    def vertices(self):
+        """Vertices of the hull.
+        
+        RETURN
+        ------
+        : list(Point)
+        """
+        return [self.to_world(Point(x, y, z)) for x, y, z in zip(self._xs, self._ys, self._zs)]
+    
+    @property
+    def faces(self):
+        """Triangles of the hull, as indices in `vertices`, counterclockwise seen from outside.
         
-        return vertex
+        Empty for a flat hull.
+        """
+        return list(self._faces)
+    
+    def local_support(self, direction):
+        xs, ys, zs = self._xs, self._ys, self._zs
+        dx, dy, dz = direction.x, direction.y, direction.z
+        
+        i = self._last
+        if i is None:
+            i = self._scan(dx, dy, dz)
+        best = xs[i]*dx + ys[i]*dy + zs[i]*dz
+        
+        # On a convex hull, a vertex without better neighbours is the support.
+        neighbours = self._neighbours
+        while True:
+            climb = i
+            for j in neighbours[i]:
+                value = xs[j]*dx + ys[j]*dy + zs[j]*dz
+                if value > best:
+                    best, climb = value, j
+            if climb == i:
+                break
+            i = climb
+        
+        self._last = i
+        return Point(xs[i], ys[i], zs[i])
+    
+    def _scan(self, dx, dy, dz):
+        """Position of the support vertex, checking all the vertices."""
+        if self._offsets is not None:
+            return int(np.argmax(dx*self._offsets[0] + dy*self._offsets[1] + dz*self._offsets[2]))
+        xs, ys, zs = self._xs, self._ys, self._zs
+        return max(range(len(xs)), key=lambda i: xs[i]*dx + ys[i]*dy + zs[i]*dz)
     
+    def calc_aabb(self):
+        if self._rotation is not None:
+            return super().calc_aabb()
+        c = self._center
+        return (Point(c.x + min(self._xs), c.y + min(self._ys), c.z + min(self._zs)),
+                Point(c.x + max(self._xs), c.y + max(self._ys), c.z + max(self._zs)))
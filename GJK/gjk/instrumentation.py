@@ -0,0 +1,189 @@
+"""
+Optional instrumentation of the GJK hot path.
+
+While `instrument()` is active, the functions of the hot path (`support`, `GJK_loop` and the
+simplex handlers) are replaced in the modules that call them by wrappers feeding a `GJKStats`
+object. The originals are put back on exit, so the instrumentation costs nothing when it is off.
+
+    with instrument() as stats:
+        world.query_pairs()
+    print(stats.snapshot())
+
+References bound before `instrument()` is entered (e.g. `from gjk.GJK_algo import support`) are
+not instrumented. `GJK` itself is counted through the loop it runs.
+"""
+
+__author__ = "Abhijit Kale"
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from . import GJK_algo, warm_start
+from .geometry_basic import Vec
+
+# Modules whose references to the hot path functions are swapped
+_MODULES = (GJK_algo, warm_start)
+
+_active = None # Stats of the active instrumentation
+
+
+class GJKStats:
+    """Counters collected while instrumented.
+
+    ATTRIBUTES
+    ----------
+    support_calls: Counter
+    Support evaluations per shape type name, counting both shapes of every evaluation.
+
+    iterations: Counter
+    Histogram of the support evaluations of the GJK loop until it terminated.
+
+    calls: Counter
+    Calls per phase (`support`, `loop`, `line_case`, `triangle_case`, `tetrahedron_case`).
+
+    time_ns: Counter
+    Time spent per phase, in nanoseconds. Includes the phases called from it, e.g. `loop`
+    includes the support evaluations and the simplex handlers.
+
+    degenerate: Counter
+    Exits on degenerate configurations: `coincident_centers`, `origin_support` (the origin is a
+    support point), `collinear_origin` (origin on the line of the simplex), `collinear_triangle`
+    and `iteration_cap` (cycling on rounding errors, see `GJK_algo.MAX_ITERATIONS`).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.support_calls = Counter()
+        self.iterations = Counter()
+        self.calls = Counter()
+        self.time_ns = Counter()
+        self.degenerate = Counter()
+
+    @property
+    def queries(self):
+        return self.calls["loop"]
+
+    def snapshot(self):
+        """Copy of the counters, as plain dictionaries.
+
+        RETURN
+        ------
+        : dict
+        """
+        return {
+            "queries": self.queries,
+            "support_calls": dict(self.support_calls),
+            "iterations": dict(sorted(self.iterations.items())),
+            "calls": dict(self.calls),
+            "time_ns": dict(self.time_ns),
+            "degenerate": dict(self.degenerate),
+        }
+
+
+@contextmanager
+def instrument(stats=None):
+    """ Instrument the GJK hot path within a `with` block.
+
+    PARAMETERS
+    ----------
+    stats: GJKStats, optional
+    Stats to add the counts to. A new one is created if not given.
+
+    RETURN
+    ------
+    : GJKStats
+    Bound by the `with` statement.
+    """
+    global _active
+    if _active is not None:
+        raise RuntimeError("GJK instrumentation is already active")
+
+    stats = stats if stats is not None else GJKStats()
+    originals = {name: getattr(GJK_algo, name) for name in _wrappers}
+    swapped = []
+    for module in _MODULES:
+        for name, original in originals.items():
+            if getattr(module, name, None) is original:
+                setattr(module, name, _wrappers[name](original, stats))
+                swapped.append((module, name, original))
+
+    _active = stats
+    try:
+        yield stats
+    finally:
+        for module, name, original in swapped:
+            setattr(module, name, original)
+        _active = None
+
+
+def _timed(phase, original, stats):
+    clock = time.perf_counter_ns
+    def wrapper(*args):
+        start = clock()
+        try:
+            return original(*args)
+        finally:
+            stats.calls[phase] += 1
+            stats.time_ns[phase] += clock() - start
+    return wrapper
+
+def _wrap_support(original, stats):
+    timed = _timed("support", original, stats)
+    support_calls = stats.support_calls
+    def support(shape1, shape2, direction, out=None):
+        support_calls[type(shape1).__name__] += 1
+        support_calls[type(shape2).__name__] += 1
+        return timed(shape1, shape2, direction, out)
+    return support
+
+def _wrap_initial_direction(original, stats):
+    def initial_direction(shape1, shape2):
+        if Vec(shape1.center, shape2.center).length == 0:
+            stats.degenerate["coincident_centers"] += 1
+        return original(shape1, shape2)
+    return initial_direction
+
+def _wrap_loop(original, stats):
+    timed = _timed("loop", original, stats)
+    def GJK_loop(shape1, shape2, simplex, direction, directions=None):
+        intersect, iterations = timed(shape1, shape2, simplex, direction, directions)
+        stats.iterations[iterations] += 1
+        if iterations == 0:
+            stats.degenerate["origin_support"] += 1
+        elif iterations >= GJK_algo.MAX_ITERATIONS:
+            stats.degenerate["iteration_cap"] += 1
+        return intersect, iterations
+    return GJK_loop
+
+def _wrap_line_case(original, stats):
+    timed = _timed("line_case", original, stats)
+    def line_case(simplex, direction):
+        intersect = timed(simplex, direction)
+        if intersect: # Only exit of the line case
+            stats.degenerate["collinear_origin"] += 1
+        return intersect
+    return line_case
+
+def _wrap_triangle_case(original, stats):
+    timed = _timed("triangle_case", original, stats)
+    def triangle_case(simplex, direction):
+        A, B, C = simplex
+        if Vec(C, A).cross(Vec(C, B)).length == 0:
+            stats.degenerate["collinear_triangle"] += 1
+        return timed(simplex, direction)
+    return triangle_case
+
+def _wrap_tetrahedron_case(original, stats):
+    return _timed("tetrahedron_case", original, stats)
+
+_wrappers = {
+    "support": _wrap_support,
+    "initial_direction": _wrap_initial_direction,
+    "GJK_loop": _wrap_loop,
+    "line_case": _wrap_line_case,
+    "triangle_case": _wrap_triangle_case,
+    "tetrahedron_case": _wrap_tetrahedron_case,
+}
@@ -0,0 +1,212 @@
+"""
+Collision queries spread over a pool of processes.
+
+Pure Python `GJK` holds the GIL, so a single process uses a single core. The shapes of the pairs
+are packed once into a shared memory block, in the structure-of-arrays layout of
+`batch.ShapeBuffer`, together with the indices of the pairs. Worker processes attach to the block,
+rebuild the shapes they need from the arrays (nothing but the block name and its layout is
+pickled), run `GJK` on chunks of the pairs, and send the results back as packed bits. A
+`ParallelCollider` keeps the processes and the block from one call to the next.
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .batch import ShapeBuffer, SPHERE, CIRCLE
+from .geometry_basic import Point
+from .geometry_shapes import Circle, Sphere, Cuboid
+from .GJK_algo import GJK
+
+# Tasks per worker when the chunk size is not given, to even out the load.
+TASKS_PER_WORKER = 4
+
+_ALIGNMENT = 8
+
+
+def parallel_collide(pairs, workers=None, chunksize=None):
+    """ GJK intersection tests of many pairs, over a pool of processes.
+
+    The pool is started and shut down by the call. Use a `ParallelCollider` to keep it between
+    calls.
+
+    PARAMETERS
+    ----------
+    pairs: sequence(tuple(Shape, Shape))
+    Pairs to test. Supported shapes are `Sphere`, `Circle` and `Cuboid`.
+
+    workers: int, optional
+    Number of processes. Defaults to the number of CPUs. With a single worker, the pairs are
+    tested in the calling process.
+
+    chunksize: int, optional
+    Number of pairs per task. Defaults to `TASKS_PER_WORKER` tasks per worker.
+
+    RETURN
+    ------
+    : ndarray of bool
+    `True` at index `i` if the shapes of `pairs[i]` intersect.
+    """
+    with ParallelCollider(workers) as collider:
+        return collider.collide(pairs, chunksize)
+
+
+class ParallelCollider:
+    """Pool of processes for repeated collision queries, e.g. once per simulation frame.
+
+    The worker processes and the shared memory block are kept from one call of `collide` to the
+    next. Each call writes its shapes and pairs into the block, replacing it by a larger one only
+    when they do not fit, and the workers drop the shapes rebuilt from the previous contents.
+    Use as a context manager, or call `close`.
+    """
+
+    def __init__(self, workers=None):
+        """
+        PARAMETERS
+        ----------
+        workers: int, optional
+        Number of processes, started on the first call. Defaults to the number of CPUs. With a
+        single worker, the pairs are tested in the calling process.
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._block = None
+        self._generation = 0 # Number of writes to the block, to tell the workers its contents changed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Stop the worker processes and free the shared memory block."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+        if self._block is not None:
+            self._block.close()
+            self._block.unlink()
+            self._block = None
+
+    def collide(self, pairs, chunksize=None):
+        """ GJK intersection tests of many pairs. See `parallel_collide`.
+
+        The shapes are packed again on every call, so they may have moved since the previous one.
+        """
+        if self.workers <= 1 or not pairs:
+            return np.array([GJK(shape1, shape2) for shape1, shape2 in pairs], dtype=bool)
+
+        layout = self._write(_pack(pairs))
+        m = len(pairs)
+        chunksize = chunksize or max(1, math.ceil(m/(self.workers*TASKS_PER_WORKER)))
+        starts = range(0, m, chunksize)
+        stops = [min(start + chunksize, m) for start in starts]
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(self.workers)
+        tasks = len(starts)
+        chunks = list(self._pool.map(_collide_chunk, [self._block.name]*tasks, [self._generation]*tasks, [layout]*tasks, starts, stops))
+
+        return np.concatenate([np.unpackbits(np.frombuffer(bits, dtype=np.uint8), count=stop - start).astype(bool)
+                               for bits, start, stop in zip(chunks, starts, stops)])
+
+    def _write(self, arrays):
+        """Copy arrays into the shared memory block, replaced by a larger one if they do not fit.
+
+        RETURN
+        ------
+        : list(tuple(str, str, tuple, int))
+        The name, dtype, shape and offset of each array in the block.
+        """
+        layout, offset = [], 0
+        for name, array in arrays.items():
+            layout.append((name, array.dtype.str, array.shape, offset))
+            offset += -(-array.nbytes//_ALIGNMENT)*_ALIGNMENT
+
+        if self._block is None or self._block.size < offset:
+            size = max(offset, 1)
+            if self._block is not None:
+                size = max(size, 2*self._block.size) # Room to grow, for scenes growing over the calls
+                self._block.close()
+                self._block.unlink() # Workers attached to it still map it, until they move to the new one
+            self._block = shared_memory.SharedMemory(create=True, size=size)
+        for (name, dtype, shape, offset), array in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self._block.buf, offset=offset)[...] = array
+        self._generation += 1
+        return layout
+
+
+def _pack(pairs):
+    """Arrays of the shapes of the pairs, in the `ShapeBuffer` layout, and of the indices of the pairs."""
+    # Each shape is packed once, however many pairs it is part of
+    shapes, index = [], {}
+    pair_index = np.empty((2, len(pairs)), dtype=np.int64)
+    for k, pair in enumerate(pairs):
+        for side, shape in enumerate(pair):
+            i = index.get(shape)
+            if i is None:
+                i = index[shape] = len(shapes)
+                shapes.append(shape)
+            pair_index[side, k] = i
+    buf = ShapeBuffer(shapes)
+
+    return {"kind": buf.kind, "center": buf.center, "radius": buf.radius, "half_dims": buf.half_dims,
+            "normal": buf.normal, "rotation": buf.rotation, "rotated": buf.rotated, "pairs": pair_index}
+
+def _views(block, layout):
+    return {name: np.ndarray(shape, dtype=dtype, buffer=block.buf, offset=offset) for name, dtype, shape, offset in layout}
+
+
+# Worker process state, set by `_attach`
+_block = None
+_generation = None
+_arrays = None
+_shapes = None
+
+def _attach(name, generation, layout):
+    """Views of the current contents of the block, attached to first if it is new to the process."""
+    global _block, _generation, _arrays, _shapes
+    _arrays = _shapes = None # Views of the previous block, which cannot be closed while they exist
+    if _block is not None and _block.name != name:
+        _block.close()
+        _block = None
+    if _block is None:
+        _block = shared_memory.SharedMemory(name=name)
+    _arrays = _views(_block, layout)
+    _shapes = [None]*len(_arrays["kind"]) # Rebuilt on first use
+    _generation = generation
+
+def _shape(i):
+    shape = _shapes[i]
+    if shape is None:
+        shape = _shapes[i] = _rebuild(_arrays, i)
+    return shape
+
+def _rebuild(arrays, i):
+    """Shape `i` of the shared arrays, with the same coordinates as the packed shape."""
+    kind = arrays["kind"][i]
+    center = Point(*arrays["center"][:, i].tolist())
+    if kind == SPHERE:
+        shape = Sphere(radius=float(arrays["radius"][i]), center=center)
+    elif kind == CIRCLE:
+        shape = Circle(radius=float(arrays["radius"][i]), center=center)
+        shape._normal = Point(*arrays["normal"][:, i].tolist()) # Already of unit length. Normalizing again may round it differently.
+    else:
+        height, width, depth = (2*half for half in arrays["half_dims"][:, i].tolist()) # Exact
+        shape = Cuboid(height=height, width=width, depth=depth, center=center)
+    if arrays["rotated"][i]:
+        shape.rotation = arrays["rotation"][:, :, i].tolist()
+    return shape
+
+def _collide_chunk(name, generation, layout, start, stop):
+    """Test pairs `start` to `stop` of the shared arrays. Returns the results as packed bits."""
+    if generation != _generation or _block is None or _block.name != name:
+        _attach(name, generation, layout)
+    first, second = _arrays["pairs"][:, start:stop].tolist()
+    hits = [GJK(_shape(i), _shape(j)) for i, j in zip(first, second)]
+    return np.packbits(hits).tobytes()
@@ -0,0 +1,132 @@
+"""
+Ray casting against shapes.
+
+A ray is cast as a point moving along it, by conservative advancement towards the shape
+(`continuous.advance`), so any shape with a support function can be hit. The batched variant
+culls the shapes whose bounding boxes a ray misses with vectorized slab tests, and casts each ray
+against its remaining shapes from the nearest box on, until a hit is nearer than the next box.
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+
+import numpy as np
+
+from .geometry_basic import Point
+from .geometry_shapes import Sphere
+from .continuous import advance
+
+# Rays tested at once against all the bounding boxes, to bound the memory used by the slab tests.
+CHUNK_SIZE = 4096
+
+
+def raycast(shape, origin, direction, max_t=math.inf, tolerance=1e-6):
+    """ First hit of a ray on a shape.
+
+    PARAMETERS
+    ----------
+    shape: Shape
+
+    origin, direction: Point
+    The ray is `origin + direction*t` for `t` in [0, `max_t`]. `t` is a distance if `direction`
+    is of unit length.
+
+    max_t: float
+
+    tolerance: float
+    Distance to the surface at which the ray is considered to hit it.
+
+    RETURN
+    ------
+    : (float, Point), None
+    `t` of the hit and the normal of the surface there, of unit length. Rays starting inside the
+    shape hit at 0, with a zero normal. `None` if the ray misses the shape.
+    """
+    if not _ray_hits_box(shape.aabb, origin.coords, direction.coords, max_t):
+        return None
+    return advance(shape, Sphere(radius=0, center=origin), Point(), direction, max_t, tolerance)
+
+def raycast_batch(shapes, origins, directions, max_t=math.inf, tolerance=1e-6):
+    """ Nearest hits of many rays on a list of shapes.
+
+    PARAMETERS
+    ----------
+    shapes: sequence(Shape)
+
+    origins, directions: array_like(n, 3)
+    Rays, as in `raycast`.
+
+    max_t: float
+
+    tolerance: float
+
+    RETURN
+    ------
+    : (ndarray(n,), ndarray(n, 3), ndarray(n,) of int)
+    `t` of the nearest hit of each ray (infinite on a miss), the normal of the surface there (zero
+    on a miss), and the index of the shape hit (-1 on a miss).
+    """
+    origins = np.asarray(origins, dtype=float).reshape(-1, 3)
+    directions = np.asarray(directions, dtype=float).reshape(-1, 3)
+    if origins.shape != directions.shape:
+        raise ValueError(f"Got {len(origins)} origins for {len(directions)} directions")
+
+    n = len(origins)
+    hit_t = np.full(n, np.inf)
+    normals = np.zeros((n, 3))
+    hit_shape = np.full(n, -1, dtype=np.intp)
+    if not shapes:
+        return hit_t, normals, hit_shape
+
+    boxes = [shape.aabb for shape in shapes]
+    lower = np.array([box[0].coords for box in boxes])
+    upper = np.array([box[1].coords for box in boxes])
+
+    for start in range(0, n, CHUNK_SIZE):
+        stop = min(start + CHUNK_SIZE, n)
+        entry, exit = _slabs(lower, upper, origins[start:stop], directions[start:stop])
+        candidates = (entry <= exit) & (entry <= max_t)
+        for k in np.flatnonzero(candidates.any(axis=1)):
+            i = start + k
+            origin, direction = Point(*origins[i].tolist()), Point(*directions[i].tolist())
+            indices = np.flatnonzero(candidates[k])
+            best = max_t
+            for j in indices[np.argsort(entry[k, indices], kind="stable")].tolist():
+                if entry[k, j] > best: # Boxes further away cannot hold a nearer hit
+                    break
+                contact = advance(shapes[j], Sphere(radius=0, center=origin), Point(), direction, best, tolerance)
+                if contact is not None and contact[0] < hit_t[i]:
+                    best = hit_t[i] = contact[0]
+                    normals[i] = contact[1].coords
+                    hit_shape[i] = j
+
+    return hit_t, normals, hit_shape
+
+def _slabs(lower, upper, origins, directions):
+    """Entry and exit `t` of rays (m, 3) through boxes (k, 3), as (m, k) arrays. Entry is clamped at 0."""
+    o = origins[:, None, :]
+    d = directions[:, None, :]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        inverse = 1/d
+        t1 = (lower - o)*inverse
+        t2 = (upper - o)*inverse
+    # Rays parallel to a slab are inside it for all t, or never.
+    parallel = d == 0
+    inside = (lower <= o) & (o <= upper)
+    near = np.where(parallel, np.where(inside, -np.inf, np.inf), np.minimum(t1, t2))
+    far = np.where(parallel, np.where(inside, np.inf, -np.inf), np.maximum(t1, t2))
+    return np.maximum(near.max(axis=2), 0.0), far.min(axis=2)
+
+def _ray_hits_box(box, origin, direction, max_t):
+    entry, exit = 0.0, max_t
+    for low, high, o, d in zip(box[0].coords, box[1].coords, origin, direction):
+        if d == 0:
+            if o < low or o > high:
+                return False
+            continue
+        t1, t2 = (low - o)/d, (high - o)/d
+        entry, exit = max(entry, min(t1, t2)), min(exit, max(t1, t2))
+        if entry > exit:
+            return False
+    return True
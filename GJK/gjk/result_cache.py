@@ -0,0 +1,100 @@
+"""
+Memoization of intersection tests on unchanged pairs of shapes.
+
+Most shapes of a scene do not move between two frames, and neither do most of the answers. Every
+`Shape` counts its modifications (`Shape.version`), so an answer stored with the versions of both
+shapes is still valid as long as neither version changed, and is returned without evaluating a
+single support point.
+"""
+
+__author__ = "Abhijit Kale"
+
+from collections import OrderedDict
+
+from .GJK_algo import GJK
+
+
+class ResultCache:
+    """Least recently used cache of intersection answers, keyed on the identity and version of both shapes.
+
+    The order of the shapes in a pair does not matter. The cache holds references to the shapes of
+    the answers it stores, so that their ids cannot be reused by other shapes meanwhile. Answers
+    for older versions of a pair are not looked up again, and are left to be evicted.
+
+    Use `cache.query` in place of `GJK`, e.g. `CollisionWorld(collide=cache.query)`.
+
+    PARAMETERS
+    ----------
+    maxsize: int
+    Number of answers kept. The least recently used answer is evicted first.
+
+    collide: callable(Shape, Shape) -> bool
+    Test run on the pairs without a valid answer.
+    """
+
+    def __init__(self, maxsize=4096, collide=GJK):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive. Given {maxsize}")
+
+        self.maxsize = maxsize
+        self.collide = collide
+        self._results = OrderedDict() # (id1, version1, id2, version2) -> (shape1, shape2, answer), least recently used first
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._results)
+
+    def clear(self):
+        """Forget every answer. The statistics are kept."""
+        self._results.clear()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def stats(self):
+        """Counters of the queries since the last `reset_stats`.
+
+        RETURN
+        ------
+        : dict
+        """
+        queries = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits/queries if queries else 0.0,
+        }
+
+    def query(self, shape1, shape2):
+        """ Intersection test, answered from the cache if neither shape changed since the last one.
+
+        PARAMETERS
+        ----------
+        shape{1, 2}: Shape
+
+        RETURN
+        ------
+        : bool
+        Signifies if the given shapes intersect or not.
+        """
+        first, second = (shape1, shape2) if id(shape1) <= id(shape2) else (shape2, shape1)
+        key = (id(first), first._version, id(second), second._version)
+        results = self._results
+        entry = results.get(key)
+
+        if entry is not None:
+            self.hits += 1
+            results.move_to_end(key)
+            return entry[2]
+
+        self.misses += 1
+        intersect = self.collide(shape1, shape2)
+        results[key] = (first, second, intersect)
+        if len(results) > self.maxsize:
+            results.popitem(last=False)
+            self.evictions += 1
+        return intersect
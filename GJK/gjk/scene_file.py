@@ -0,0 +1,292 @@
+"""
+Compact binary scene files, loaded by memory mapping.
+
+A scene file holds a typed header, a table of the shapes in their original order, and one block
+of packed float records per shape kind:
+
+    header      magic "GJKS", version, float size (4 or 8), number of shapes, offset of the table,
+                and the number and offset of the records of each kind
+    table       (kind, record) pairs of uint32, one per shape
+    spheres     center(3), radius (rotations do not change spheres, and are not stored)
+    circles     center(3), radius, normal(3), rotation(9)
+    cuboids     center(3), half dimensions(3), rotation(9)
+
+`SceneFile` maps the file and hands out views of the records: shapes whose fields are read from
+the mapped file on access, so opening a scene reads nothing but the header, whatever its size.
+The views are read-only instances of `Sphere`, `Circle` and `Cuboid`, usable anywhere the shapes
+are. All the values are little-endian.
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+import mmap
+import struct
+import sys
+from array import array
+
+from .geometry_basic import IDENTITY, Point
+from .geometry_shapes import Circle, Cuboid, Sphere
+
+MAGIC = b"GJKS"
+VERSION = 1
+
+SPHERE, CIRCLE, CUBOID = 0, 1, 2
+_KINDS = ((Sphere, SPHERE), (Circle, CIRCLE), (Cuboid, CUBOID)) # Checked in order, so that views are packed too
+RECORD_SIZES = {SPHERE: 4, CIRCLE: 16, CUBOID: 15} # In floats
+
+# magic, version, float size, number of shapes, offset of the table, (number of records, offset) per kind
+_HEADER = struct.Struct("<4sHH2Q" + "2Q"*len(RECORD_SIZES))
+_TYPECODES = {4: "f", 8: "d"}
+_ALIGNMENT = 8
+_UNIT_TOLERANCE = 1e-12 # Normals of records this close to unit length are kept as they are
+
+
+def write_scene(path, shapes, float_size=8):
+    """ Write shapes to a scene file.
+
+    PARAMETERS
+    ----------
+    path: str
+
+    shapes: sequence(Shape)
+    `Sphere`, `Circle` and `Cuboid` shapes, or views of them.
+
+    float_size: int
+    8 for float64 records, exact. 4 for float32 records, half the size, with the geometry rounded
+    to single precision.
+    """
+    _check_byteorder()
+    try:
+        typecode = _TYPECODES[float_size]
+    except KeyError:
+        raise ValueError(f"Float size must be 4 or 8, got {float_size}") from None
+
+    table = array("I")
+    records = {kind: array(typecode) for kind in RECORD_SIZES}
+    for shape in shapes:
+        kind, values = record(shape)
+        table.extend((kind, len(records[kind])//RECORD_SIZES[kind]))
+        records[kind].extend(values)
+
+    offset = _aligned(_HEADER.size)
+    table_offset = offset
+    offset = _aligned(offset + table.itemsize*len(table))
+    blocks = []
+    for kind in sorted(RECORD_SIZES):
+        blocks.append((len(records[kind])//RECORD_SIZES[kind], offset))
+        offset = _aligned(offset + float_size*len(records[kind]))
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, float_size, len(table)//2, table_offset, *(value for block in blocks for value in block)))
+        for data, (_, data_offset) in [(table, (None, table_offset))] + [(records[kind], block) for kind, block in zip(sorted(RECORD_SIZES), blocks)]:
+            file.write(b"\0"*(data_offset - file.tell()))
+            data.tofile(file)
+
+
+class SceneFile:
+    """Memory mapped scene file, as a read-only sequence of shape views.
+
+    Views are created on access and read their fields from the mapped file. The file stays open
+    until `close` is called (or the `with` block ends), after which the views cannot be used.
+    """
+
+    def __init__(self, path):
+        _check_byteorder()
+        with open(path, "rb") as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._open(path)
+        except Exception:
+            self._mmap.close()
+            raise
+
+    def _open(self, path):
+        if len(self._mmap) < _HEADER.size:
+            raise ValueError(f"Not a scene file: {path} is too short")
+        magic, version, float_size, count, table_offset, *blocks = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            raise ValueError(f"Not a scene file: {path} has bad magic {magic!r}")
+        if version != VERSION:
+            raise ValueError(f"Unsupported scene file version {version} in {path}")
+        if float_size not in _TYPECODES:
+            raise ValueError(f"Unsupported float size {float_size} in {path}")
+
+        # Checked before any view is taken: the mapping cannot be closed while views of it exist
+        extents = [(table_offset, 8*count)]
+        extents += [(blocks[2*kind + 1], float_size*RECORD_SIZES[kind]*blocks[2*kind]) for kind in sorted(RECORD_SIZES)]
+        if any(offset + size > len(self._mmap) for offset, size in extents):
+            raise ValueError(f"Truncated scene file: {path}")
+
+        self._buffer = memoryview(self._mmap)
+        self.float_size = float_size
+        self._table = self._buffer[table_offset:table_offset + 8*count].cast("I")
+        self._records = {}
+        for kind, (offset, size) in zip(sorted(RECORD_SIZES), extents[1:]):
+            self._records[kind] = self._buffer[offset:offset + size].cast(_TYPECODES[float_size])
+
+    def __len__(self):
+        return len(self._table)//2
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("Shape index out of range")
+        kind, row = self._table[2*i], self._table[2*i + 1]
+        return _VIEWS[kind](self._records[kind], row*RECORD_SIZES[kind])
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+    def count(self, kind):
+        """Number of shapes of a kind (`SPHERE`, `CIRCLE` or `CUBOID`)."""
+        return len(self._records[kind])//RECORD_SIZES[kind]
+
+    def close(self):
+        for records in self._records.values():
+            records.release()
+        self._table.release()
+        self._buffer.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record(shape):
+    """ Record of a shape, as stored in scene files.
+
+    RETURN
+    ------
+    : (int, list(float))
+    Kind of the shape, and the `RECORD_SIZES[kind]` values of its record.
+    """
+    kind = _kind(shape)
+    values = list(shape.center.coords)
+    if kind == SPHERE:
+        values.append(shape.radius)
+    elif kind == CIRCLE:
+        values.append(shape.radius)
+        values.extend(shape.normal.coords)
+        values.extend(value for row in shape.rotation for value in row)
+    else:
+        values.extend(shape._half_dims)
+        values.extend(value for row in shape.rotation for value in row)
+    return kind, values
+
+def from_record(kind, values):
+    """ New shape from its record, the inverse of `record`.
+
+    Records may come from other processes: a circle normal not of unit length is normalized, and
+    a zero normal raises `ValueError`.
+
+    RETURN
+    ------
+    : Shape
+    """
+    center = Point(*values[:3])
+    if kind == SPHERE:
+        return Sphere(radius=values[3], center=center)
+    elif kind == CIRCLE:
+        shape = Circle(radius=values[3], center=center)
+        normal = Point(*values[4:7])
+        length = normal.distance
+        if not 0 < length < math.inf: # Also rejects NaN
+            raise ValueError(f"Invalid circle normal: {normal}")
+        if abs(length - 1) <= _UNIT_TOLERANCE:
+            shape._normal = normal # Already of unit length, as recorded. Normalizing again may round it differently.
+        else:
+            shape.normal = normal
+        rows = values[7:16]
+    elif kind == CUBOID:
+        shape = Cuboid(*(2*half for half in values[3:6]), center=center) # Exact
+        rows = values[6:15]
+    else:
+        raise ValueError(f"Unknown shape kind: {kind}")
+    if _rotation(rows, 0) is not None:
+        shape.rotation = (rows[0:3], rows[3:6], rows[6:9])
+    return shape
+
+def _kind(shape):
+    for shape_type, kind in _KINDS:
+        if isinstance(shape, shape_type):
+            return kind
+    raise TypeError(f"Unsupported shape type for scene files: {type(shape).__name__}")
+
+def _aligned(offset):
+    return -(-offset//_ALIGNMENT)*_ALIGNMENT
+
+def _check_byteorder():
+    if sys.byteorder != "little":
+        raise NotImplementedError("Scene files are only supported on little-endian hosts")
+
+def _rotation(data, base):
+    rows = (tuple(data[base:base + 3]), tuple(data[base + 3:base + 6]), tuple(data[base + 6:base + 9]))
+    return None if rows == IDENTITY else rows
+
+
+# Views. The private fields of the shapes are read from the records, so that the methods of the
+# shapes work unchanged on them. Having no setters, the fields cannot be modified.
+
+class _View:
+    def __init__(self, data, base):
+        self._data = data
+        self._base = base
+
+    @property
+    def _center(self):
+        data, base = self._data, self._base
+        return Point(data[base], data[base + 1], data[base + 2])
+
+
+class SphereView(_View, Sphere):
+    @property
+    def _radius(self):
+        return self._data[self._base + 3]
+
+
+class CircleView(_View, Circle):
+    @property
+    def _radius(self):
+        return self._data[self._base + 3]
+
+    @property
+    def _normal(self):
+        data, base = self._data, self._base
+        return Point(data[base + 4], data[base + 5], data[base + 6])
+
+    def __init__(self, data, base):
+        super().__init__(data, base)
+        self._rows = _rotation(data, base + 7) # Read once. Rebuilding the rows on every support costs more than the query.
+
+    @property
+    def _rotation(self):
+        return self._rows
+
+
+class CuboidView(_View, Cuboid):
+    _vertices = None
+
+    @property
+    def _half_dims(self):
+        data, base = self._data, self._base
+        return (data[base + 3], data[base + 4], data[base + 5])
+
+    @property
+    def _dims(self):
+        return tuple(2*half for half in self._half_dims) # Exact
+
+    def __init__(self, data, base):
+        super().__init__(data, base)
+        self._rows = _rotation(data, base + 6)
+
+    @property
+    def _rotation(self):
+        return self._rows
+
+
+_VIEWS = {SPHERE: SphereView, CIRCLE: CircleView, CUBOID: CuboidView}
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Collision query service: a world of shapes held by one process, queried by others over a Unix
+socket or localhost TCP.
+
+Messages are binary frames: a header (message type, request id, payload size) followed by the
+payload. Shapes travel as the records of the scene files (`scene_file.record`), float64.
+
+    UPDATE      (id uint32, kind uint8, record float64 * RECORD_SIZES[kind]) * n  -> OK
+    REMOVE      id uint32 * n                                                  -> OK
+    QUERY       (id1 uint32, id2 uint32) * n                                   -> RESULT, n bits
+    ERROR       UTF-8 message, in answer to an invalid request
+
+Requests are pipelined: a client may send many requests before reading the answers, which carry
+the id of their request and may come back out of order. Queries run on an executor, against the
+shapes of the world when the query was received. Updates replace the shapes instead of moving
+them, so later updates do not affect the queries still running.
+
+Usage:
+    python -m gjk.service (--unix PATH | --port PORT)
+"""
+
+__author__ = "Abhijit Kale"
+
+import argparse
+import asyncio
+import itertools
+import struct
+
+from .GJK_algo import GJK
+from .scene_file import RECORD_SIZES, from_record, record
+
+# Message types
+UPDATE, REMOVE, QUERY = 1, 2, 3
+OK, RESULT, ERROR = 0x81, 0x82, 0xFF
+
+_HEADER = struct.Struct("<BII") # type, request id, payload size
+_ID = struct.Struct("<I")
+_ENTRY = struct.Struct("<IB") # id, kind of an updated shape
+_RECORDS = {kind: struct.Struct(f"<{size}d") for kind, size in RECORD_SIZES.items()}
+
+MAX_PAYLOAD = 1 << 28
+
+
+class ServiceError(RuntimeError):
+    """Error reported by the service in answer to a request."""
+
+
+def encode_update(shapes):
+    """ Payload of an `UPDATE` message.
+
+    PARAMETERS
+    ----------
+    shapes: dict(int, Shape)
+    New shapes, by id.
+
+    RETURN
+    ------
+    : bytes
+    """
+    parts = []
+    for shape_id, shape in shapes.items():
+        kind, values = record(shape)
+        parts.append(_ENTRY.pack(shape_id, kind))
+        parts.append(_RECORDS[kind].pack(*values))
+    return b"".join(parts)
+
+def decode_update(payload):
+    """Shapes of an `UPDATE` payload, by id."""
+    shapes, offset = {}, 0
+    while offset < len(payload):
+        shape_id, kind = _ENTRY.unpack_from(payload, offset)
+        offset += _ENTRY.size
+        if kind not in _RECORDS:
+            raise ValueError(f"Unknown shape kind: {kind}")
+        shapes[shape_id] = from_record(kind, _RECORDS[kind].unpack_from(payload, offset))
+        offset += _RECORDS[kind].size
+    return shapes
+
+def _pack_ids(ids):
+    return struct.pack(f"<{len(ids)}I", *ids)
+
+def _unpack_ids(payload):
+    if len(payload) % _ID.size:
+        raise ValueError("Payload is not a whole number of ids")
+    return struct.unpack(f"<{len(payload)//_ID.size}I", payload)
+
+def _pack_bits(values):
+    bits = bytearray((len(values) + 7)//8)
+    for i, value in enumerate(values):
+        if value:
+            bits[i >> 3] |= 0x80 >> (i & 7) # Most significant bit first, like `numpy.packbits`
+    return _ID.pack(len(values)) + bytes(bits)
+
+def _unpack_bits(payload):
+    count, = _ID.unpack_from(payload)
+    bits = payload[_ID.size:]
+    return [bool(bits[i >> 3] & (0x80 >> (i & 7))) for i in range(count)]
+
+async def _read_frame(reader):
+    """Next frame of a stream, or `None` at its end."""
+    try:
+        header = await reader.readexactly(_HEADER.size)
+    except asyncio.IncompleteReadError as error:
+        if error.partial:
+            raise
+        return None
+    message_type, request_id, size = _HEADER.unpack(header)
+    if size > MAX_PAYLOAD:
+        raise ValueError(f"Payload of {size} bytes exceeds the limit of {MAX_PAYLOAD}")
+    return message_type, request_id, await reader.readexactly(size)
+
+def _write_frame(writer, message_type, request_id, payload=b""):
+    writer.write(_HEADER.pack(message_type, request_id, len(payload)) + payload)
+
+
+class CollisionServer:
+    """World of shapes answering collision queries from clients.
+
+    PARAMETERS
+    ----------
+    executor: concurrent.futures.Executor, optional
+    Executor running the queries. Defaults to the default executor of the event loop.
+
+    collide: callable(Shape, Shape) -> bool
+    Test run on the queried pairs.
+    """
+
+    def __init__(self, executor=None, collide=GJK):
+        self.shapes = {} # id -> Shape
+        self.executor = executor
+        self.collide = collide
+        self._server = None
+
+    async def start(self, path=None, host="127.0.0.1", port=0):
+        """ Listen on a Unix socket if `path` is given, on TCP otherwise.
+
+        RETURN
+        ------
+        : str, tuple(str, int)
+        Address listened on. With `port=0`, the port is picked by the system.
+        """
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._serve, path)
+        else:
+            self._server = await asyncio.start_server(self._serve, host, port)
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self):
+        await self._server.serve_forever()
+
+    async def close(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        pending = set()
+        try:
+            while True:
+                frame = await _read_frame(reader)
+                if frame is None:
+                    break
+                message_type, request_id, payload = frame
+                try:
+                    if message_type == UPDATE:
+                        self.shapes.update(decode_update(payload))
+                        _write_frame(writer, OK, request_id)
+                    elif message_type == REMOVE:
+                        for shape_id in _unpack_ids(payload):
+                            self.shapes.pop(shape_id, None)
+                        _write_frame(writer, OK, request_id)
+                    elif message_type == QUERY:
+                        ids = _unpack_ids(payload)
+                        if len(ids) % 2:
+                            raise ValueError("Query payload holds an odd number of ids")
+                        pairs = [(self._shape(i), self._shape(j)) for i, j in zip(ids[::2], ids[1::2])] # Shapes as of now
+                        task = asyncio.create_task(self._query(writer, request_id, pairs))
+                        pending.add(task)
+                        task.add_done_callback(pending.discard)
+                    else:
+                        raise ValueError(f"Unknown message type: {message_type}")
+                except (ValueError, KeyError, struct.error) as error:
+                    _write_frame(writer, ERROR, request_id, str(error).encode())
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass # Dropped connection, or broken framing. Nothing to answer to.
+        finally:
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            writer.close()
+
+    def _shape(self, shape_id):
+        try:
+            return self.shapes[shape_id]
+        except KeyError:
+            raise KeyError(f"Unknown shape id: {shape_id}") from None
+
+    async def _query(self, writer, request_id, pairs):
+        collide = self.collide
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, lambda: [collide(shape1, shape2) for shape1, shape2 in pairs])
+        except Exception as error: # Raised by a shape. Answered, so that the client does not wait forever.
+            _write_frame(writer, ERROR, request_id, str(error).encode())
+        else:
+            _write_frame(writer, RESULT, request_id, _pack_bits(results))
+        await writer.drain()
+
+
+class CollisionClient:
+    """Client of a `CollisionServer`. Concurrent calls are pipelined on a single connection."""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiting = {} # request id -> future of the answer
+        self._receiver = asyncio.create_task(self._receive())
+
+    @classmethod
+    async def connect(cls, path=None, host="127.0.0.1", port=None):
+        """Connect to a server on a Unix socket if `path` is given, on TCP otherwise."""
+        if path is not None:
+            reader, writer = await asyncio.open_unix_connection(path)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def update(self, shapes):
+        """ Add or replace shapes of the world.
+
+        PARAMETERS
+        ----------
+        shapes: dict(int, Shape)
+        `Sphere`, `Circle` and `Cuboid` shapes, by id.
+        """
+        await self._request(UPDATE, encode_update(shapes))
+
+    async def remove(self, ids):
+        await self._request(REMOVE, _pack_ids(list(ids)))
+
+    async def query(self, pairs):
+        """ Intersection tests of pairs of shapes of the world.
+
+        PARAMETERS
+        ----------
+        pairs: sequence(tuple(int, int))
+        Ids of the shapes.
+
+        RETURN
+        ------
+        : list(bool)
+        """
+        payload = await self._request(QUERY, _pack_ids([shape_id for pair in pairs for shape_id in pair]))
+        return _unpack_bits(payload)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        await self._receiver
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _request(self, message_type, payload):
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        _write_frame(self._writer, message_type, request_id, payload)
+        await self._writer.drain()
+        return await future
+
+    async def _receive(self):
+        try:
+            while True:
+                frame = await _read_frame(self._reader)
+                if frame is None:
+                    break
+                message_type, request_id, payload = frame
+                future = self._waiting.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if message_type == ERROR:
+                    future.set_exception(ServiceError(payload.decode()))
+                else:
+                    future.set_result(payload)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Connection to the collision service closed"))
+            self._waiting.clear()
+
+
+async def serve(path=None, host="127.0.0.1", port=0):
+    server = CollisionServer()
+    address = await server.start(path, host, port)
+    print(f"Serving on {address}", flush=True)
+    await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    address = parser.add_mutually_exclusive_group(required=True)
+    address.add_argument("--unix", help="Path of the Unix socket to listen on")
+    address.add_argument("--port", type=int, help="Localhost TCP port to listen on")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(path=args.unix, port=args.port or 0))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
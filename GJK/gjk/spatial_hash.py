@@ -0,0 +1,280 @@
+"""
+Uniform grid spatial hash for collision queries.
+
+Space is divided into cubic cells of a fixed size, and every shape is registered in the cells
+covered by its axis-aligned bounding box. The cells are kept in a dictionary keyed by their
+integer coordinates, so only occupied cells take memory. Shapes that do not share a cell cannot
+intersect, and only the pairs sharing a cell are handed to the narrow phase (`GJK`).
+
+Unlike sweep and prune (`broadphase`), the cost does not depend on how many shapes share a
+coordinate along an axis, which suits large scenes of similarly sized, tiled objects.
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+
+from .GJK_algo import GJK
+
+# In auto-tuned mode the cell size follows the mean size of the boxes, times this factor.
+CELL_SIZE_FACTOR = 2.0
+
+
+class _Entry:
+    """Book-keeping for one shape of the index."""
+
+    __slots__ = ("shape", "handle", "cells", "lower", "upper")
+
+    def __init__(self, shape, handle):
+        self.shape = shape
+        self.handle = handle # Insertion order. Used to order the shapes in pairs.
+        self.cells = None # Inclusive range of cell coordinates, ((i0, j0, k0), (i1, j1, k1))
+        self.lower = self.upper = None # Bounding box as coordinate tuples
+
+
+class SpatialHash:
+    """Spatial hash of shapes keyed on integer cell coordinates.
+
+    Shapes are keyed by identity. After moving or resizing a shape through its setters, call
+    `move`. If its center point was modified in place, call `shape.touch()` first so that the
+    cached bounding box is recomputed.
+
+    PARAMETERS
+    ----------
+    cell_size: float, optional
+    Edge length of the cells. If not given, it is tuned to the mean size of the bounding boxes,
+    and re-tuned (rehashing every shape) when that mean drifts by more than a factor of two.
+
+    collide: callable(Shape, Shape) -> bool
+    Narrow phase test run on the candidate pairs.
+    """
+
+    def __init__(self, cell_size=None, collide=GJK):
+        if cell_size is not None and cell_size <= 0:
+            raise ValueError(f"Cell size must be positive. Given {cell_size}")
+
+        self.collide = collide
+        self.auto_tune = cell_size is None
+        self._cell_size = cell_size
+        self._cells = {} # (i, j, k) -> list(_Entry)
+        self._entries = {} # shape -> _Entry
+        self._next_handle = 0
+        self._extent_sum = 0.0 # Sum of the largest box dimension of every shape, for auto-tuning
+
+    @classmethod
+    def from_shapes(cls, shapes, cell_size=None, collide=GJK):
+        index = cls(cell_size, collide)
+        if cell_size is None: # Tune once up front instead of while inserting
+            shapes = list(shapes)
+            index._cell_size = index._tuned_size(sum(map(_box_extent, shapes)), len(shapes))
+        for shape in shapes:
+            index.insert(shape)
+        return index
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, shape):
+        return shape in self._entries
+
+    @property
+    def shapes(self):
+        return list(self._entries)
+
+    @property
+    def cell_size(self):
+        return self._cell_size
+
+    @cell_size.setter
+    def cell_size(self, size):
+        if size <= 0:
+            raise ValueError(f"Cell size must be positive. Given {size}")
+        self.auto_tune = False
+        self._rehash(size)
+
+    def tune(self):
+        """Set the cell size from the current shapes and rehash them."""
+        if self._entries:
+            self._rehash(self._tuned_size(self._extent_sum, len(self._entries)))
+
+    def insert(self, shape):
+        """Add a shape to the index."""
+        if shape in self._entries:
+            raise ValueError("Shape already in the index")
+
+        entry = _Entry(shape, self._next_handle)
+        self._next_handle += 1
+        self._extent_sum += _box_extent(shape)
+
+        if self._cell_size is None:
+            self._cell_size = self._tuned_size(self._extent_sum, 1)
+        else:
+            self._retune_if_drifted(len(self._entries) + 1) # Before placing the new shape on possibly too fine a grid
+        self._entries[shape] = entry
+        self._place(entry)
+
+    def remove(self, shape):
+        """Remove a shape from the index."""
+        entry = self._entries.pop(shape)
+        self._extent_sum -= _box_extent(shape, entry)
+        self._unlink(entry, entry.cells)
+
+    def move(self, shape):
+        """Update the cells of a shape of the index after it moved or changed size.
+
+        Shapes staying within the same cells only have their bounding box refreshed.
+        """
+        entry = self._entries[shape]
+        self._extent_sum += _box_extent(shape) - _box_extent(shape, entry)
+        if self._retune_if_drifted(len(self._entries)): # Placed every shape anew
+            return
+
+        old_cells = entry.cells
+        self._place(entry, link=False)
+        if entry.cells != old_cells:
+            self._unlink(entry, old_cells)
+            self._link(entry)
+
+    def query_point(self, point):
+        """Shapes whose bounding box contains the point.
+
+        RETURN
+        ------
+        : list(Shape)
+        """
+        if not self._entries:
+            return []
+
+        coords = point.coords
+        cell = tuple(math.floor(coord/self._cell_size) for coord in coords)
+        return [entry.shape for entry in self._cells.get(cell, ())
+                if all(low <= coord <= high for low, coord, high in zip(entry.lower, coords, entry.upper))]
+
+    def query_aabb(self, lower, upper):
+        """Shapes whose bounding box overlaps the given box.
+
+        PARAMETERS
+        ----------
+        lower, upper: Point
+        Lower and upper corners of the box.
+
+        RETURN
+        ------
+        : list(Shape)
+        """
+        if not self._entries:
+            return []
+
+        lower, upper = lower.coords, upper.coords
+        found = {}
+        for cell in _cells_between(*self._cell_range(lower, upper)):
+            for entry in self._cells.get(cell, ()):
+                if entry.handle not in found and _overlap(entry.lower, entry.upper, lower, upper):
+                    found[entry.handle] = entry.shape
+        return list(found.values())
+
+    def candidate_pairs(self):
+        """Pairs of shapes sharing a cell, with overlapping bounding boxes.
+
+        RETURN
+        ------
+        : list(tuple(Shape, Shape))
+        """
+        pairs = []
+        for cell, entries in self._cells.items():
+            n = len(entries)
+            for a in range(n):
+                entry1 = entries[a]
+                for b in range(a + 1, n):
+                    entry2 = entries[b]
+                    if not _overlap(entry1.lower, entry1.upper, entry2.lower, entry2.upper):
+                        continue
+                    # A pair sharing several cells is reported only from the first of them.
+                    first = tuple(map(max, entry1.cells[0], entry2.cells[0]))
+                    if cell == first:
+                        pairs.append((entry1.shape, entry2.shape) if entry1.handle < entry2.handle else (entry2.shape, entry1.shape))
+        return pairs
+
+    def query_pairs(self):
+        """Pairs of intersecting shapes.
+
+        Only the candidate pairs (see `candidate_pairs`) are passed to the narrow phase.
+
+        RETURN
+        ------
+        : list(tuple(Shape, Shape))
+        """
+        collide = self.collide
+        return [(shape1, shape2) for shape1, shape2 in self.candidate_pairs() if collide(shape1, shape2)]
+
+    def _tuned_size(self, extent_sum, count):
+        size = CELL_SIZE_FACTOR*extent_sum/count
+        return size if size > 0 else 1.0
+
+    def _retune_if_drifted(self, count):
+        """Rehash in auto-tuned mode if the tuned cell size drifted by more than a factor of two.
+
+        Rehashing every shape is amortized over the insertions or moves needed to cause the drift.
+        Returns `True` if rehashed.
+        """
+        if self.auto_tune and count:
+            size = self._tuned_size(self._extent_sum, count)
+            if not 0.5 <= size/self._cell_size <= 2:
+                self._rehash(size)
+                return True
+        return False
+
+    def _rehash(self, size):
+        self._cell_size = size
+        self._cells = {}
+        for entry in self._entries.values():
+            self._place(entry)
+
+    def _cell_range(self, lower, upper):
+        """Coordinates of the first and last cells covering a box."""
+        size = self._cell_size
+        return (tuple(math.floor(coord/size) for coord in lower),
+                tuple(math.floor(coord/size) for coord in upper))
+
+    def _place(self, entry, link=True):
+        lower, upper = entry.shape.aabb
+        entry.lower, entry.upper = lower.coords, upper.coords
+        entry.cells = self._cell_range(entry.lower, entry.upper)
+        if link:
+            self._link(entry)
+
+    def _link(self, entry):
+        cells = self._cells
+        for cell in _cells_between(*entry.cells):
+            bucket = cells.get(cell)
+            if bucket is None:
+                cells[cell] = [entry]
+            else:
+                bucket.append(entry)
+
+    def _unlink(self, entry, cell_range):
+        cells = self._cells
+        for cell in _cells_between(*cell_range):
+            bucket = cells[cell]
+            bucket.remove(entry)
+            if not bucket:
+                del cells[cell]
+
+
+def _cells_between(first, last):
+    (i0, j0, k0), (i1, j1, k1) = first, last
+    return ((i, j, k) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1) for k in range(k0, k1 + 1))
+
+def _overlap(lower1, upper1, lower2, upper2):
+    return (lower1[0] <= upper2[0] and lower2[0] <= upper1[0] and
+            lower1[1] <= upper2[1] and lower2[1] <= upper1[1] and
+            lower1[2] <= upper2[2] and lower2[2] <= upper1[2])
+
+def _box_extent(shape, entry=None):
+    """Largest dimension of the bounding box of a shape, or of the box stored in its entry."""
+    if entry is None:
+        lower, upper = shape.aabb
+        lower, upper = lower.coords, upper.coords
+    else:
+        lower, upper = entry.lower, entry.upper
+    return max(high - low for low, high in zip(lower, upper))
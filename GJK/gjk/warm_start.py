@@ -0,0 +1,168 @@
+"""
+Warm-started GJK queries across simulation frames.
+
+Between two frames the shapes of a pair barely move, and so do the final simplex and search
+direction of the GJK algorithm. `SimplexCache` keeps them per pair of shapes, and the next query
+on the pair starts from them instead of the direction between the centers:
+
+* If the pair was disjoint, the last direction is a separating axis. One support evaluation
+  along it is enough to tell that the pair is still disjoint.
+* If the pair intersected, the final simplex is rebuilt from the directions its points were
+  found in. If it still contains the origin, the pair still intersects.
+
+Otherwise the usual iterations are run from the support point found along the cached direction.
+"""
+
+__author__ = "Abhijit Kale"
+
+from collections import OrderedDict
+
+from .GJK_algo import support, initial_direction, simplex_contains_origin, GJK_loop
+
+
+class _PairState:
+    """Final state of the last query on a pair of shapes."""
+
+    __slots__ = ("direction", "directions", "intersect")
+
+    def __init__(self, direction, directions, intersect):
+        self.direction = direction # Last search direction
+        self.directions = directions # Directions in which the points of the final simplex were found
+        self.intersect = intersect
+
+
+class SimplexCache:
+    """Least recently used cache of the final GJK state per pair of shapes.
+
+    Pairs are keyed by the identity of the shapes, in order, as the Minkowski difference of
+    (shape1, shape2) is the opposite of the one of (shape2, shape1). The cache holds references to
+    the shapes of the pairs it stores, up to `maxsize` pairs.
+
+    Queries are run with `GJK(shape1, shape2, warm_start=cache)`, or `cache.query(shape1, shape2)`.
+
+    PARAMETERS
+    ----------
+    maxsize: int
+    Number of pairs kept. The least recently queried pair is evicted first.
+    """
+
+    def __init__(self, maxsize=1024):
+        if maxsize < 1:
+            raise ValueError(f"Cache size must be positive. Given {maxsize}")
+
+        self.maxsize = maxsize
+        self._pairs = OrderedDict() # (shape1, shape2) -> _PairState, least recently used first
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._pairs)
+
+    def __contains__(self, pair):
+        return tuple(pair) in self._pairs
+
+    def clear(self):
+        """Forget every pair. The statistics are kept."""
+        self._pairs.clear()
+
+    def discard(self, shape):
+        """Forget every pair involving a shape, e.g. after it left the scene."""
+        for pair in [pair for pair in self._pairs if shape is pair[0] or shape is pair[1]]:
+            del self._pairs[pair]
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.early_exits = 0 # Warm queries decided by the cached direction or simplex alone
+        self.warm_iterations = 0 # Support evaluations of the warm queries
+        self.cold_iterations = 0 # Support evaluations of the cold queries
+
+    @property
+    def stats(self):
+        """Counters of the queries since the last `reset_stats`.
+
+        The iterations are counted as evaluations of the support function of the Minkowski
+        difference, which dominate the cost of a query.
+
+        RETURN
+        ------
+        : dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "early_exits": self.early_exits,
+            "warm_iterations": self.warm_iterations,
+            "cold_iterations": self.cold_iterations,
+            "mean_warm_iterations": self.warm_iterations/self.hits if self.hits else 0.0,
+            "mean_cold_iterations": self.cold_iterations/self.misses if self.misses else 0.0,
+        }
+
+    def query(self, shape1, shape2):
+        """ GJK intersection test, started from the cached state of the pair if any.
+
+        PARAMETERS
+        ----------
+        shape{1, 2}: Shape
+
+        RETURN
+        ------
+        : bool
+        Signifies if the given shapes intersect or not.
+        """
+        key = (shape1, shape2)
+        state = self._pairs.get(key)
+
+        if state is None:
+            self.misses += 1
+            intersect, iterations, state = self._cold_query(shape1, shape2)
+            self.cold_iterations += iterations
+            self._pairs[key] = state
+            if len(self._pairs) > self.maxsize:
+                self._pairs.popitem(last=False)
+                self.evictions += 1
+            return intersect
+
+        self.hits += 1
+        self._pairs.move_to_end(key)
+        intersect, iterations = self._warm_query(shape1, shape2, state)
+        self.warm_iterations += iterations
+        return intersect
+
+    def _cold_query(self, shape1, shape2):
+        direction = initial_direction(shape1, shape2)
+        A = support(shape1, shape2, direction)
+        directions = [direction.copy()]
+
+        intersect, iterations = GJK_loop(shape1, shape2, [A], direction, directions)
+        return intersect, iterations + 1, _PairState(direction, directions, intersect)
+
+    def _warm_query(self, shape1, shape2, state):
+        """Run a query from the cached state, and update the state in place."""
+        direction = state.direction
+        if direction.x == direction.y == direction.z == 0: # Left by a collinear simplex
+            direction = state.direction = initial_direction(shape1, shape2)
+        else:
+            direction.normalize() # Left as a face normal by intersecting queries
+        A = support(shape1, shape2, direction)
+        iterations = 1
+
+        if A.inner(direction) < 0: # Still a separating axis
+            self.early_exits += 1
+            state.intersect = False
+            return False, iterations
+
+        if state.intersect:
+            simplex = [support(shape1, shape2, d) for d in state.directions]
+            iterations += len(simplex)
+            if simplex_contains_origin(simplex):
+                self.early_exits += 1
+                return True, iterations
+
+        directions = [direction.copy()]
+        intersect, loop_iterations = GJK_loop(shape1, shape2, [A], direction, directions)
+
+        state.directions = directions
+        state.intersect = intersect
+        return intersect, iterations + loop_iterations
@@ -14,4 +14,107 @@ Inspired from https://www.youtube.com/watch?v=ajv46BSqcK4
 
 __author__ = "Abhijit Kale"
 
-from .context import gjk
\ No newline at end of file
+import math
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import *
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK, GJK_distance, closest_on_simplex, tetrahedron_case
+from .test_broadphase import random_center, random_shape
+
+
+def sphere_distance(sphere1, sphere2):
+    return max(0.0, Vec(sphere1.center, sphere2.center).length - sphere1.radius - sphere2.radius)
+
+def box_distance(box1, box2):
+    (lower1, upper1), (lower2, upper2) = box1.aabb, box2.aabb
+    gaps = [max(0.0, l1 - u2, l2 - u1) for l1, u1, l2, u2 in zip(lower1.coords, upper1.coords, lower2.coords, upper2.coords)]
+    return math.sqrt(sum(gap*gap for gap in gaps))
+
+
+class TestGJK(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(3)
+
+    def test_spheres(self):
+        for _ in range(500):
+            sphere1 = Sphere(radius=self.rng.uniform(0.5, 3), center=random_center(self.rng, spread=5))
+            sphere2 = Sphere(radius=self.rng.uniform(0.5, 3), center=random_center(self.rng, spread=5))
+            self.assertEqual(GJK(sphere1, sphere2), sphere_distance(sphere1, sphere2) == 0)
+
+    def test_cuboids(self):
+        for _ in range(500):
+            box1 = random_shape(self.rng, spread=5)
+            box2 = Cuboid(height=self.rng.uniform(0.5, 4), width=self.rng.uniform(0.5, 4), depth=self.rng.uniform(0.5, 4), center=random_center(self.rng, spread=5))
+            if isinstance(box1, Cuboid):
+                self.assertEqual(GJK(box1, box2), box_distance(box1, box2) == 0)
+
+    def test_tetrahedron_case(self):
+        direction = Point()
+        simplex = [Point(-1, -1, -1), Point(2, -1, -1), Point(-1, 2, -1), Point(0, 0, 2)]
+        self.assertTrue(tetrahedron_case(simplex, direction))
+
+        simplex = [Point(1, -1, -1), Point(4, -1, -1), Point(1, 2, -1), Point(1, 0, 2)] # Origin beyond face ACD
+        self.assertFalse(tetrahedron_case(simplex, direction))
+        self.assertEqual(simplex[-1], Point(1, 0, 2)) # Newest point kept
+        self.assertLess(direction.x, 0)
+
+    def test_touching(self):
+        box1 = Cuboid(height=2, width=2, depth=2)
+        box2 = Cuboid(height=2, width=2, depth=2, center=Point(2, 1, 0.5))
+        self.assertTrue(GJK(box1, box2))
+        self.assertTrue(GJK(Sphere(radius=1), Sphere(radius=2))) # Same center
+
+
+class TestGJKDistance(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(11)
+
+    def check_witnesses(self, distance, witness1, witness2):
+        self.assertAlmostEqual(Vec(witness1, witness2).length, distance, places=6)
+
+    def test_spheres(self):
+        for _ in range(300):
+            sphere1 = Sphere(radius=self.rng.uniform(0.5, 3), center=random_center(self.rng, spread=6))
+            sphere2 = Sphere(radius=self.rng.uniform(0.5, 3), center=random_center(self.rng, spread=6))
+            distance, witness1, witness2 = GJK_distance(sphere1, sphere2)
+            self.assertAlmostEqual(distance, sphere_distance(sphere1, sphere2), places=6)
+            if distance > 0:
+                self.check_witnesses(distance, witness1, witness2)
+                self.assertAlmostEqual(Vec(sphere1.center, witness1).length, sphere1.radius, places=6)
+
+    def test_cuboids(self):
+        for _ in range(300):
+            box1, box2 = (Cuboid(height=self.rng.uniform(0.5, 4), width=self.rng.uniform(0.5, 4), depth=self.rng.uniform(0, 4), center=random_center(self.rng, spread=6))
+                          for _ in range(2))
+            distance, witness1, witness2 = GJK_distance(box1, box2)
+            self.assertAlmostEqual(distance, box_distance(box1, box2), places=9)
+            self.check_witnesses(distance, witness1, witness2)
+
+    def test_agrees_with_GJK(self):
+        for _ in range(1000):
+            shape1, shape2 = random_shape(self.rng, spread=6), random_shape(self.rng, spread=6)
+            distance, witness1, witness2 = GJK_distance(shape1, shape2)
+            if GJK(shape1, shape2):
+                self.assertLess(distance, 1e-9)
+                self.assertAlmostEqual(Vec(witness1, witness2).length, 0, places=6) # A common point
+            else:
+                self.assertGreater(distance, 0)
+                self.check_witnesses(distance, witness1, witness2)
+
+    def test_closest_on_simplex(self):
+        self.assertEqual(closest_on_simplex([Point(1, 1, 0), Point(1, 2, 0)]), [(0, 1.0)])
+        self.assertEqual(closest_on_simplex([Point(-1, 1, 0), Point(1, 1, 0)]), [(0, 0.5), (1, 0.5)])
+        weights = closest_on_simplex([Point(-1, -1, 1), Point(2, -1, 1), Point(-1, 2, 1)])
+        self.assertEqual([i for i, _ in weights], [0, 1, 2])
+        for _, weight in weights:
+            self.assertAlmostEqual(weight, 1/3)
+        weights = closest_on_simplex([Point(-1, -1, -1), Point(3, -1, -1), Point(-1, 3, -1), Point(-1, -1, 3)])
+        self.assertEqual([i for i, _ in weights], [0, 1, 2, 3])
+        self.assertAlmostEqual(sum(weight for _, weight in weights), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for batch.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+import numpy as np
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.batch import GJK_batch, ShapeBuffer, SPHERE, CIRCLE, CUBOID
+from .test_broadphase import random_shape
+
+
+def random_planar_shape(rng):
+    """Random shape lying in (or symmetric about) the plane z=0, where the simplices are flat."""
+    center = Point(rng.uniform(-10, 10), rng.uniform(-10, 10), 0)
+    kind = rng.randrange(3)
+    if kind == 0:
+        return Sphere(radius=rng.uniform(0.5, 4), center=center)
+    elif kind == 1:
+        return Circle(radius=rng.uniform(0.5, 4), center=center)
+    else:
+        return Cuboid(height=rng.uniform(0.5, 6), width=rng.uniform(0.5, 6), center=center)
+
+
+class TestShapeBuffer(unittest.TestCase):
+    def test_pack(self):
+        buf = ShapeBuffer([Sphere(radius=2, center=Point(1,2,3)),
+                           Circle(radius=1, normal=Point(0,0,2)),
+                           Cuboid(height=2, width=4, depth=6)])
+        np.testing.assert_array_equal(buf.kind, [SPHERE, CIRCLE, CUBOID])
+        np.testing.assert_array_equal(buf.center[:, 0], [1, 2, 3])
+        np.testing.assert_array_equal(buf.radius, [2, 1, 0])
+        np.testing.assert_array_equal(buf.normal[:, 1], [0, 0, 1])
+        np.testing.assert_array_equal(buf.half_dims[:, 2], [1, 2, 3])
+
+    def test_unsupported_shape(self):
+        with self.assertRaises(TypeError):
+            ShapeBuffer([Shape()])
+
+
+class TestGJKBatch(unittest.TestCase):
+    def check_agreement(self, shapes_a, shapes_b):
+        verified = [GJK(shape1, shape2) for shape1, shape2 in zip(shapes_a, shapes_b)]
+        self.assertEqual(GJK_batch(shapes_a, shapes_b).tolist(), verified)
+        self.assertTrue(0 < sum(verified) < len(verified)) # Both outcomes are exercised
+
+    def test_agrees_with_scalar(self):
+        rng = random.Random(1234)
+        self.check_agreement([random_shape(rng, spread=6) for _ in range(2000)], [random_shape(rng, spread=6) for _ in range(2000)])
+
+    def test_agrees_with_scalar_rotated(self):
+        rng = random.Random(2468)
+        self.check_agreement([random_shape(rng, spread=6, rotated=True) for _ in range(1000)], [random_shape(rng, spread=6, rotated=True) for _ in range(1000)])
+
+    def test_agrees_with_scalar_planar(self):
+        rng = random.Random(4321)
+        self.check_agreement([random_planar_shape(rng) for _ in range(2000)], [random_planar_shape(rng) for _ in range(2000)])
+
+    def test_degenerate(self):
+        shapes_a = [Sphere(radius=1), Circle(radius=1, normal=Point(0,0,1)), Cuboid(height=2, width=2, depth=2)]
+        shapes_b = [Sphere(radius=2), Circle(radius=1, normal=Point(1,0,0), center=Point(0,0,3)), Cuboid(height=2, width=2, depth=2, center=Point(2,0,0))]
+        verified = [True, False, True] # Coincident centers, support along a circle normal, touching faces
+        self.assertEqual([GJK(*pair) for pair in zip(shapes_a, shapes_b)], verified)
+        np.testing.assert_array_equal(GJK_batch(shapes_a, shapes_b), verified)
+
+    def test_underflow(self):
+        tiny = Sphere(radius=1.6198436091263618e-126, center=Point(-6.572419312679086e-138, 1.7692704615783457e-157, -6.991895819592894e-70))
+        small = Sphere(radius=1.6466303019843567e-14, center=Point(1.7122284193768499e-18, -4.546351356515033e-128, -4.226648689724117e-143))
+        with self.assertRaises(ZeroDivisionError): # Search direction underflows to zero
+            GJK(tiny, small)
+        shapes_a = [Sphere(radius=1, center=Point(0,0,0)), tiny, Sphere(radius=1, center=Point(0,0,0))]
+        shapes_b = [Sphere(radius=1, center=Point(1,0,0)), small, Sphere(radius=1, center=Point(5,5,5))]
+        np.testing.assert_array_equal(GJK_batch(shapes_a, shapes_b), [True, True, False]) # Counted as touching, the other pairs unaffected
+
+    def test_buffers(self):
+        shapes_a = [Sphere(radius=1, center=Point(0,0,0)), Sphere(radius=1, center=Point(0,0,0))]
+        shapes_b = [Cuboid(height=2, width=2, depth=2, center=Point(1.5,0.5,0.2)), Sphere(radius=1, center=Point(5,5,5))]
+        np.testing.assert_array_equal(GJK_batch(ShapeBuffer(shapes_a), ShapeBuffer(shapes_b)), [True, False])
+
+    def test_length_mismatch(self):
+        with self.assertRaises(ValueError):
+            GJK_batch([Sphere(radius=1)], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for broadphase.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import itertools
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import rotation_from_quaternion
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.broadphase import CollisionWorld
+
+
+def random_center(rng, spread=20):
+    return Point(rng.uniform(-spread, spread), rng.uniform(-spread, spread), rng.uniform(-spread, spread))
+
+def random_shape(rng, spread=20, rotated=False):
+    kind = rng.randrange(3)
+    if kind == 0:
+        shape = Sphere(radius=rng.uniform(0.5, 4), center=random_center(rng, spread))
+    elif kind == 1:
+        shape = Circle(radius=rng.uniform(0.5, 4), normal=random_center(rng), center=random_center(rng, spread))
+    else:
+        shape = Cuboid(height=rng.uniform(0.5, 6), width=rng.uniform(0.5, 6), depth=rng.uniform(0, 6), center=random_center(rng, spread))
+    if rotated:
+        shape.rotation = rotation_from_quaternion(*(rng.gauss(0, 1) for _ in range(4)))
+    return shape
+
+def boxes_overlap(shape1, shape2):
+    (lower1, upper1), (lower2, upper2) = shape1.aabb, shape2.aabb
+    return all(l1 <= u2 and l2 <= u1 for l1, u1, l2, u2 in zip(lower1.coords, upper1.coords, lower2.coords, upper2.coords))
+
+def as_set(pairs):
+    return {frozenset(pair) for pair in pairs}
+
+
+class TestCollisionWorld(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(42)
+        self.world = CollisionWorld()
+        self.shapes = [random_shape(self.rng) for _ in range(150)]
+        for shape in self.shapes:
+            self.world.add(shape)
+
+    def check_candidates(self):
+        verified = {frozenset(pair) for pair in itertools.combinations(self.shapes, 2) if boxes_overlap(*pair)}
+        self.assertEqual(as_set(self.world.candidate_pairs()), verified)
+
+    def test_add(self):
+        self.assertEqual(len(self.world), len(self.shapes))
+        self.check_candidates()
+        with self.assertRaises(ValueError):
+            self.world.add(self.shapes[0])
+
+    def test_update(self):
+        for _ in range(5):
+            for shape in self.rng.sample(self.shapes, 50):
+                shape.center = shape.center + random_center(self.rng, spread=3)
+                self.world.update(shape)
+            self.check_candidates()
+
+        # Large jump into touching boxes
+        box1 = Cuboid(height=2, width=2, depth=2, center=Point(100, 100, 100))
+        box2 = Cuboid(height=2, width=2, depth=2)
+        self.world.add(box1)
+        self.world.add(box2)
+        box2.center = Point(102, 100, 100)
+        self.world.update(box2)
+        self.assertIn(frozenset((box1, box2)), as_set(self.world.candidate_pairs()))
+        self.shapes += [box1, box2]
+        self.check_candidates()
+
+    def test_remove(self):
+        for shape in self.shapes[::2]:
+            self.world.remove(shape)
+        self.shapes = self.shapes[1::2]
+        self.check_candidates()
+        self.assertTrue(all(count < 3 or key in self.world._candidates for key, count in self.world._overlaps.items()))
+
+    def test_query_pairs(self):
+        verified = {frozenset(pair) for pair in itertools.combinations(self.shapes, 2) if GJK(*pair)}
+        self.assertTrue(verified)
+        self.assertEqual(as_set(self.world.query_pairs()), verified)
+
+if __name__ == "__main__":
+    unittest.main()
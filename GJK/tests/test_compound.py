@@ -0,0 +1,87 @@
+"""
+Unit tests for compound.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import rotation_from_axis_angle, rotation_from_quaternion
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.compound import CompoundShape, candidate_parts, colliding_parts, compound_collide
+from .test_broadphase import random_center, random_shape
+
+
+def random_compound(rng, parts=6):
+    return CompoundShape([random_shape(rng, spread=3, rotated=True) for _ in range(parts)],
+                         center=random_center(rng, 8), rotation=rotation_from_quaternion(*(rng.gauss(0, 1) for _ in range(4))))
+
+def brute_force(compound1, compound2):
+    return [(part1, part2) for part1 in compound1.parts for part2 in compound2.parts if GJK(part1, part2)]
+
+
+class TestCompoundShape(unittest.TestCase):
+    def setUp(self):
+        self.dumbbell = CompoundShape([Sphere(radius=1, center=Point(-3, 0, 0)),
+                                       Sphere(radius=1, center=Point(3, 0, 0)),
+                                       Cuboid(height=6, width=0.5, depth=0.5)])
+
+    def test_transform(self):
+        self.dumbbell.center = Point(1, 2, 3)
+        self.dumbbell.rotation = rotation_from_axis_angle(Point(0, 0, 1), math.pi/2) # Bar along y
+        left = self.dumbbell.parts[0]
+        for test_coord, verified_coord in zip(left.center.coords, (1, -1, 3)):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        lower, upper = self.dumbbell.aabb
+        for test_coord, verified_coord in zip(lower.coords + upper.coords, (0, -2, 2, 2, 6, 4)):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        self.assertAlmostEqual(self.dumbbell.support(Point(0, 1, 0)).y, 6, places=9)
+
+    def test_collide(self):
+        ball = Sphere(radius=0.5, center=Point(0, 0, 0.6))
+        self.assertTrue(compound_collide(self.dumbbell, ball)) # Touches the bar only
+        ball.center = Point(0, 0, 1.5) # Inside the convex hull of the parts, but outside of each of them
+        self.assertTrue(GJK(self.dumbbell, ball))
+        self.assertFalse(compound_collide(self.dumbbell, ball))
+        self.assertEqual(colliding_parts(ball, self.dumbbell), [])
+
+    def test_agrees_with_brute_force(self):
+        rng = random.Random(21)
+        hits = 0
+        for _ in range(100):
+            compound1, compound2 = random_compound(rng), random_compound(rng)
+            verified = brute_force(compound1, compound2)
+            self.assertEqual(compound_collide(compound1, compound2), bool(verified))
+            self.assertEqual({(id(a), id(b)) for a, b in colliding_parts(compound1, compound2)}, {(id(a), id(b)) for a, b in verified})
+            hits += bool(verified)
+        self.assertTrue(0 < hits < 100) # Both outcomes are exercised
+
+    def test_pruning(self):
+        rng = random.Random(3)
+        compound1, compound2 = random_compound(rng, parts=32), random_compound(rng, parts=32)
+        compound2.center = compound1.center + Point(0.5, 0, 0)
+        candidates = list(candidate_parts(compound1, compound2))
+        self.assertLess(len(candidates), 32*32)
+        calls = []
+        def counting_collide(shape1, shape2):
+            calls.append((shape1, shape2))
+            return GJK(shape1, shape2)
+        self.assertTrue(compound_collide(compound1, compound2, collide=counting_collide))
+        self.assertLess(len(calls), len(candidates)) # Stopped at the first hit
+        
+        compound2.center = compound1.center + Point(100, 0, 0)
+        self.assertEqual(list(candidate_parts(compound1, compound2)), [])
+
+    def test_nested(self):
+        outer = CompoundShape([self.dumbbell, Sphere(radius=1, center=Point(0, 5, 0))], center=Point(10, 0, 0))
+        self.assertTrue(compound_collide(outer, Sphere(radius=0.5, center=Point(7, 0, 0))))
+        self.assertFalse(compound_collide(outer, Sphere(radius=0.5, center=Point(10, 2.5, 0))))
+        self.assertEqual(len(colliding_parts(outer, Cuboid(height=1, width=10, depth=1, center=Point(10, 0, 0)))), 2) # Bar and upper sphere
+
+
+if __name__ == '__main__':
+    unittest.main()
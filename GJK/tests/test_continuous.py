@@ -0,0 +1,65 @@
+"""
+Unit tests for continuous.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK, GJK_distance
+from gjk.continuous import time_of_impact
+from .test_broadphase import random_center, random_shape
+
+
+class TestTimeOfImpact(unittest.TestCase):
+    def test_spheres(self):
+        sphere1, sphere2 = Sphere(radius=1, center=Point(-5, 0, 0)), Sphere(radius=1, center=Point(5, 0, 0))
+        self.assertAlmostEqual(time_of_impact(sphere1, sphere2, Point(5, 0, 0), Point(-5, 0, 0)), 0.4, places=6)
+        self.assertEqual(sphere1.center, Point(-5, 0, 0)) # Not moved
+        self.assertIsNone(time_of_impact(sphere1, sphere2, Point(-5, 0, 0), Point(5, 0, 10))) # Moving apart
+        self.assertIsNone(time_of_impact(sphere1, sphere2, Point(0, 0, 0), Point(5, 0, 0))) # Stops short
+        self.assertEqual(time_of_impact(sphere1, Sphere(radius=1, center=Point(-4, 0, 0)), Point(), Point()), 0) # Already touching
+
+    def test_tunneling(self):
+        wall = Cuboid(height=0.1, width=10, depth=10)
+        bullet = Sphere(radius=0.05, center=Point(-5, 0, 0))
+        end = Point(5, 1, 0)
+        self.assertFalse(GJK(wall, bullet))
+        bullet.center = end
+        self.assertFalse(GJK(wall, bullet)) # Discrete tests at the ends of the step miss the wall
+        bullet.center = Point(-5, 0, 0)
+        self.assertAlmostEqual(time_of_impact(wall, bullet, wall.center, end), 0.49, places=6)
+
+    def test_agrees_with_sub_stepping(self):
+        rng = random.Random(13)
+        hits = 0
+        for _ in range(100):
+            shape1, shape2 = random_shape(rng, spread=10, rotated=True), random_shape(rng, spread=10, rotated=True)
+            start1, start2 = shape1.center, shape2.center
+            end1, end2 = random_center(rng, 10), random_center(rng, 10)
+            t = time_of_impact(shape1, shape2, end1, end2, tolerance=1e-6)
+            
+            # First contact by sub-stepping
+            first = None
+            for step in range(201):
+                s = step/200
+                shape1.center, shape2.center = start1 + (end1 - start1)*s, start2 + (end2 - start2)*s
+                if GJK(shape1, shape2):
+                    first = s
+                    break
+            if first is None:
+                self.assertIsNone(t)
+                continue
+            hits += 1
+            self.assertIsNotNone(t)
+            self.assertLessEqual(t, first + 1e-9) # Never later than a sampled contact
+            shape1.center, shape2.center = start1 + (end1 - start1)*t, start2 + (end2 - start2)*t
+            self.assertLess(GJK_distance(shape1, shape2)[0], 1e-5) # In contact at `t`
+        self.assertTrue(0 < hits < 100) # Both outcomes are exercised
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+"""
+Unit tests for convex_hull.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.convex_hull import convex_hull
+
+
+def above(points, face):
+    """Largest height of the points above the plane of a face."""
+    a, b, c = (points[i] for i in face)
+    u = [b[k] - a[k] for k in range(3)]
+    v = [c[k] - a[k] for k in range(3)]
+    normal = (u[1]*v[2] - u[2]*v[1], u[2]*v[0] - u[0]*v[2], u[0]*v[1] - u[1]*v[0])
+    return max(sum(normal[k]*(point[k] - a[k]) for k in range(3)) for point in points)
+
+
+class TestConvexHull(unittest.TestCase):
+    def test_cloud(self):
+        rng = random.Random(0)
+        points = [(rng.uniform(-1, 1), rng.uniform(-1, 1), rng.uniform(-1, 1)) for _ in range(1000)]
+        vertices, faces, edges = convex_hull(points)
+
+        self.assertEqual(len(vertices) - len(edges) + len(faces), 2) # Euler characteristic of a closed surface
+        for face in faces:
+            self.assertLessEqual(above(points, face), 1e-9) # Outward and convex
+        self.assertEqual({i for face in faces for i in face}, set(vertices))
+
+    def test_degenerate(self):
+        self.assertEqual(convex_hull([(1, 1, 1)]*3), ([0], [], []))
+        self.assertEqual(convex_hull([(0, 0, 0), (2, 2, 2), (1, 1, 1)]), ([0, 1], [], [(0, 1)]))
+
+        square = [(0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1), (0.5, 0.5, 1), (0.5, 0, 1)]
+        self.assertEqual(convex_hull(square), ([0, 1, 2, 3], [], [(0, 1), (0, 3), (1, 2), (2, 3)]))
+
+        with self.assertRaises(ValueError):
+            convex_hull([])
+
+
+if __name__ == "__main__":
+    unittest.main()
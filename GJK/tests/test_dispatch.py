@@ -0,0 +1,84 @@
+"""
+Unit tests for dispatch.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import rotation_from_quaternion
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk import dispatch
+from gjk.dispatch import collide, cuboid_cuboid, register, sphere_cuboid, sphere_sphere
+from gjk.scene_file import SphereView
+from .test_broadphase import random_center
+
+
+def random_sphere(rng, spread):
+    return Sphere(radius=rng.uniform(0.5, 4), center=random_center(rng, spread))
+
+def random_cuboid(rng, spread, rotated):
+    cuboid = Cuboid(height=rng.uniform(0.5, 6), width=rng.uniform(0.5, 6), depth=rng.uniform(0, 6), center=random_center(rng, spread))
+    if rotated:
+        cuboid.rotation = rotation_from_quaternion(*(rng.gauss(0, 1) for _ in range(4)))
+    return cuboid
+
+
+class TestDispatch(unittest.TestCase):
+    def check_agreement(self, make_pair, count=3000):
+        """Property: the closed forms agree with GJK on random pairs."""
+        hits = 0
+        for _ in range(count):
+            shape1, shape2 = make_pair()
+            verified = GJK(shape1, shape2)
+            self.assertEqual(collide(shape1, shape2), verified, (shape1.center, shape2.center))
+            self.assertEqual(collide(shape2, shape1), verified)
+            hits += verified
+        self.assertTrue(0 < hits < count) # Both outcomes are exercised
+
+    def test_sphere_sphere(self):
+        rng = random.Random(1)
+        self.check_agreement(lambda: (random_sphere(rng, 6), random_sphere(rng, 6)))
+
+    def test_sphere_cuboid(self):
+        rng = random.Random(2)
+        self.check_agreement(lambda: (random_sphere(rng, 6), random_cuboid(rng, 6, rotated=False)))
+        self.check_agreement(lambda: (random_sphere(rng, 6), random_cuboid(rng, 6, rotated=True)))
+
+    def test_cuboid_cuboid(self):
+        rng = random.Random(3)
+        self.check_agreement(lambda: (random_cuboid(rng, 6, rotated=False), random_cuboid(rng, 6, rotated=False)))
+        self.check_agreement(lambda: (random_cuboid(rng, 6, rotated=True), random_cuboid(rng, 6, rotated=False)), count=300) # Through GJK
+
+    def test_touching(self):
+        self.assertTrue(collide(Sphere(radius=1, center=Point(0, 0, 0)), Sphere(radius=1, center=Point(2, 0, 0))))
+        self.assertTrue(collide(Sphere(radius=1, center=Point(0, 0, 2)), Cuboid(height=2, width=2, depth=2, center=Point(0, 0, 0))))
+        self.assertTrue(collide(Cuboid(height=2, width=2, depth=2, center=Point(0, 0, 0)), Cuboid(height=2, width=2, depth=2, center=Point(2, 2, 2))))
+
+    def test_table(self):
+        sphere, cuboid, circle = Sphere(radius=1, center=Point()), Cuboid(height=1, width=1, depth=1, center=Point()), Circle(radius=1, center=Point())
+        self.assertIs(dispatch._resolve(Sphere, Sphere), sphere_sphere)
+        self.assertIs(dispatch._resolve(Cuboid, Cuboid), cuboid_cuboid)
+        self.assertIs(dispatch._resolve(SphereView, Cuboid), sphere_cuboid) # Subclasses
+        self.assertIs(dispatch._resolve(Circle, Sphere), GJK) # Fallback
+        self.assertTrue(collide(circle, sphere))
+        self.assertTrue(collide(cuboid, sphere)) # Reversed pair of a registered test
+        
+        calls = []
+        def circle_sphere(circle, sphere):
+            calls.append((circle, sphere))
+            return GJK(circle, sphere)
+        try:
+            register(Circle, Sphere, circle_sphere)
+            self.assertTrue(collide(sphere, circle))
+            self.assertEqual(calls, [(circle, sphere)]) # Swapped back for the reversed pair
+        finally:
+            del dispatch._registered[(Circle, Sphere)], dispatch._registered[(Sphere, Circle)]
+            dispatch._resolved.clear()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,3 +5,98 @@ Defines basic geometric entities and operations.
 __author__ = "Abhijit Kale"
 
 from .context import gjk
+from gjk.geometry_basic import *
+
+import unittest
+
+
+class TestPointMethods(unittest.TestCase):
+    def setUp(self):
+        self.point = Point(1, 2, 2)
+
+    def test_getters(self):
+        self.assertEqual(self.point.coords, [1.0, 2.0, 2.0])
+        self.assertEqual(self.point.distance, 3)
+        self.assertEqual(self.point.get_normalized(), Point(1/3, 2/3, 2/3))
+
+    def test_setters(self):
+        self.point.coords = Point(3, 0, 4)
+        self.assertEqual(self.point, Point(3, 0, 4))
+        self.point.coords = (0, 0, 2)
+        self.assertEqual(self.point, Point(0, 0, 2))
+        with self.assertRaises(RuntimeError):
+            self.point.coords = (1, 2)
+
+    def test_derived_values_follow_mutation(self):
+        self.assertEqual(self.point.distance, 3)
+        self.point.set_coords_from_coords(0, 3, 4)
+        self.assertEqual(self.point.distance, 5)
+        self.assertEqual(self.point.get_normalized(), Point(0, 0.6, 0.8))
+
+    def test_in_place_operations(self):
+        point = self.point
+        self.assertIs(point.iadd(Point(1, 1, 1)), point)
+        self.assertEqual(point, Point(2, 3, 3))
+        point.isub(Point(2, 3, 0))
+        self.assertEqual(point, Point(0, 0, 3))
+        point.imul(2).ineg()
+        self.assertEqual(point, Point(0, 0, -6))
+        point.normalize()
+        self.assertEqual(point, Point(0, 0, -1))
+
+    def test_operators(self):
+        self.assertEqual(self.point + Point(1, 1, 1), Point(2, 3, 3))
+        self.assertEqual(self.point - Point(1, 1, 1), Point(0, 1, 1))
+        self.assertEqual(-self.point, Point(-1, -2, -2))
+        self.assertEqual(self.point*2, Point(2, 4, 4))
+        self.assertEqual(self.point, Point(1, 2, 2)) # Operators do not modify the operands
+
+
+class TestVecMethods(unittest.TestCase):
+    def test_components(self):
+        vec = Vec(Point(1, 1, 1), Point(2, 3, 1))
+        self.assertEqual(vec.coords, [1.0, 2.0, 0.0])
+        self.assertEqual(Vec(Point(1, 2, 3)).coords, [-1.0, -2.0, -3.0]) # Arrow to the origin
+        self.assertAlmostEqual(vec.length, 5**0.5)
+
+    def test_dot(self):
+        vec = Vec.from_coords(1, 2, 3)
+        self.assertEqual(vec.dot(Vec.from_coords(0, 0, 2)), 3) # Projection on the direction of the other vector
+        self.assertEqual(vec.inner(Vec.from_coords(0, 0, 2)), 6)
+        self.assertEqual(vec.dot(Vec(Point(1, 1, 1), Point(1, 5, 1))), 2)
+
+    def test_start_end(self):
+        vec = Vec(Point(1, 1, 1), Point(2, 3, 1))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(vec.start, Point(0, 0, 0))
+        with self.assertWarns(DeprecationWarning):
+            self.assertEqual(vec.end, Point(1, 2, 0))
+        with self.assertWarns(DeprecationWarning):
+            vec.end = Point(4, 4, 4)
+        self.assertEqual(vec, Point(4, 4, 4))
+        with self.assertWarns(DeprecationWarning):
+            vec.start = Point(1, 2, 3) # The end is kept
+        self.assertEqual(vec, Point(3, 2, 1))
+
+    def test_cross(self):
+        x, y = Vec.from_coords(1, 0, 0), Vec.from_coords(0, 1, 0)
+        self.assertEqual(x.cross(y), Point(0, 0, 1))
+
+        out = Vec()
+        self.assertIs(x.cross_into(y, out), out)
+        self.assertEqual(out, Point(0, 0, 1))
+
+        x.cross_into(y, x) # Output aliasing an input
+        self.assertEqual(x, Point(0, 0, 1))
+
+    def test_triple_prod(self):
+        a, b, c = Vec.from_coords(1, 2, 3), Vec.from_coords(-2, 0, 1), Vec.from_coords(4, -1, 2)
+        verified = a.cross(b).cross(c)
+        self.assertEqual(triple_prod(a, b, c), verified)
+
+        triple_prod_into(a, b, c, a)
+        self.assertEqual(a, verified)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for instrumentation.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk import GJK_algo, warm_start
+from gjk.GJK_algo import GJK
+from gjk.instrumentation import GJKStats, instrument
+from gjk.warm_start import SimplexCache
+from .test_broadphase import random_shape
+
+
+class TestInstrument(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(11)
+        shapes = [random_shape(rng, spread=6) for _ in range(20)]
+        self.pairs = [(shapes[i], shapes[j]) for i in range(len(shapes)) for j in range(i + 1, len(shapes))]
+
+    def test_counts(self):
+        with instrument() as stats:
+            results = [GJK(*pair) for pair in self.pairs]
+
+        self.assertEqual(results, [GJK(*pair) for pair in self.pairs]) # Unchanged by the instrumentation
+        self.assertEqual(stats.queries, len(self.pairs))
+        self.assertEqual(sum(stats.iterations.values()), len(self.pairs))
+        # One support evaluation before the loop, and one per iteration
+        self.assertEqual(stats.calls["support"], len(self.pairs) + sum(n*count for n, count in stats.iterations.items()))
+        self.assertEqual(sum(stats.support_calls.values()), 2*stats.calls["support"])
+        self.assertGreaterEqual(stats.time_ns["loop"], stats.time_ns["triangle_case"])
+
+    def test_restored(self):
+        originals = {name: getattr(GJK_algo, name) for name in ("support", "GJK_loop", "line_case", "triangle_case")}
+        with instrument():
+            self.assertIsNot(GJK_algo.support, originals["support"])
+            self.assertIsNot(warm_start.GJK_loop, originals["GJK_loop"])
+            with self.assertRaises(RuntimeError):
+                with instrument():
+                    pass
+        for name, original in originals.items():
+            self.assertIs(getattr(GJK_algo, name), original)
+        self.assertIs(warm_start.GJK_loop, originals["GJK_loop"])
+
+    def test_warm_start(self):
+        cache = SimplexCache()
+        with instrument() as stats:
+            for _ in range(2):
+                for pair in self.pairs:
+                    GJK(*pair, warm_start=cache)
+        self.assertEqual(cache.stats["misses"], len(self.pairs))
+        self.assertEqual(stats.queries, len(self.pairs) + cache.stats["hits"] - cache.stats["early_exits"])
+
+    def test_degenerate(self):
+        stats = GJKStats()
+        with instrument(stats):
+            self.assertTrue(GJK(Sphere(radius=1, center=Point(1, 2, 3)), Sphere(radius=2, center=Point(1, 2, 3))))
+            self.assertTrue(GJK(Cuboid(height=1, width=1, depth=1, center=Point()), Cuboid(height=1, width=1, depth=1, center=Point(1, 0, 0)))) # Touching faces
+        self.assertEqual(stats.degenerate["coincident_centers"], 1)
+        self.assertGreater(sum(stats.degenerate.values()), 1)
+
+    def test_snapshot_reset(self):
+        with instrument() as stats:
+            GJK(*self.pairs[0])
+        snapshot = stats.snapshot()
+        stats.reset()
+        self.assertEqual(snapshot["queries"], 1)
+        self.assertEqual(stats.snapshot()["queries"], 0)
+        self.assertEqual(stats.snapshot()["support_calls"], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+"""
+Unit tests for parallel.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.parallel import ParallelCollider, parallel_collide
+from .test_broadphase import random_shape
+
+
+class TestParallelCollide(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(8)
+        shapes = [random_shape(rng, spread=8, rotated=k % 2 == 1) for k in range(100)]
+        self.pairs = [(rng.choice(shapes), rng.choice(shapes)) for _ in range(1000)]
+        self.verified = [GJK(*pair) for pair in self.pairs]
+
+    def test_agrees_with_GJK(self):
+        self.assertTrue(0 < sum(self.verified) < len(self.verified))
+        self.assertEqual(parallel_collide(self.pairs, workers=2, chunksize=37).tolist(), self.verified)
+        self.assertEqual(parallel_collide(self.pairs, workers=1).tolist(), self.verified) # In process
+
+    def test_reused_pool(self):
+        with ParallelCollider(workers=2) as collider:
+            self.assertEqual(collider.collide(self.pairs[:100], chunksize=7).tolist(), self.verified[:100])
+            pool, block = collider._pool, collider._block
+            self.assertEqual(collider.collide(self.pairs[:100][::-1], chunksize=7).tolist(), self.verified[:100][::-1])
+            self.assertIs(collider._block, block) # Written in place
+            
+            self.assertEqual(collider.collide(self.pairs, chunksize=37).tolist(), self.verified) # Larger block
+            for shape1, _ in self.pairs[:100]: # Moved between the calls
+                shape1.center = shape1.center + Point(1, 0, 0)
+            self.assertEqual(collider.collide(self.pairs, chunksize=37).tolist(), [GJK(*pair) for pair in self.pairs])
+            self.assertIs(collider._pool, pool)
+        self.assertIsNone(collider._pool)
+        self.assertIsNone(collider._block)
+
+    def test_edge_cases(self):
+        self.assertEqual(parallel_collide([], workers=2).tolist(), [])
+        with self.assertRaises(TypeError):
+            parallel_collide([(ConvexPolyhedron([Point(0, 0, 0), Point(1, 0, 0)]), Sphere(radius=1))], workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
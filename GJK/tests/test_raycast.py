@@ -0,0 +1,74 @@
+"""
+Unit tests for raycast.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import math
+import random
+import unittest
+
+import numpy as np
+
+from .context import gjk
+from gjk.geometry_basic import rotation_from_axis_angle
+from gjk.geometry_shapes import *
+from gjk.raycast import raycast, raycast_batch
+from .test_broadphase import random_center, random_shape
+
+
+class TestRaycast(unittest.TestCase):
+    def assertPointAlmostEqual(self, point, verified, places=5):
+        for test_coord, verified_coord in zip(point.coords, verified):
+            self.assertAlmostEqual(test_coord, verified_coord, places=places)
+
+    def test_sphere(self):
+        sphere = Sphere(radius=1, center=Point(0, 0, 0))
+        t, normal = raycast(sphere, Point(-10, 0, 0), Point(1, 0, 0))
+        self.assertAlmostEqual(t, 9, places=5)
+        self.assertPointAlmostEqual(normal, (-1, 0, 0))
+        
+        direction = Point(1, 1, 0).normalize()
+        t, normal = raycast(sphere, Point(-10, -10, 0), direction)
+        self.assertAlmostEqual(t, math.sqrt(200) - 1, places=5)
+        self.assertPointAlmostEqual(normal, (-direction).coords, places=4)
+        
+        self.assertIsNone(raycast(sphere, Point(-10, 0, 0), Point(1, 0, 0), max_t=8)) # Too short
+        self.assertIsNone(raycast(sphere, Point(-10, 2, 0), Point(1, 0, 0))) # Passes by
+        self.assertIsNone(raycast(sphere, Point(-10, 0, 0), Point(-1, 0, 0))) # Away
+        self.assertEqual(raycast(sphere, Point(0.5, 0, 0), Point(1, 0, 0))[0], 0) # From inside
+
+    def test_rotated_cuboid(self):
+        cuboid = Cuboid(height=2, width=2, depth=2, center=Point(5, 0, 0), rotation=rotation_from_axis_angle(Point(0, 0, 1), math.pi/4))
+        t, normal = raycast(cuboid, Point(5, -10, 0.5), Point(0, 1, 0)) # Onto the edge of two faces
+        self.assertAlmostEqual(t, 10 - math.sqrt(2), places=5)
+        t, normal = raycast(cuboid, Point(4.5, -10, 0.5), Point(0, 1, 0)) # Onto a face
+        self.assertAlmostEqual(t, 10 - math.sqrt(2) + 0.5, places=5)
+        self.assertPointAlmostEqual(normal, (-math.sqrt(0.5), -math.sqrt(0.5), 0))
+
+    def test_batch(self):
+        rng = random.Random(17)
+        shapes = [random_shape(rng, spread=10, rotated=True) for _ in range(30)]
+        origins = [random_center(rng, 20).coords for _ in range(300)]
+        directions = [random_center(rng).normalize().coords for _ in range(300)]
+        hit_t, normals, hit_shape = raycast_batch(shapes, origins, directions, max_t=30)
+        
+        for i, (origin, direction) in enumerate(zip(origins, directions)):
+            hits = [(contact[0], j) for j, shape in enumerate(shapes)
+                    if (contact := raycast(shape, Point(*origin), Point(*direction), max_t=30)) is not None]
+            if not hits:
+                self.assertEqual(hit_shape[i], -1)
+                self.assertEqual(hit_t[i], math.inf)
+                continue
+            t, j = min(hits)
+            self.assertAlmostEqual(hit_t[i], t, places=9)
+            self.assertEqual(hit_t[i], raycast(shapes[hit_shape[i]], Point(*origin), Point(*direction), max_t=30)[0])
+        self.assertTrue(0 < np.sum(hit_shape >= 0) < 300) # Both outcomes are exercised
+        
+        np.testing.assert_array_equal(raycast_batch([], origins, directions)[2], -1)
+        with self.assertRaises(ValueError):
+            raycast_batch(shapes, origins, directions[:-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
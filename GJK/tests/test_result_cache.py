@@ -0,0 +1,84 @@
+"""
+Unit tests for result_cache.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import rotation_from_quaternion
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.instrumentation import instrument
+from gjk.result_cache import ResultCache
+from .test_broadphase import random_center, random_shape
+
+
+class TestVersion(unittest.TestCase):
+    def test_setters(self):
+        sphere = Sphere(radius=1)
+        version = sphere.version
+        sphere.center = Point(1, 0, 0)
+        sphere.radius = 2
+        self.assertEqual(sphere.version, version + 2)
+        
+        cuboid = Cuboid(height=1, width=1, depth=1, center=Point())
+        versions = [cuboid.version]
+        cuboid.dims = (1, 2, 3)
+        versions.append(cuboid.version)
+        cuboid.rotation = rotation_from_quaternion(1, 1, 0, 0)
+        versions.append(cuboid.version)
+        cuboid.center.iadd(Point(1, 0, 0))
+        cuboid.touch() # After in place modifications
+        versions.append(cuboid.version)
+        self.assertEqual(versions, sorted(set(versions))) # Strictly increasing
+        
+        circle = Circle(radius=1)
+        version = circle.version
+        circle.normal = Point(1, 0, 0)
+        self.assertGreater(circle.version, version)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(17)
+        self.rng = rng
+        self.shapes = [random_shape(rng, spread=8, rotated=True) for _ in range(30)]
+        self.pairs = [(self.shapes[i], self.shapes[j]) for i in range(len(self.shapes)) for j in range(i + 1, len(self.shapes))]
+
+    def test_frames(self):
+        cache = ResultCache()
+        for frame in range(5):
+            moved = self.rng.sample(self.shapes, 3) # Most shapes are static
+            for shape in moved:
+                shape.center = shape.center + random_center(self.rng, 0.5)
+            cache.reset_stats()
+            with instrument() as stats:
+                results = [cache.query(*pair) for pair in self.pairs]
+            self.assertEqual(results, [GJK(*pair) for pair in self.pairs])
+            
+            changed = sum(shape1 in moved or shape2 in moved for shape1, shape2 in self.pairs)
+            self.assertEqual(cache.stats["misses"], len(self.pairs) if frame == 0 else changed)
+            self.assertEqual(stats.queries, cache.stats["misses"]) # No GJK on hits
+        
+        self.assertEqual(cache.query(*reversed(self.pairs[0])), GJK(*self.pairs[0]))
+        self.assertEqual(cache.stats["hits"], len(self.pairs) - changed + 1) # Either order
+
+    def test_eviction(self):
+        cache = ResultCache(maxsize=10)
+        for pair in self.pairs[:25]:
+            cache.query(*pair)
+        self.assertEqual(len(cache), 10)
+        self.assertEqual(cache.stats["evictions"], 15)
+        cache.query(*self.pairs[0])
+        self.assertEqual(cache.stats["hits"], 0)
+        cache.query(*self.pairs[24])
+        self.assertEqual(cache.stats["hits"], 1)
+        with self.assertRaises(ValueError):
+            ResultCache(maxsize=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Unit tests for scene_file.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import os
+import random
+import tempfile
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.scene_file import SceneFile, from_record, record, write_scene, SPHERE, CIRCLE, CUBOID
+from .test_broadphase import random_shape
+
+
+class TestSceneFile(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(6)
+        self.shapes = [random_shape(rng, spread=6, rotated=k % 2 == 0) for k in range(60)]
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "scene.gjks")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_round_trip(self):
+        write_scene(self.path, self.shapes)
+        with SceneFile(self.path) as scene:
+            self.assertEqual(len(scene), len(self.shapes))
+            self.assertEqual(sum(scene.count(kind) for kind in (SPHERE, CIRCLE, CUBOID)), len(self.shapes))
+            views = list(scene)
+            for shape, view in zip(self.shapes, views):
+                self.assertIsInstance(view, type(shape))
+                self.assertEqual(view.center, shape.center)
+                if not isinstance(shape, Sphere): # Rotations of spheres change nothing, and are not stored
+                    self.assertEqual(view.rotation, shape.rotation)
+                self.assertEqual(view.aabb, shape.aabb)
+            # Exact float64 records give the same answers
+            for i in range(len(self.shapes)):
+                for j in range(i + 1, len(self.shapes)):
+                    self.assertEqual(GJK(views[i], views[j]), GJK(self.shapes[i], self.shapes[j]))
+            self.assertEqual(scene[-1].center, self.shapes[-1].center)
+            with self.assertRaises(IndexError):
+                scene[len(self.shapes)]
+            with self.assertRaises(AttributeError):
+                views[0].center = Point() # Read-only
+
+    def test_records(self):
+        for shape in self.shapes:
+            copy = from_record(*record(shape))
+            self.assertIs(type(copy), type(shape))
+            self.assertEqual(record(copy), record(shape))
+            self.assertEqual(copy.aabb, shape.aabb)
+
+    def test_circle_normal(self):
+        kind, values = record(Circle(radius=1, center=Point(1, 2, 3)))
+        values[4:7] = (0, 0, 2)
+        self.assertEqual(from_record(kind, values).normal, Point(0, 0, 1))
+        for normal in ((0, 0, 0), (0, float("nan"), 1), (float("inf"), 0, 0)):
+            values[4:7] = normal
+            with self.assertRaises(ValueError):
+                from_record(kind, values)
+
+    def test_float32(self):
+        write_scene(self.path, self.shapes)
+        size64 = os.path.getsize(self.path)
+        write_scene(self.path, self.shapes, float_size=4)
+        self.assertLess(os.path.getsize(self.path), 0.6*size64)
+        with SceneFile(self.path) as scene:
+            for shape, view in zip(self.shapes, scene):
+                for test_coord, verified_coord in zip(view.center.coords, shape.center.coords):
+                    self.assertAlmostEqual(test_coord, verified_coord, places=5)
+
+    def test_errors(self):
+        with self.assertRaises(TypeError):
+            write_scene(self.path, [ConvexPolyhedron([Point(0, 0, 0), Point(1, 0, 0)])])
+        with self.assertRaises(ValueError):
+            write_scene(self.path, self.shapes, float_size=2)
+        with open(self.path, "wb") as file:
+            file.write(b"\0"*100)
+        with self.assertRaises(ValueError):
+            SceneFile(self.path)
+
+    def test_truncated(self):
+        write_scene(self.path, self.shapes)
+        with open(self.path, "rb") as file:
+            data = file.read()
+        for size in (len(data) - 8, 80):
+            with open(self.path, "wb") as file:
+                file.write(data[:size])
+            with self.assertRaisesRegex(ValueError, "Truncated scene file: .*" + os.path.basename(self.path)):
+                SceneFile(self.path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+"""
+Unit tests for service.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import asyncio
+import os
+import random
+import tempfile
+import unittest
+
+from .context import gjk
+from gjk.geometry_basic import Point
+from gjk.geometry_shapes import Circle, Sphere
+from gjk.GJK_algo import GJK
+from gjk.service import CollisionClient, CollisionServer, ServiceError, decode_update, encode_update
+from .test_broadphase import random_shape
+
+
+class TestCollisionService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        rng = random.Random(16)
+        self.shapes = {k: random_shape(rng, spread=6, rotated=k % 2 == 1) for k in range(40)}
+        self.pairs = [(rng.randrange(40), rng.randrange(40)) for _ in range(500)]
+        self.directory = tempfile.TemporaryDirectory()
+        self.server = CollisionServer()
+        self.path = os.path.join(self.directory.name, "gjk.sock")
+        await self.server.start(self.path)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+        self.directory.cleanup()
+
+    def test_encoding(self):
+        decoded = decode_update(encode_update(self.shapes))
+        self.assertEqual(decoded.keys(), self.shapes.keys())
+        for shape_id, shape in self.shapes.items():
+            self.assertEqual(decoded[shape_id].aabb, shape.aabb)
+
+    async def test_queries(self):
+        verified = [GJK(self.shapes[i], self.shapes[j]) for i, j in self.pairs]
+        self.assertTrue(0 < sum(verified) < len(verified)) # Both outcomes are exercised
+        async with await CollisionClient.connect(self.path) as client:
+            await client.update(self.shapes)
+            self.assertEqual(await client.query(self.pairs), verified)
+            
+            # Pipelined requests, in batches of 50 pairs
+            batches = [self.pairs[k:k + 50] for k in range(0, len(self.pairs), 50)]
+            results = await asyncio.gather(*(client.query(batch) for batch in batches))
+            self.assertEqual([result for batch in results for result in batch], verified)
+            
+            await client.update({0: Sphere(radius=1, center=Point(100, 0, 0)), 1: Sphere(radius=1, center=Point(101, 0, 0))})
+            self.assertEqual(await client.query([(0, 1)]), [True])
+            self.assertEqual(await client.query([]), [])
+
+    async def test_errors(self):
+        tcp_server = CollisionServer()
+        address = await tcp_server.start(port=0)
+        try:
+            async with await CollisionClient.connect(self.path) as client, await CollisionClient.connect(port=address[1]) as tcp_client:
+                await client.update(self.shapes)
+                await client.remove([3])
+                with self.assertRaises(ServiceError):
+                    await client.query([(3, 4)])
+                self.assertEqual(await client.query([(4, 4)]), [True]) # Still usable after an error
+                with self.assertRaises(ServiceError):
+                    await tcp_client.query([(4, 4)]) # Separate world
+        finally:
+            await tcp_server.close()
+
+    async def test_invalid_normal(self):
+        circle = Circle(radius=1)
+        circle._normal = Point(0, 0, 0) # As a client could send it
+        async with await CollisionClient.connect(self.path) as client:
+            with self.assertRaisesRegex(ServiceError, "normal"):
+                await client.update({0: circle})
+            circle._normal = Point(0, 3, 4)
+            sphere = Sphere(radius=0.6, center=Point(0, 1.2, -0.9))
+            await client.update({0: circle, 1: sphere})
+            self.assertEqual(await client.query([(0, 1)]), [GJK(Circle(radius=1, normal=Point(0, 3, 4)), sphere)])
+        self.assertEqual(self.server.shapes[0].normal, Point(0, 0.6, 0.8)) # Normalized by the server
+
+    async def test_collide_error(self):
+        def collide(shape1, shape2):
+            if shape1 is shape2:
+                raise RuntimeError("Degenerate pair")
+            return GJK(shape1, shape2)
+
+        server = CollisionServer(collide=collide)
+        address = await server.start(port=0)
+        try:
+            async with await CollisionClient.connect(port=address[1]) as client:
+                await client.update(self.shapes)
+                with self.assertRaisesRegex(ServiceError, "Degenerate pair"):
+                    await asyncio.wait_for(client.query([(4, 5), (4, 4)]), timeout=5)
+                self.assertEqual(await client.query([(4, 5)]), [GJK(self.shapes[4], self.shapes[5])])
+        finally:
+            await server.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
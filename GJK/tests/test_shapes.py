@@ -4,10 +4,13 @@ Unit tests for shapes.py module
 
 __author__ = "Abhijit Kale"
 
+import math
+import random
 import unittest
 import sys
 
 from .context import gjk
+from gjk.geometry_basic import rotation_from_axis_angle, rotation_from_quaternion
 from gjk.geometry_shapes import *
 
 
@@ -26,6 +29,15 @@ class TestCircleMethods(unittest.TestCase):
         for test_coord, verified_coord in zip(self.circ.support(Point(1,1,1).get_normalized()).coords, (2.1213203435596424,2.1213203435596424,0)):
             self.assertAlmostEqual(test_coord, verified_coord, places=4)
     
+    def test_aabb(self):
+        self.assertEqual(self.circ.aabb, (Point(-3,-3,0), Point(3,3,0)))
+        
+        self.circ.normal = Point(1,1,1)
+        lower, upper = self.circ.aabb
+        verified_lower, verified_upper = Shape.calc_aabb(self.circ) # Generic evaluation through support queries
+        for test_coord, verified_coord in zip(lower.coords + upper.coords, verified_lower.coords + verified_upper.coords):
+            self.assertAlmostEqual(test_coord, verified_coord, places=6)
+    
 
 class TestSphereMethods(unittest.TestCase):
     def setUp(self):
@@ -38,6 +50,30 @@ class TestSphereMethods(unittest.TestCase):
     def test_setters(self):
         with self.assertRaises(ValueError):
             self.sphere.radius = -1
+    
+    def test_aabb(self):
+        self.assertEqual(self.sphere.aabb, (Point(-3,-3,-3), Point(3,3,3)))
+        self.assertIs(self.sphere.aabb, self.sphere.aabb) # Cached
+        
+        self.sphere.center = Point(1,0,0)
+        self.assertEqual(self.sphere.aabb, (Point(-2,-3,-3), Point(4,3,3)))
+        
+        self.sphere.center.iadd(Point(1,0,0)) # In place modifications need an explicit `touch`
+        self.sphere.touch()
+        self.assertEqual(self.sphere.aabb, (Point(-1,-3,-3), Point(5,3,3)))
+
+    def test_center_not_shared(self):
+        other = Sphere(radius=3)
+        version = other.version
+        self.sphere.center.iadd(Point(1,0,0))
+        self.sphere.touch()
+        self.assertEqual(other.center, Point(0,0,0))
+        self.assertEqual(other.version, version)
+        
+        center = Point(1,2,3)
+        for shape in (Sphere(radius=1, center=center), Circle(radius=1, center=center), Cuboid(1, 1, 1, center=center)):
+            shape.center.iadd(Point(1,0,0))
+        self.assertEqual(center, Point(1,2,3)) # Copied by the setter
 
 class TestCuboidMethods(unittest.TestCase):
     def setUp(self):
@@ -54,6 +90,11 @@ class TestCuboidMethods(unittest.TestCase):
         for test_coord, verified_coord in zip(self.cuboid.support(Point(1,1,1).get_normalized()).coords, (1.5,1.5,3)):
             self.assertAlmostEqual(test_coord, verified_coord, places=4)
     
+    def test_aabb(self):
+        self.assertEqual(self.cuboid.aabb, (Point(-1.5,-1.5,-3), Point(1.5,1.5,3)))
+        self.cuboid.center = Point(1,2,3)
+        self.assertEqual(self.cuboid.aabb, (Point(-0.5,0.5,0), Point(2.5,3.5,6)))
+    
     def test_setters(self):
         with self.assertRaises(ValueError):
             self.cuboid.dims = (-1, 0, 0)
@@ -76,6 +117,107 @@ class TestCuboidMethods(unittest.TestCase):
         ]
         self.assertEqual(self.cuboid.vertices, verified_vertices)
 
+    def test_rotation(self):
+        self.cuboid.center = Point(1,2,3)
+        self.cuboid.rotation = rotation_from_axis_angle(Point(0,0,1), math.pi/2) # Quarter turn around z
+        for test_coord, verified_coord in zip(self.cuboid.support(Point(1,1,1).get_normalized()).coords, (2.5,3.5,6)):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        for test_coord, verified_coord in zip(self.cuboid.aabb[1].coords, (2.5,3.5,6)):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        for test_coord, verified_coord in zip(self.cuboid.vertices[0][0].coords, (-0.5,3.5,6)): # Local corner (1.5, 1.5, 3)
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        
+        with self.assertRaises(ValueError):
+            self.cuboid.rotation = ((1, 0, 0), (0, 1, 0), (0, 0, -1)) # Reflection
+        with self.assertRaises(ValueError):
+            self.cuboid.rotation = ((1, 0, 0), (0, 2, 0), (0, 0, 1))
+        
+        self.cuboid.rotation = ((1, 0, 0), (0, 1, 0), (0, 0, 1))
+        self.assertIsNone(self.cuboid._rotation) # Identity takes the unrotated path
+    
+    def test_lazy_vertices(self):
+        for k in range(10):
+            self.cuboid.center = Point(k, 0, 0)
+        self.assertIsNone(self.cuboid._vertices) # Not evaluated by moves
+        self.assertEqual(self.cuboid.vertices[0][0], Point(10.5, 1.5, 3))
+        self.assertIs(self.cuboid.vertices, self.cuboid.vertices) # Cached until the next change
+    
+    def test_rotated_circle(self):
+        circle = Circle(radius=2, center=Point(1,0,0), rotation=rotation_from_axis_angle(Point(1,0,0), math.pi/2)) # Normal turned from z to -y
+        lower, upper = circle.aabb
+        for test_coord, verified_coord in zip(lower.coords + upper.coords, (-1,0,-2, 3,0,2)):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+        self.assertAlmostEqual(circle.support(Point(0,1,0)).y, 0, places=9)
+
+
+class TestConvexPolyhedronMethods(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(2)
+        corners = [Point(x, y, z) for x in (-1, 1) for y in (-2, 2) for z in (-3, 3)]
+        self.box = ConvexPolyhedron(corners + [Point(0.5, 0.5, 0.5), Point(0, 0, 0)]) # Inner points are dropped
+        
+        sphere_points = []
+        for _ in range(500):
+            point = Point(self.rng.gauss(0, 1), self.rng.gauss(0, 1), self.rng.gauss(0, 1))
+            sphere_points.append(point.normalize())
+        self.ball = ConvexPolyhedron(sphere_points)
+    
+    def test_rotation(self):
+        rotation = rotation_from_quaternion(1, 2, 3, 4)
+        rotated = ConvexPolyhedron(self.box.vertices, center=Point(0,0,0), rotation=rotation)
+        box = Cuboid(height=2, width=4, depth=6, rotation=rotation)
+        for _ in range(100):
+            direction = self.random_direction()
+            self.assertAlmostEqual(rotated.support(direction).inner(direction), box.support(direction).inner(direction), places=9)
+        for test_coord, verified_coord in zip(rotated.aabb[0].coords + rotated.aabb[1].coords, box.aabb[0].coords + box.aabb[1].coords):
+            self.assertAlmostEqual(test_coord, verified_coord, places=9)
+    
+    def random_direction(self):
+        return Point(self.rng.gauss(0, 1), self.rng.gauss(0, 1), self.rng.gauss(0, 1)).normalize()
+    
+    def test_getters(self):
+        self.assertEqual(len(self.box.vertices), 8)
+        self.assertEqual(len(self.box.faces), 12)
+        self.assertEqual(self.box.center, Point(0, 0, 0))
+        self.assertEqual(len(self.ball.vertices), 500)
+    
+    def check_support(self, shape):
+        vertices = shape.vertices
+        for _ in range(200):
+            direction = self.random_direction()
+            self.assertAlmostEqual(shape.support(direction).inner(direction), max(vertex.inner(direction) for vertex in vertices), places=12)
+    
+    def test_support(self):
+        self.check_support(self.ball)
+        self.ball._offsets = None # Cold start without NumPy
+        self.ball._last = None
+        self.check_support(self.ball)
+        
+        # Slowly turning direction, as between simulation frames
+        for step in range(100):
+            angle = step*0.01
+            direction = Point(math.cos(angle), math.sin(angle), 0.2).normalize()
+            self.assertAlmostEqual(self.ball.support(direction).inner(direction), max(vertex.inner(direction) for vertex in self.ball.vertices), places=12)
+    
+    def test_flat(self):
+        square = ConvexPolyhedron([Point(0, 0, 0), Point(1, 0, 0), Point(1, 1, 0), Point(0, 1, 0), Point(0.5, 0.5, 0)])
+        self.assertEqual(len(square.vertices), 4)
+        self.assertEqual(square.faces, [])
+        self.check_support(square)
+    
+    def test_aabb(self):
+        self.assertEqual(self.box.aabb, (Point(-1, -2, -3), Point(1, 2, 3)))
+        self.box.center = Point(1, 2, 3)
+        self.assertEqual(self.box.aabb, (Point(0, 0, 0), Point(2, 4, 6)))
+        self.assertEqual(self.box.support(Point(1, 1, 1)), Point(2, 4, 6))
+    
+    def test_matches_cuboid(self):
+        from gjk.GJK_algo import GJK
+        cuboid = Cuboid(height=2, width=4, depth=6)
+        for _ in range(300):
+            other = Sphere(radius=self.rng.uniform(0.5, 2), center=Point(*(self.rng.uniform(-4, 4) for _ in range(3))))
+            self.assertEqual(GJK(self.box, other), GJK(cuboid, other))
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
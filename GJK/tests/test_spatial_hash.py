@@ -0,0 +1,104 @@
+"""
+Unit tests for spatial_hash.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import itertools
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK
+from gjk.spatial_hash import SpatialHash
+from .test_broadphase import random_center, random_shape, boxes_overlap, as_set
+
+
+def box_contains(shape, point):
+    lower, upper = shape.aabb
+    return all(low <= coord <= high for low, coord, high in zip(lower.coords, point.coords, upper.coords))
+
+
+class TestSpatialHash(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(7)
+        self.shapes = [random_shape(self.rng) for _ in range(200)]
+        self.index = SpatialHash.from_shapes(self.shapes)
+
+    def check_candidates(self):
+        verified = {frozenset(pair) for pair in itertools.combinations(self.shapes, 2) if boxes_overlap(*pair)}
+        pairs = self.index.candidate_pairs()
+        self.assertEqual(len(pairs), len(verified)) # No duplicates
+        self.assertEqual(as_set(pairs), verified)
+
+    def test_insert(self):
+        self.assertEqual(len(self.index), len(self.shapes))
+        self.check_candidates()
+        with self.assertRaises(ValueError):
+            self.index.insert(self.shapes[0])
+
+    def test_move_and_remove(self):
+        for _ in range(5):
+            for shape in self.rng.sample(self.shapes, 60):
+                shape.center = shape.center + random_center(self.rng, spread=4)
+                self.index.move(shape)
+            self.check_candidates()
+
+        for shape in self.shapes[::3]:
+            self.index.remove(shape)
+        self.shapes = [shape for i, shape in enumerate(self.shapes) if i % 3]
+        self.check_candidates()
+
+    def test_cell_size(self):
+        with self.assertRaises(ValueError):
+            SpatialHash(cell_size=0)
+
+        index = SpatialHash(cell_size=1.5)
+        for shape in self.shapes:
+            index.insert(shape)
+        self.assertEqual(index.cell_size, 1.5)
+
+        index.cell_size = 40 # Rehashes, and disables auto-tuning
+        self.assertFalse(index.auto_tune)
+        self.index = index
+        self.check_candidates()
+
+    def test_auto_tune(self):
+        index = SpatialHash()
+        index.insert(Sphere(radius=0.01))
+        for shape in self.shapes:
+            index.insert(shape)
+        self.assertLess(index.cell_size, 30) # Follows the growing mean size
+        self.assertGreater(index.cell_size, 4)
+
+    def test_point_and_range_queries(self):
+        for _ in range(100):
+            point = random_center(self.rng)
+            verified = {shape for shape in self.shapes if box_contains(shape, point)}
+            self.assertEqual(set(self.index.query_point(point)), verified)
+
+            lower = random_center(self.rng)
+            upper = lower + Point(5, 8, 3)
+            query = Cuboid(height=5, width=8, depth=3, center=lower + Point(2.5, 4, 1.5))
+            verified = {shape for shape in self.shapes if boxes_overlap(shape, query)}
+            found = self.index.query_aabb(lower, upper)
+            self.assertEqual(len(found), len(verified))
+            self.assertEqual(set(found), verified)
+
+    def test_query_pairs(self):
+        verified = {frozenset(pair) for pair in itertools.combinations(self.shapes, 2) if GJK(*pair)}
+        self.assertTrue(verified)
+        self.assertEqual(as_set(self.index.query_pairs()), verified)
+
+        # Boxes on a tiled layout, where neighbours may touch
+        shapes = [Cuboid(height=1.9, width=1.9, center=Point(2*i + self.rng.uniform(0, 0.2), 2*j)) for i in range(15) for j in range(15)]
+        index = SpatialHash.from_shapes(shapes)
+
+        verified = {frozenset(pair) for pair in itertools.combinations(shapes, 2) if GJK(*pair)}
+        self.assertTrue(verified)
+        self.assertEqual(as_set(index.query_pairs()), verified)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,87 @@
+"""
+Unit tests for warm_start.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import random
+import unittest
+
+from .context import gjk
+from gjk.geometry_shapes import *
+from gjk.GJK_algo import GJK, simplex_contains_origin
+from gjk.warm_start import SimplexCache
+from .test_broadphase import random_center, random_shape
+
+
+class TestSimplexContainsOrigin(unittest.TestCase):
+    def test_triangle(self):
+        self.assertTrue(simplex_contains_origin([Point(-1, -1), Point(2, 0), Point(0, 2)]))
+        self.assertTrue(simplex_contains_origin([Point(0, 2), Point(2, 0), Point(-1, -1)])) # Either winding
+        self.assertFalse(simplex_contains_origin([Point(1, 1), Point(3, 1), Point(1, 3)]))
+        self.assertFalse(simplex_contains_origin([Point(-1, -1), Point(1, 1), Point(2, 2)])) # Collinear
+        self.assertFalse(simplex_contains_origin([Point(-1, 0), Point(1, 0)]))
+
+
+class TestSimplexCache(unittest.TestCase):
+    def setUp(self):
+        self.rng = random.Random(5)
+        self.shapes = [random_shape(self.rng, spread=8) for _ in range(40)]
+        self.pairs = [(self.shapes[i], self.shapes[j]) for i in range(len(self.shapes)) for j in range(i + 1, len(self.shapes))]
+
+    def step(self):
+        for shape in self.shapes:
+            shape.center = shape.center + random_center(self.rng, spread=0.05)
+
+    def test_agrees_with_cold_queries(self):
+        cache = SimplexCache(maxsize=len(self.pairs))
+        for _ in range(10):
+            for shape1, shape2 in self.pairs:
+                self.assertEqual(GJK(shape1, shape2, warm_start=cache), GJK(shape1, shape2), (shape1, shape2))
+            self.step()
+
+        stats = cache.stats
+        self.assertEqual(stats["misses"], len(self.pairs))
+        self.assertEqual(stats["hits"], 9*len(self.pairs))
+        self.assertEqual(stats["evictions"], 0)
+        self.assertGreater(stats["early_exits"], 0.9*stats["hits"])
+        self.assertLess(stats["mean_warm_iterations"], stats["mean_cold_iterations"])
+
+    def test_disjoint_pair_single_support(self):
+        box1 = Cuboid(height=2, width=2, center=Point(0, 0))
+        box2 = Cuboid(height=2, width=2, center=Point(5, 1))
+        cache = SimplexCache()
+        self.assertFalse(cache.query(box1, box2))
+        cache.reset_stats()
+
+        box2.center = Point(4.9, 1.1)
+        self.assertFalse(cache.query(box1, box2))
+        self.assertEqual(cache.stats["warm_iterations"], 1)
+        self.assertEqual(cache.stats["early_exits"], 1)
+
+        box2.center = Point(1, 1) # Now intersecting, the cached axis no longer separates
+        self.assertTrue(cache.query(box1, box2))
+        self.assertEqual(cache.stats["early_exits"], 1)
+
+    def test_eviction(self):
+        cache = SimplexCache(maxsize=3)
+        for pair in self.pairs[:5]:
+            cache.query(*pair)
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(cache.evictions, 2)
+        self.assertNotIn(self.pairs[0], cache)
+
+        cache.query(*self.pairs[2]) # Most recently used now
+        cache.query(*self.pairs[5])
+        self.assertIn(self.pairs[2], cache)
+        self.assertNotIn(self.pairs[3], cache)
+
+        cache.discard(self.pairs[2][0])
+        self.assertNotIn(self.pairs[2], cache)
+
+        with self.assertRaises(ValueError):
+            SimplexCache(maxsize=0)
+
+
+if __name__ == "__main__":
+    unittest.main()
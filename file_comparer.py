@@ -17,7 +17,22 @@ verified one. This accomodates small variations due to external factors.
 __author__ = "Abhijit Kale"
 
 
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import mmap
+import os
+import re
+import struct
 import sys
+import tempfile
+import time
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 from math import isclose
 
 def check_if_num(word): 
@@ -67,23 +82,805 @@ def num_aware_line_compare(line1, line2, abs_tol=5.0, rel_tol=None):
     return True
 
 
+def non_empty_lines(file):
+    """Lazily yields the non-empty lines of an open file (or any iterable of lines).
+
+    `num_aware_line_compare` expects non-empty lines.
+    """
+    return (line for line in file if line.strip())
+
+
+def stream_compare(ver_lines, out_lines, compare=num_aware_line_compare, on_match=None):
+    """Checks that all the verified lines are present in the output, in order.
+
+    Both inputs are consumed in a single forward pass, so only the current verified line and the
+    position in the output are held in memory, whatever the size of the files. Each verified line
+    is matched against the first following output line that compares equal.
+
+    PARAMETERS
+    ----------
+    {ver, out}_lines: iterable(str)
+        Non-empty lines of the verified output and of the test output.
+
+    compare: callable(str, str) -> bool
+        Comparison of a verified line with an output line.
+
+    on_match: callable(int), optional
+        Called with the index of every matched output line.
+
+    RETURNS
+    -------
+        Boolean indicating if every verified line was found in the output.
+    """
+    out_lines = enumerate(out_lines)
+    for ver_line in ver_lines:
+        for out_line_num, out_line in out_lines:
+            if compare(ver_line, out_line):
+                if on_match is not None:
+                    on_match(out_line_num)
+                break
+        else:  # Output exhausted before the verified line was found.
+            return False
+
+    return True
+
+
+NUM = None  # Numeric slot of a skeleton. Words from `str.split` are never `None`.
+MAX_TEXT_WORDS = 1 << 16  # Non-numeric words remembered by `skeleton_compare`
+
+
+def line_skeleton(line, text_words=None):
+    """Tokenizes a line once, for comparisons with `skeletons_match`.
+
+    PARAMETERS
+    ----------
+    line: str
+
+    text_words: set, optional
+        Words known not to be numbers, which are not parsed again. The new ones are added.
+
+    RETURNS
+    -------
+        A tuple `(key, nums)`: the words of the line with `NUM` in place of the numeric ones, and
+        the values of the numeric ones.
+    """
+    key, nums = [], []
+    for word in line.split():
+        if text_words is not None and word in text_words:
+            key.append(word)
+            continue
+        is_num, value = check_if_num(word)
+        if is_num:
+            key.append(NUM)
+            nums.append(value)
+        else:
+            key.append(word)
+            if text_words is not None and len(text_words) < MAX_TEXT_WORDS:
+                text_words.add(word)
+
+    return tuple(key), tuple(nums)
+
+
+def skeletons_match(skeleton1, skeleton2, abs_tol=5.0):
+    """Compares two lines from their skeletons, with the verdict of `num_aware_line_compare`.
+
+    Like `num_aware_line_compare`, only the words the lines have in common are compared. A numeric
+    word never equals a non-numeric one, so the lines match if their keys agree there, and the
+    numbers there are close.
+    """
+    (key1, nums1), (key2, nums2) = skeleton1, skeleton2
+    if len(key1) != len(key2):
+        length = min(len(key1), len(key2))
+        key1, key2 = key1[:length], key2[:length]
+        count = key1.count(NUM)
+        nums1, nums2 = nums1[:count], nums2[:count]
+    if key1 != key2:
+        return False
+    for num1, num2 in zip(nums1, nums2):
+        if not isclose(num1, num2, abs_tol=abs_tol):
+            return False
+
+    return True
+
+
+def skeleton_compare(ver_lines, out_lines, abs_tol=5.0, on_match=None):
+    """Checks that all the verified lines are present in the output, in order, like `stream_compare`.
+
+    Every line is tokenized only once: each verified line into a skeleton compared with the
+    skeletons of the following output lines, so most mismatches are decided by comparing the
+    non-numeric words. The non-numeric words seen are kept in a bounded set, sparing the failed
+    `float` conversions of the words that repeat. Nothing is printed for the mismatching lines.
+
+    PARAMETERS
+    ----------
+    {ver, out}_lines: iterable(str)
+        Non-empty lines of the verified output and of the test output.
+
+    on_match: callable(int), optional
+        Called with the index of every matched output line.
+
+    RETURNS
+    -------
+        Boolean indicating if every verified line was found in the output.
+    """
+    text_words = set()
+    out_lines = enumerate(out_lines)
+    for ver_line in ver_lines:
+        ver_skeleton = line_skeleton(ver_line, text_words)
+        for out_line_num, out_line in out_lines:
+            if skeletons_match(ver_skeleton, line_skeleton(out_line, text_words), abs_tol):
+                if on_match is not None:
+                    on_match(out_line_num)
+                break
+        else:  # Output exhausted before the verified line was found.
+            return False
+
+    return True
+
+
+# Words that `float` accepts once their commas are removed, for ASCII text
+NUMBER = re.compile(rb'[+-]?(?:(?:(?:\d(?:_?\d)*)?\.\d(?:_?\d)*|\d(?:_?\d)*\.?)(?:[eE][+-]?\d(?:_?\d)*)?|inf|infinity|nan)', re.IGNORECASE)
+# Besides non-ASCII characters, the text on which `str` and `bytes` disagree: the separators that
+# only `str.split` splits on, and lone carriage returns, which end lines in text mode.
+STR_SEPARATORS = (b'\x1c', b'\x1d', b'\x1e', b'\x1f')
+LONE_CR = re.compile(rb'\r(?!\n)')
+CHUNK_SIZE = 1 << 20
+
+
+def bytes_number(word):
+    """Value of a word of bytes if it is a number, with the classification of `check_if_num`, or `None`."""
+    num = word.replace(b',', b'') if b',' in word else word
+    return float(num) if NUMBER.fullmatch(num) else None
+
+
+def bytes_words_match(words1, words2, abs_tol=5.0):
+    """Like `num_aware_line_compare`, for the words of lines of bytes.
+
+    Only the words that differ, or may be NaN, are classified, and only numbers are converted.
+    """
+    for word1, word2 in zip(words1, words2):
+        if word1 == word2:
+            if word1.rstrip(b',')[-1:] not in b'nN':  # Equal, unless NaN, commas removed
+                continue
+            num1 = num2 = bytes_number(word1)
+            if num1 is None:
+                continue
+        else:
+            num1 = bytes_number(word1)
+            if num1 is None:
+                return False
+            num2 = bytes_number(word2)
+            if num2 is None:
+                return False
+        if not isclose(num1, num2, abs_tol=abs_tol):
+            return False
+
+    return True
+
+
+def bytes_compare(ver_lines, out_lines, abs_tol=5.0, on_match=None):
+    """Checks that all the verified lines are present in the output, in order, like `stream_compare`.
+
+    Works on lines of bytes, such as the lines of `mapped_lines`, and gives the verdicts of the
+    other engines when the text is ASCII without lone carriage returns (see `bytes_safe`). Output
+    lines identical to the verified line match without being split. The words of other lines are
+    compared slot by slot, classified by the `NUMBER` regex only where they differ.
+
+    PARAMETERS
+    ----------
+    {ver, out}_lines: iterable(bytes)
+        Non-empty lines of the verified output and of the test output.
+
+    on_match: callable(int), optional
+        Called with the index of every matched output line.
+
+    RETURNS
+    -------
+        Boolean indicating if every verified line was found in the output.
+    """
+    out_lines = enumerate(out_lines)
+    for ver_line in ver_lines:
+        ver_words = None
+        same_matches = b'nan' not in ver_line.replace(b',', b'').lower()  # A line with NaN, commas removed, does not match itself
+        for out_line_num, out_line in out_lines:
+            if not (same_matches and out_line == ver_line):
+                if ver_words is None:
+                    ver_words = ver_line.split()
+                if not bytes_words_match(ver_words, out_line.split(), abs_tol):
+                    continue
+            if on_match is not None:
+                on_match(out_line_num)
+            break
+        else:  # Output exhausted before the verified line was found.
+            return False
+
+    return True
+
+
+def map_file(stack, path):
+    """Memory maps a file for reading, until `stack` (a `contextlib.ExitStack`) closes. `None` if the file is empty."""
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return None
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    stack.callback(mapped.close)
+    return mapped
+
+
+def mapped_lines(mapped):
+    """All the lines of a memory mapped file (from `map_file`), as bytes."""
+    return iter(()) if mapped is None else iter(mapped.readline, b'')
+
+
+def bytes_safe(mapped):
+    """Checks that `bytes_compare` gives the verdicts of the text engines on a mapped file."""
+    if mapped is None:
+        return True
+    for start in range(0, len(mapped), CHUNK_SIZE):
+        chunk = mapped[start:start + CHUNK_SIZE]
+        if not chunk.isascii() or any(chunk.find(separator) >= 0 for separator in STR_SEPARATORS):
+            return False
+
+    return mapped.find(b'\r') < 0 or LONE_CR.search(mapped) is None
+
+
+GOLDEN_SUFFIX = '.golden'  # Extension of the compiled verified files, next to them
+GOLDEN_MAGIC = b'FCGD'
+GOLDEN_VERSION = 2
+# magic, version, tolerance, size, modification time and SHA-256 digest of the verified file, time
+# of the compilation, numbers of lines, keys and words, and compressed sizes of the 6 sections
+GOLDEN_HEADER = struct.Struct('<4sH2xdQq32sqQQQ6Q')
+RACY_NS = 10**9  # Verified files modified this close to their compilation are checked by hash
+
+
+def file_hash(path):
+    """SHA-256 digest of the content of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compile_golden(verified_path, abs_tol=5.0, save=True):
+    """Compiles a verified file into a golden artifact, saved next to it with `GOLDEN_SUFFIX`.
+
+    The artifact holds the non-empty lines with their skeletons (`line_skeleton`), the tolerance
+    of their numbers, the non-numeric words seen, the size, modification time and hash of the
+    verified file, and the time of the compilation. See `encode_golden` for its format.
+
+    PARAMETERS
+    ----------
+    save: bool
+        Write the artifact. It is still returned if it cannot be written.
+
+    RETURNS
+    -------
+        The artifact dict.
+    """
+    compiled_ns = time.time_ns()
+    stat = os.stat(verified_path)
+    text_words, keys, lines = set(), {}, []
+    with open(verified_path, 'r') as verified_file:
+        for line in non_empty_lines(verified_file):
+            key, nums = line_skeleton(line, text_words)
+            key = keys.setdefault(key, key)  # Lines of the same shape share their key.
+            lines.append((None if any(num != num for num in nums) else line, key, nums))  # NaN lines do not match themselves.
+    golden = {
+        'version': GOLDEN_VERSION,
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'hash': file_hash(verified_path),
+        'compiled_ns': compiled_ns,
+        'abs_tol': abs_tol,
+        'lines': lines,
+        'text_words': sorted(text_words),
+    }
+
+    if save:
+        save_golden(verified_path, golden)
+
+    return golden
+
+
+def _little_endian(values):
+    if sys.byteorder != 'little':
+        values.byteswap()
+    return values
+
+
+def encode_golden(golden):
+    """Binary form of a golden artifact.
+
+    A `GOLDEN_HEADER`, followed by zlib compressed sections: the text of the lines, the distinct
+    keys (words separated by tabs, with an empty word for `NUM`, one key per line), the index of
+    the key of each line (uint32), the numbers of all the lines (float64), the indices of the
+    lines holding NaN (uint32), and the non-numeric words (one per line). Nothing in it is
+    executed when loaded.
+
+    RETURNS
+    -------
+        bytes
+    """
+    key_ids, line_keys, nums, nan_lines, texts = {}, array('I'), array('d'), array('I'), []
+    for line_num, (line, key, line_nums) in enumerate(golden['lines']):
+        line_keys.append(key_ids.setdefault(key, len(key_ids)))
+        nums.extend(line_nums)
+        if line is None:
+            nan_lines.append(line_num)
+            line = ' '.join('nan' if word is NUM else word for word in key) + '\n'  # Only matched by skeleton
+        texts.append(line)
+
+    sections = [
+        ''.join(texts).encode(),
+        '\n'.join('\t'.join('' if word is NUM else word for word in key) for key in key_ids).encode(),
+        _little_endian(line_keys).tobytes(),
+        _little_endian(nums).tobytes(),
+        _little_endian(nan_lines).tobytes(),
+        '\n'.join(golden['text_words']).encode(),
+    ]
+    sections = [zlib.compress(section) for section in sections]
+    header = GOLDEN_HEADER.pack(GOLDEN_MAGIC, golden['version'], golden['abs_tol'], golden['size'], golden['mtime_ns'],
+                                bytes.fromhex(golden['hash']), golden['compiled_ns'], len(golden['lines']), len(key_ids),
+                                len(golden['text_words']), *(len(section) for section in sections))
+    return header + b''.join(sections)
+
+
+def decode_golden(data):
+    """Golden artifact from its binary form (`encode_golden`).
+
+    Raises `ValueError` if the data is not an artifact of the current version, or is corrupt.
+    """
+    if len(data) < GOLDEN_HEADER.size:
+        raise ValueError("Not a golden artifact: too short")
+    magic, version, abs_tol, size, mtime_ns, digest, compiled_ns, line_count, key_count, word_count, *lengths = GOLDEN_HEADER.unpack_from(data)
+    if magic != GOLDEN_MAGIC or version != GOLDEN_VERSION:
+        raise ValueError("Not a golden artifact of the current version")
+
+    sections, offset = [], GOLDEN_HEADER.size
+    for length in lengths:
+        try:
+            sections.append(zlib.decompress(data[offset:offset + length]))
+        except zlib.error as error:
+            raise ValueError(f"Corrupt golden artifact: {error}") from None
+        offset += length
+    texts, key_text, line_keys, all_nums, nan_lines, words = sections
+
+    keys = [tuple(NUM if word == '' else word for word in key.split('\t')) for key in key_text.decode().split('\n')] if key_count else []
+    line_keys, nums, nan_lines = (_little_endian(array(typecode, values)) for typecode, values in (('I', line_keys), ('d', all_nums), ('I', nan_lines)))
+    texts = texts.decode().split('\n')
+    texts = [text + '\n' for text in texts[:-1]] + ([texts[-1]] if texts[-1] else [])  # The last line may not end with a new line.
+    if len(texts) != line_count or len(line_keys) != line_count or len(keys) != key_count:
+        raise ValueError("Corrupt golden artifact: inconsistent sections")
+    lines = GoldenLines(texts, keys, line_keys, nums, nan_lines)
+    if sum(lines.counts[key_id] for key_id in line_keys) != len(nums):
+        raise ValueError("Corrupt golden artifact: inconsistent sections")
+
+    return {
+        'version': version,
+        'size': size,
+        'mtime_ns': mtime_ns,
+        'hash': digest.hex(),
+        'compiled_ns': compiled_ns,
+        'abs_tol': abs_tol,
+        'lines': lines,
+        'text_words': words.decode().split('\n') if word_count else [],
+    }
+
+
+class GoldenLines:
+    """Lines of a decoded golden artifact, as `(line, key, nums)` tuples built as they are iterated.
+
+    Building them all as the artifact is loaded would cost more than most comparisons.
+    """
+    def __init__(self, texts, keys, line_keys, nums, nan_lines):
+        self.texts = texts
+        self.keys = keys
+        self.counts = [key.count(NUM) for key in keys]
+        self.line_keys = line_keys
+        self.nums = nums
+        self.nan_lines = set(nan_lines)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def __iter__(self):
+        keys, counts, nan_lines = self.keys, self.counts, self.nan_lines
+        nums = iter(self.nums)
+        for line_num, (text, key_id) in enumerate(zip(self.texts, self.line_keys)):
+            yield (None if line_num in nan_lines else text), keys[key_id], tuple(itertools.islice(nums, counts[key_id]))
+
+
+def is_golden_file(name):
+    """Whether a file name is that of a golden artifact, or of the temporary file of `save_golden`."""
+    return name.endswith(GOLDEN_SUFFIX) or (GOLDEN_SUFFIX + '.' in name and name.endswith('.tmp'))
+
+
+def save_golden(verified_path, golden):
+    """Writes the artifact of a verified file, unless its location is read-only.
+
+    The artifact is written to a temporary file of its own, then renamed: concurrent readers never
+    see a partial artifact, and processes compiling the same verified file at once, e.g. listed
+    several times in a manifest, do not write over each other.
+    """
+    golden_path = verified_path + GOLDEN_SUFFIX
+    try:
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(golden_path) or '.', prefix=os.path.basename(golden_path) + '.', suffix='.tmp')
+    except OSError:
+        return  # Compiled again on the next run.
+    saved = False
+    try:
+        with os.fdopen(fd, 'wb') as golden_file:
+            golden_file.write(encode_golden(golden))
+        os.chmod(tmp_path, os.stat(verified_path).st_mode & 0o666 | 0o600)  # As readable as the verified file. `mkstemp` makes it private.
+        os.replace(tmp_path, golden_path)
+        saved = True
+    except OSError:
+        pass  # Compiled again on the next run.
+    finally:
+        if not saved:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
+def load_golden(verified_path, abs_tol=5.0):
+    """Loads the golden artifact of a verified file, compiling it first if missing or out of date.
+
+    The artifact is up to date if the verified file has the size and modification time recorded,
+    without reading the verified file. Otherwise, it is still up to date if the content hash is
+    the same, and is saved again with the new modification time. As timestamps are coarse, the
+    hash is also checked if the verified file was modified within `RACY_NS` of the compilation.
+
+    RETURNS
+    -------
+        The artifact dict, as made by `compile_golden`.
+    """
+    stat = os.stat(verified_path)
+    try:
+        with open(verified_path + GOLDEN_SUFFIX, 'rb') as golden_file:
+            golden = decode_golden(golden_file.read())
+    except (OSError, ValueError, struct.error):  # Missing, of another version, or corrupt
+        return compile_golden(verified_path, abs_tol)
+    if golden['abs_tol'] != abs_tol:
+        return compile_golden(verified_path, abs_tol)
+
+    if (golden['size'], golden['mtime_ns']) == (stat.st_size, stat.st_mtime_ns) and golden['compiled_ns'] - stat.st_mtime_ns > RACY_NS:
+        return golden
+    compiled_ns = time.time_ns()
+    if golden['size'] != stat.st_size or golden['hash'] != file_hash(verified_path):
+        return compile_golden(verified_path, abs_tol)
+
+    if golden['mtime_ns'] != stat.st_mtime_ns or compiled_ns - stat.st_mtime_ns > RACY_NS:
+        # Touched, not modified, or no longer recently modified. Recorded, so that the next runs do not hash again.
+        golden['mtime_ns'], golden['compiled_ns'] = stat.st_mtime_ns, compiled_ns
+        save_golden(verified_path, golden)
+
+    return golden
+
+
+def golden_compare(golden, out_lines, on_match=None):
+    """Checks that all the lines of a golden artifact are present in the output, in order, like `skeleton_compare`.
+
+    Nothing is parsed on the verified side. Output lines identical to the verified line match
+    without being tokenized, and the others are tokenized knowing the non-numeric words of the
+    verified file.
+
+    PARAMETERS
+    ----------
+    golden: dict
+        Artifact of the verified file, from `load_golden`.
+
+    out_lines: iterable(str)
+        Non-empty lines of the test output.
+
+    on_match: callable(int), optional
+        Called with the index of every matched output line.
+
+    RETURNS
+    -------
+        Boolean indicating if every verified line was found in the output.
+    """
+    abs_tol = golden['abs_tol']
+    text_words = set(golden['text_words'][:MAX_TEXT_WORDS])
+    out_lines = enumerate(out_lines)
+    for ver_line, key, nums in golden['lines']:
+        ver_skeleton = (key, nums)
+        for out_line_num, out_line in out_lines:
+            if out_line == ver_line or skeletons_match(ver_skeleton, line_skeleton(out_line, text_words), abs_tol):
+                if on_match is not None:
+                    on_match(out_line_num)
+                break
+        else:  # Output exhausted before the verified line was found.
+            return False
+
+    return True
+
+
+ENGINES = {'stream': stream_compare, 'skeleton': skeleton_compare, 'bytes': bytes_compare, 'golden': golden_compare}
+
+
+def open_lines(stack, out_path, verified_path, engine):
+    """Opens a pair of files for an engine, until `stack` (a `contextlib.ExitStack`) closes.
+
+    The 'bytes' engine maps the files, and falls back to the 'skeleton' engine on text it cannot
+    compare as bytes. The 'golden' engine loads the artifact of the verified file instead of the
+    verified file.
+
+    RETURNS
+    -------
+        The engine function, and the non-empty lines of the verified and output files (the
+        artifact of the verified file for 'golden').
+    """
+    if engine == 'bytes':
+        mapped = [map_file(stack, verified_path), map_file(stack, out_path)]
+        if all(bytes_safe(file) for file in mapped):
+            return bytes_compare, [non_empty_lines(mapped_lines(file)) for file in mapped]
+        engine = 'skeleton'
+    elif engine == 'golden':
+        golden = load_golden(verified_path)
+        return golden_compare, [golden, non_empty_lines(stack.enter_context(open(out_path, 'r')))]
+
+    return ENGINES[engine], [non_empty_lines(stack.enter_context(open(path, 'r'))) for path in (verified_path, out_path)]
+
+
+def compare_files(out_path, verified_path, on_match=None, engine='stream'):
+    """Checks the output file against the verified file, reading both lazily.
+
+    PARAMETERS
+    ----------
+    engine: str
+        'stream' (`stream_compare`), 'skeleton' (`skeleton_compare`, faster and quiet), 'bytes'
+        (`bytes_compare` on memory mapped files, the fastest) or 'golden' (`golden_compare` with
+        the compiled verified file).
+
+    RETURNS
+    -------
+        Boolean indicating if the files match.
+    """
+    with contextlib.ExitStack() as stack:
+        compare, (ver_lines, out_lines) = open_lines(stack, out_path, verified_path, engine)
+        return compare(ver_lines, out_lines, on_match=on_match)
+
+
+def follow_lines(file, growing=True, sentinel=None, timeout=None, poll_interval=0.1):
+    """Yields the lines of a file as they are written, like `tail -f`, or of a stream as they arrive.
+
+    A line is yielded once complete. The lines end with the sentinel line, if given, at the end of
+    a stream, or after `timeout` seconds without new data.
+
+    PARAMETERS
+    ----------
+    file: file object
+        Text file, or stream such as `sys.stdin`.
+
+    growing: bool
+        Wait for more data at the end of the file, as for a file being written. Otherwise, the
+        lines end at the end of the file, as for a stream.
+
+    sentinel: str, optional
+        Line (without surrounding whitespace) marking the end of the output. Not yielded.
+
+    timeout: float, optional
+        Seconds without new data after which the output is considered complete. Waits
+        indefinitely by default.
+    """
+    pending = ''
+    last_data = time.monotonic()
+    while True:
+        line = file.readline()
+        if line:
+            last_data = time.monotonic()
+            if growing and not line.endswith('\n'):  # Rest of the line not written yet
+                pending += line
+                continue
+            line, pending = pending + line, ''
+        elif not growing or (timeout is not None and time.monotonic() - last_data > timeout):
+            line, pending = pending, ''
+            if line and (sentinel is None or line.strip() != sentinel):
+                yield line
+            return
+        else:
+            time.sleep(poll_interval)
+            continue
+
+        if sentinel is not None and line.strip() == sentinel:
+            return
+        yield line
+
+
+def follow_compare(out_path, verified_path, on_match=None, engine='stream', sentinel=None, timeout=None, poll_interval=0.1):
+    """Checks the output of a running test against the verified file, as the output is written.
+
+    The verified lines are matched as soon as the output lines arrive, so a verdict is reached as
+    soon as possible: a match once the last verified line is found, a mismatch when the output ends
+    with a verified line missing. The output ends at the sentinel line if given, after `timeout`
+    seconds without new output if given, and for the standard input, at its end. Without sentinel
+    and timeout, an output file is waited on until the last verified line is found. The output
+    file is waited for if it does not exist yet.
+
+    PARAMETERS
+    ----------
+    out_path: str
+        Output file, followed as it grows, or '-' for the standard input, read until its end (a
+        pipe, or a redirected file).
+
+    engine: str
+        As in `compare_files`. The 'bytes' engine cannot map a growing file; 'skeleton' is used.
+
+    RETURNS
+    -------
+        Boolean indicating if the files match.
+    """
+    with contextlib.ExitStack() as stack:
+        if engine == 'golden':
+            compare, ver_lines = golden_compare, load_golden(verified_path)
+        else:
+            compare = ENGINES['skeleton' if engine == 'bytes' else engine]
+            ver_lines = non_empty_lines(stack.enter_context(open(verified_path, 'r')))
+
+        if out_path == '-':
+            out_file = sys.stdin
+        else:
+            start = time.monotonic()
+            while not os.path.exists(out_path):
+                if timeout is not None and time.monotonic() - start > timeout:
+                    return False
+                time.sleep(poll_interval)
+            out_file = stack.enter_context(open(out_path, 'r'))
+
+        out_lines = follow_lines(out_file, out_path != '-', sentinel, timeout, poll_interval)
+        return compare(ver_lines, non_empty_lines(out_lines), on_match=on_match)
+
+
+def directory_pairs(out_dir, verified_dir, pattern='*'):
+    """Pairs the verified files matching a glob pattern with the output files of the same relative path.
+
+    Golden artifacts, and the temporary files of artifacts being saved, are skipped.
+
+    RETURNS
+    -------
+        A list of `(output path, verified path)` tuples, sorted by path.
+    """
+    verified_dir = Path(verified_dir)
+    return [(str(Path(out_dir) / path.relative_to(verified_dir)), str(path))
+            for path in sorted(verified_dir.glob(pattern)) if path.is_file() and not is_golden_file(path.name)]
+
+
+def manifest_pairs(manifest_path):
+    """Reads the `(output path, verified path)` pairs of a manifest.
+
+    A manifest lists one pair per line, as two paths separated by whitespace. Empty lines and
+    lines starting with '#' are skipped.
+    """
+    pairs = []
+    with open(manifest_path, 'r') as manifest:
+        for line_num, line in enumerate(manifest, 1):
+            if not line.strip() or line.lstrip().startswith('#'):
+                continue
+            paths = line.split()
+            if len(paths) != 2:
+                raise ValueError(f"{manifest_path}:{line_num}: expected an output and a verified path")
+            pairs.append(tuple(paths))
+
+    return pairs
+
+
+def compare_pair(out_path, verified_path, engine='stream'):
+    """Compares one pair of files, for the summary of `compare_many`.
+
+    Anything the engine prints is discarded.
+
+    RETURNS
+    -------
+        A dict with the paths, `match`, the number of the first verified line not found in the
+        output (`first_mismatch`, counted from 1 over all the lines of the file), `seconds` and
+        `error`, the reason a file could not be read or decoded.
+    """
+    result = {'output': out_path, 'verified': verified_path, 'match': False, 'first_mismatch': None, 'seconds': 0.0, 'error': None}
+    start = time.perf_counter()
+    matched = []
+
+    try:
+        with contextlib.ExitStack() as stack:
+            compare, (ver_lines, out_lines) = open_lines(stack, out_path, verified_path, engine)
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                result['match'] = compare(ver_lines, out_lines, on_match=matched.append)
+        if not result['match']:
+            result['first_mismatch'] = verified_line_number(verified_path, len(matched))
+    except (OSError, ValueError) as error:  # Unreadable file, or text that cannot be decoded
+        result['error'] = str(error)
+    result['seconds'] = time.perf_counter() - start
+
+    return result
+
+
+def verified_line_number(verified_path, index):
+    """Number of the line, counted from 1 over all the lines of the file, of a non-empty verified line."""
+    with open(verified_path, 'r') as verified_file:
+        non_empty = (line_num for line_num, line in enumerate(verified_file, 1) if line.strip())
+        return next(itertools.islice(non_empty, index, None))
+
+
+def _compare_pair(args):
+    return compare_pair(*args)
+
+
+def compare_many(pairs, engine='stream', workers=None):
+    """Compares pairs of files over a pool of processes.
+
+    PARAMETERS
+    ----------
+    pairs: sequence((str, str))
+        Output and verified paths.
+
+    workers: int, optional
+        Number of processes. Defaults to the number of CPUs.
+
+    RETURNS
+    -------
+        A summary dict: overall `match`, the numbers of `files` and `mismatched` ones, the total
+        `seconds`, and the `results` of `compare_pair` in the order of the pairs.
+    """
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_compare_pair, [(out_path, verified_path, engine) for out_path, verified_path in pairs]))
+    mismatched = sum(not result['match'] for result in results)
+
+    return {
+        'match': not mismatched,
+        'files': len(results),
+        'mismatched': mismatched,
+        'seconds': time.perf_counter() - start,
+        'results': results,
+    }
+
+
 if __name__ == "__main__":
-    # Get lines from files while removing empty ones. `num_aware_line_comp` function excpects no empty lines
-    with open(sys.argv[2], 'r') as verified_file, open(sys.argv[1], 'r') as out_file:
-        ver_lines = [line for line in verified_file.readlines() if line.strip()]
-        out_lines = [line for line in out_file.readlines() if line.strip()]
-
-        prev_out_line_num = -1
-        for ver_line_num in range(len(ver_lines)):
-            
-            for out_line_num in range(prev_out_line_num + 1, len(out_lines)):
-                if num_aware_line_compare(ver_lines[ver_line_num], out_lines[out_line_num]):
-                    prev_out_line_num = out_line_num
-                    print(prev_out_line_num)
-                    break
-            else:  # Verified line not found in the output file.
-                print("Files do not match")
-                sys.exit(-1)
-
-    print("Files match")       
-    sys.exit(0) # Files match.
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", nargs='?', help="Output of the test program, or directory of outputs")
+    parser.add_argument("verified", nargs='?', help="Verified output, or directory of verified outputs")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default='stream', help="Comparison engine (default: stream)")
+    parser.add_argument("--manifest", help="File listing output and verified path pairs, one pair per line")
+    parser.add_argument("--glob", default='*', help="Verified files compared in directory mode (default: *)")
+    parser.add_argument("--compile", nargs='+', metavar="VERIFIED", help=f"Compile verified files for the golden engine, into VERIFIED{GOLDEN_SUFFIX}, and exit")
+    parser.add_argument("--follow", action='store_true', help="Compare the output as it is written, until it matches or ends: at the sentinel, after the timeout, or at the end of the standard input "
+                             "(implied by an output of '-'). Without sentinel and timeout, an output file is followed until it matches")
+    parser.add_argument("--sentinel", help="Line marking the end of the output in follow mode")
+    parser.add_argument("--timeout", type=float, help="Seconds without new output after which it has ended, in follow mode (default: wait)")
+    parser.add_argument("--jobs", type=int, help="Processes comparing files in directory and manifest modes (default: CPUs)")
+    args = parser.parse_args()
+    if args.jobs is not None and args.jobs < 1:
+        parser.error(f"argument --jobs: must be a positive integer, got {args.jobs}")
+
+    if args.compile:
+        for verified_path in args.compile:
+            compile_golden(verified_path)
+        sys.exit(0)
+
+    if args.manifest is not None or (args.output and os.path.isdir(args.output)):
+        # Many pairs of files. A JSON summary is printed instead of the matched lines.
+        if args.manifest is not None:
+            pairs = manifest_pairs(args.manifest)
+        elif args.verified and os.path.isdir(args.verified):
+            pairs = directory_pairs(args.output, args.verified, args.glob)
+        else:
+            parser.error("the verified path must be a directory when the output is")
+        summary = compare_many(pairs, engine=args.engine, workers=args.jobs)
+        print(json.dumps(summary, indent=2))
+        sys.exit(0 if summary['match'] else -1)
+
+    if args.output is None or args.verified is None:
+        parser.error("the output and verified paths are required without --manifest")
+
+    if args.follow or args.output == '-':
+        matches = follow_compare(args.output, args.verified, on_match=lambda out_line_num: print(out_line_num, flush=True),
+                                 engine=args.engine, sentinel=args.sentinel, timeout=args.timeout)
+    else:
+        matches = compare_files(args.output, args.verified, on_match=print, engine=args.engine)
+
+    if matches:
+        print("Files match")
+        sys.exit(0) # Files match.
+    else:  # Verified line not found in the output file.
+        print("Files do not match")
+        sys.exit(-1)
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# *_* coding: utf-8 *_*
+
+"""
+Benchmark of the file_comparer engines.
+
+Synthetic pairs of verified and output files are generated for every combination of the given
+numbers of lines, noise ratios, numeric fractions and mismatch locations. Each engine compares
+every pair in a fresh process, and the time, throughput and peak resident memory are reported.
+
+Output files hold every verified line, in order, with extra noise lines in between, and with the
+numbers of some lines shifted within the tolerance. A mismatch replaces the output copy of one
+verified line, so that the comparison searches the rest of the output for it.
+
+Usage: python file_comparer_bench.py [--lines N ...] [--noise R ...] [--numeric F ...] [--mismatch-at P ...]
+                                     [--engines E ...] [--repeat K] [--print-matches] [--profile DIR] [--seed S]
+"""
+
+__author__ = "Abhijit Kale"
+
+
+import argparse
+import contextlib
+import cProfile
+import itertools
+import multiprocessing
+import os
+import random
+import resource
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import file_comparer
+
+WORDS = ["iter", "step", "residual", "energy", "time", "mem", "kB", "s", "converged", "solver", "norm", "dt", "rank", "="]
+SHIFTED = 0.2  # Fraction of the output lines with numbers shifted within the tolerance
+
+
+def random_number(rng, shift=None):
+    """A number word in one of the formats of test logs, or its value shifted, in the same format."""
+    style, value = shift if shift is not None else (rng.randrange(4), rng.uniform(-1e4, 1e4))
+    if shift is not None:
+        value += rng.uniform(-1.0, 1.0)  # Well within the default tolerance of 5
+    if style == 0:
+        return f"{round(value)}", (style, value)
+    elif style == 1:
+        return f"{round(value):,}", (style, value)
+    elif style == 2:
+        return f"{value:.4f}", (style, value)
+    return f"{value:.6e}", (style, value)
+
+
+def random_line(rng, numeric):
+    """Words of a random line, as `(word, number)` pairs, `number` being `None` for the other words."""
+    line = []
+    for _ in range(rng.randint(3, 12)):
+        if rng.random() < numeric:
+            line.append(random_number(rng))
+        else:
+            line.append((rng.choice(WORDS), None))
+    return line
+
+
+def write_pair(verified_path, out_path, lines, noise, numeric, mismatch_at=None, seed=0):
+    """Writes a verified file and an output file for it.
+
+    PARAMETERS
+    ----------
+    lines: int
+        Number of verified lines.
+
+    noise: float
+        Average number of noise lines in the output per verified line.
+
+    numeric: float
+        Fraction of the words that are numbers.
+
+    mismatch_at: float, optional
+        Position, from 0 to 1, of the verified line missing from the output. No line is missing by
+        default.
+    """
+    rng = random.Random(seed)
+    missing = None if mismatch_at is None else min(lines - 1, int(mismatch_at*lines))
+    with open(verified_path, 'w') as verified_file, open(out_path, 'w') as out_file:
+        for line_num in range(lines):
+            line = random_line(rng, numeric)
+            verified_file.write(" ".join(word for word, _ in line) + "\n")
+
+            while rng.random() < noise/(1 + noise):  # Geometric number of noise lines, of mean `noise`
+                out_file.write("DEBUG " + " ".join(word for word, _ in random_line(rng, numeric)) + "\n")
+            if line_num == missing:
+                out_file.write("DEBUG missing verified line\n")
+            elif rng.random() < SHIFTED:
+                out_file.write(" ".join(word if number is None else random_number(rng, number)[0] for word, number in line) + "\n")
+            else:
+                out_file.write(" ".join(word for word, _ in line) + "\n")
+
+
+def peak_rss():
+    """Peak resident memory of the process, in bytes.
+
+    Read from /proc where available: unlike `ru_maxrss`, it does not carry over the memory of the
+    parent process across `exec`.
+    """
+    try:
+        with open('/proc/self/status') as status:
+            for line in status:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])*1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss*1024  # Kilobytes on Linux, bytes on macOS
+
+
+def run_engine(engine, out_path, verified_path, print_matches=False, profile_path=None):
+    """Compares a pair of files, in a process of its own.
+
+    RETURNS
+    -------
+        The verdict, the seconds taken, and the peak resident memory in bytes before and after.
+    """
+    rss_before = peak_rss()
+    profiler = cProfile.Profile() if profile_path else None
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):  # Matched lines, and what the engines print
+        start = time.perf_counter()
+        if profiler is not None:
+            profiler.enable()
+        matches = file_comparer.compare_files(out_path, verified_path, on_match=print if print_matches else None, engine=engine)
+        if profiler is not None:
+            profiler.disable()
+        seconds = time.perf_counter() - start
+    if profiler is not None:
+        profiler.dump_stats(profile_path)
+
+    return matches, seconds, rss_before, peak_rss()
+
+
+def measure(engine, out_path, verified_path, repeat=1, print_matches=False, profile_path=None):
+    """Best time and largest peak memory of `repeat` runs, each in a fresh interpreter."""
+    context = multiprocessing.get_context('spawn')  # Nothing inherited from the benchmark process
+    best = None
+    for k in range(repeat):
+        with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+            matches, seconds, rss_before, rss = executor.submit(
+                run_engine, engine, out_path, verified_path, print_matches, profile_path if k == 0 else None).result()
+        if best is None:
+            best = [matches, seconds, rss_before, rss]
+        else:
+            best[1] = min(best[1], seconds)
+            best[3] = max(best[3], rss)
+
+    return best
+
+
+def line_count(path):
+    with open(path, 'rb') as file:
+        return sum(1 for _ in file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, nargs='+', default=[100000], help="Numbers of verified lines (default: 100000)")
+    parser.add_argument("--noise", type=float, nargs='+', default=[0.3], help="Noise lines per verified line (default: 0.3)")
+    parser.add_argument("--numeric", type=float, nargs='+', default=[0.4], help="Fractions of numeric words (default: 0.4)")
+    parser.add_argument("--mismatch-at", type=float, nargs='+', default=[None],
+                        help="Positions, from 0 to 1, of a verified line missing from the output (default: none missing)")
+    parser.add_argument("--engines", nargs='+', choices=sorted(file_comparer.ENGINES), default=list(file_comparer.ENGINES),
+                        help="Engines compared (default: all)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per measurement, the best time is kept (default: 1)")
+    parser.add_argument("--print-matches", action='store_true', help="Print the matched lines, as the command line does, to /dev/null")
+    parser.add_argument("--profile", metavar="DIR", help="Write a cProfile dump of the first run of every measurement to DIR. Its time includes the profiling overhead")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+
+    print(f"{'lines':>9} {'noise':>6} {'numeric':>7} {'mismatch':>8} {'engine':>9} {'verdict':>8} {'seconds':>8} "
+          f"{'lines/s':>10} {'MB/s':>7} {'peak RSS':>9} {'growth':>8}")
+    with tempfile.TemporaryDirectory() as directory:
+        verified_path, out_path = os.path.join(directory, "verified.txt"), os.path.join(directory, "output.txt")
+        for lines, noise, numeric, mismatch_at in itertools.product(args.lines, args.noise, args.numeric, args.mismatch_at):
+            write_pair(verified_path, out_path, lines, noise, numeric, mismatch_at, args.seed)
+            total_lines = line_count(verified_path) + line_count(out_path)
+            total_bytes = os.path.getsize(verified_path) + os.path.getsize(out_path)
+            if 'golden' in args.engines:
+                file_comparer.compile_golden(verified_path)  # Measured warm, as on repeated runs
+
+            for engine in args.engines:
+                profile_path = None
+                if args.profile:
+                    profile_path = os.path.join(args.profile, f"{engine}_{lines}_{noise}_{numeric}_{mismatch_at}.prof")
+                matches, seconds, rss_before, rss = measure(engine, out_path, verified_path, args.repeat, args.print_matches, profile_path)
+                mismatch = "-" if mismatch_at is None else f"{mismatch_at:g}"
+                print(f"{lines:>9} {noise:>6g} {numeric:>7g} {mismatch:>8} {engine:>9} {'match' if matches else 'differ':>8} {seconds:>8.3f} "
+                      f"{total_lines/seconds:>10.0f} {total_bytes/seconds/1e6:>7.1f} {rss/1e6:>7.1f}MB {(rss - rss_before)/1e6:>6.1f}MB", flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,293 @@
+"""
+Unit tests for file_comparer.py module
+"""
+
+__author__ = "Abhijit Kale"
+
+import contextlib
+import io
+import os
+import pickle
+import random
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from .context import file_comparer
+from file_comparer import (ENGINES, GOLDEN_SUFFIX, NUMBER, RACY_NS, compare_files, compare_many, compile_golden, decode_golden,
+                           directory_pairs, encode_golden, follow_compare, follow_lines, load_golden, save_golden, stream_compare)
+
+# (verified lines, output lines, expected verdict)
+CASES = [
+    (["a 1", "b 2"], ["a 1", "noise", "b 2"], True),
+    (["a 1", "b 2"], ["b 2", "a 1"], False),
+    (["val 1,000 x"], ["val 1000 x"], True),
+    (["val 1e3"], ["val 1000.0"], True),
+    (["val 1E+3"], ["val 1,00,0"], True),
+    (["val 1_0"], ["val 10"], True),
+    (["val 10"], ["val 15"], True),  # Exactly at the tolerance
+    (["val 10"], ["val 15.01"], False),
+    (["val -1.5e-3"], ["val 4.9"], True),
+    (["val inf"], ["val Infinity"], True),
+    (["val inf"], ["val 1e308"], False),
+    (["val nan"], ["val nan"], False),  # NaN never matches
+    (["val n,an"], ["val n,an"], False),
+    (["val nan,"], ["val nan,"], False),
+    (["val NaN x"], ["val NaN x"], False),
+    (["val 1"], ["val one"], False),
+    (["a b c"], ["a b"], True),  # Only the words in common are compared
+    (["a b"], ["a b c d"], True),
+    (["a 1 c"], ["a 2 d"], False),
+    (["1,"], ["1"], True),
+    ([","], [","], True),
+    (["a ."], ["a ."], True),
+    (["x 1."], ["x .1"], True),
+    (["été 1"], ["été 3"], True),  # Not ASCII, compared as text by the bytes engine
+    (["a\x1fb"], ["a b"], True),  # Separator only for `str.split`
+    ([], ["anything"], True),
+    (["a"], [], False),
+]
+
+
+def write(path, lines, newline="\n"):
+    with open(path, 'w', newline='') as file:
+        file.write("".join(line + newline for line in lines))
+
+
+def run_compare(out_path, verified_path, **options):
+    """Verdict and matched output lines of `compare_files`."""
+    matched = []
+    with contextlib.redirect_stdout(io.StringIO()):  # The stream engine prints the mismatching words.
+        matches = compare_files(out_path, verified_path, on_match=matched.append, **options)
+    return matches, matched
+
+
+class TestEngines(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.verified = os.path.join(self.directory.name, "verified")
+        self.output = os.path.join(self.directory.name, "output")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assertEnginesAgree(self, ver_lines, out_lines, expected=None, newline="\n"):
+        write(self.verified, ver_lines, newline)
+        write(self.output, out_lines, newline)
+        results = {engine: run_compare(self.output, self.verified, engine=engine) for engine in ENGINES}
+        reference = results['stream']
+        for engine, result in results.items():
+            self.assertEqual(result, reference, f"{engine} on {ver_lines} / {out_lines}")
+        if expected is not None:
+            self.assertEqual(reference[0], expected, f"{ver_lines} / {out_lines}")
+
+    def test_cases(self):
+        for ver_lines, out_lines, expected in CASES:
+            with self.subTest(verified=ver_lines, output=out_lines):
+                self.assertEnginesAgree(ver_lines, out_lines, expected)
+
+    def test_line_endings(self):
+        ver_lines, out_lines = ["a 1", "", "b 2"], ["a 3", "  ", "c", "b 2.5"]
+        for newline in ("\n", "\r\n", " \n", "\r"):
+            with self.subTest(newline=repr(newline)):
+                self.assertEnginesAgree(ver_lines, out_lines, True, newline)
+
+    def test_random(self):
+        rng = random.Random(0)
+        words = ["a", "b", "1", "2", "3.5", "1,000", "1000", "nan", "n,an", "inf", "-inf", "8", "0", "1e2", "abc,", "1_0", "20"]
+        def line():
+            return " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+
+        for _ in range(300):
+            out_lines = [line() for _ in range(rng.randint(0, 10))]
+            ver_lines = [rng.choice(out_lines) if out_lines and rng.random() < 0.6 else line() for _ in range(rng.randint(0, 5))]
+            self.assertEnginesAgree(ver_lines, out_lines)
+
+    def test_number_regex(self):
+        rng = random.Random(1)
+        alphabet = "0123456789_.eE+-,naiNfIty"
+        for _ in range(20000):
+            word = "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 6)))
+            is_num, _ = file_comparer.check_if_num(word)
+            self.assertEqual(bool(NUMBER.fullmatch(word.replace(',', '').encode())), is_num, word)
+
+
+class TestStream(unittest.TestCase):
+    def test_single_pass(self):
+        read = []
+        def out_lines():
+            for k in range(10**9):  # Never exhausted
+                read.append(k)
+                yield f"line{k}"
+
+        matched = []
+        self.assertTrue(stream_compare(iter(["line1", "line3"]), out_lines(), on_match=matched.append))
+        self.assertEqual(matched, [1, 3])
+        self.assertEqual(read, [0, 1, 2, 3])  # Nothing read past the last verified line
+
+
+class TestGolden(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.verified = os.path.join(self.directory.name, "verified")
+        self.output = os.path.join(self.directory.name, "output")
+        write(self.verified, ["a 1", "b nan", "c 1,000 x"])
+        write(self.output, ["a 1", "c 1000 x"])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def age(self, seconds=5):
+        """Moves the modification time of the verified file back, out of the racy window."""
+        stat = os.stat(self.verified)
+        os.utime(self.verified, ns=(stat.st_atime_ns, stat.st_mtime_ns - seconds*10**9))
+
+    def test_round_trip(self):
+        golden = compile_golden(self.verified, save=False)
+        decoded = decode_golden(encode_golden(golden))
+        self.assertEqual([(line, key) for line, key, _ in decoded['lines']], [(line, key) for line, key, _ in golden['lines']])
+        self.assertEqual(repr([nums for _, _, nums in decoded['lines']]), repr([nums for _, _, nums in golden['lines']]))
+        self.assertEqual({k: v for k, v in decoded.items() if k != 'lines'}, {k: v for k, v in golden.items() if k != 'lines'})
+
+    def test_up_to_date(self):
+        self.age()
+        compile_golden(self.verified)
+        with mock.patch.object(file_comparer, 'compile_golden') as compile_, mock.patch.object(file_comparer, 'file_hash') as file_hash:
+            load_golden(self.verified)
+        compile_.assert_not_called()
+        file_hash.assert_not_called()
+
+    def test_modified(self):
+        write(self.verified, ["a 1", "c 1,000 x"])
+        self.age()
+        compile_golden(self.verified)
+        self.assertEqual(run_compare(self.output, self.verified, engine='golden'), (True, [0, 1]))
+        write(self.verified, ["a 1", "d 1,000 x"])  # Same size, within the resolution of timestamps
+        self.assertEqual(run_compare(self.output, self.verified, engine='golden'), (False, [0]))
+        write(self.verified, ["a 1", "c 1,000 x"])
+        self.assertEqual(run_compare(self.output, self.verified, engine='golden'), (True, [0, 1]))
+
+    def test_touched(self):
+        self.age(10)
+        compile_golden(self.verified)
+        self.age()
+        with mock.patch.object(file_comparer, 'compile_golden') as compile_:
+            golden = load_golden(self.verified)
+        compile_.assert_not_called()
+        self.assertEqual(golden['mtime_ns'], os.stat(self.verified).st_mtime_ns)
+        self.assertGreater(golden['compiled_ns'] - golden['mtime_ns'], RACY_NS)
+
+    def test_corrupt(self):
+        self.age()
+        compile_golden(self.verified)
+        with open(self.verified + GOLDEN_SUFFIX, 'rb') as golden_file:
+            good = golden_file.read()
+        for data in (b"", b"garbage", good[:60], good[:-3], pickle.dumps({'version': 1})):  # Last, of the former pickle format
+            with open(self.verified + GOLDEN_SUFFIX, 'wb') as golden_file:
+                golden_file.write(data)
+            self.assertEqual(run_compare(self.output, self.verified, engine='golden'), run_compare(self.output, self.verified))
+            with mock.patch.object(file_comparer, 'compile_golden') as compile_:
+                load_golden(self.verified)
+            compile_.assert_not_called()  # Compiled again, and saved
+
+    def test_tolerance(self):
+        compile_golden(self.verified, abs_tol=1.0)
+        self.assertEqual(load_golden(self.verified)['abs_tol'], 5.0)
+
+    def test_concurrent_saves(self):
+        golden = compile_golden(self.verified, save=False)
+        threads = [threading.Thread(target=save_golden, args=(self.verified, golden)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["output", "verified", "verified" + GOLDEN_SUFFIX])
+        with open(self.verified + GOLDEN_SUFFIX, 'rb') as golden_file:
+            self.assertEqual(golden_file.read(), encode_golden(golden))
+
+    def test_failed_save(self):
+        with mock.patch.object(file_comparer.os, 'replace', side_effect=OSError):
+            compile_golden(self.verified)
+        self.assertEqual(sorted(os.listdir(self.directory.name)), ["output", "verified"])  # No temporary file left
+
+
+class TestFollow(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.verified = os.path.join(self.directory.name, "verified")
+        self.output = os.path.join(self.directory.name, "output")
+        write(self.verified, ["a 1", "b 2", "c 3"])
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_stream_ends(self):
+        self.assertEqual(list(follow_lines(io.StringIO("a\nb"), growing=False)), ["a\n", "b"])
+        self.assertEqual(list(follow_lines(io.StringIO("a\nEND\nb\n"), growing=False, sentinel="END")), ["a\n"])
+
+    def test_redirected_stdin(self):
+        write(self.output, ["a 1", "c 3"])
+        with open(self.output) as stdin, mock.patch.object(file_comparer.sys, 'stdin', stdin):
+            self.assertTrue(stdin.seekable())
+            self.assertFalse(follow_compare('-', self.verified, engine='skeleton', poll_interval=0.01))
+
+    def test_partial_lines(self):
+        def writer():
+            with open(self.output, 'w') as file:
+                for part in ("a ", "1\nb", " 2\n", "c 3", "\n"):
+                    file.write(part)
+                    file.flush()
+                    time.sleep(0.05)
+
+        matched = []
+        thread = threading.Thread(target=writer)
+        thread.start()
+        try:
+            self.assertTrue(follow_compare(self.output, self.verified, on_match=matched.append, timeout=5, engine='skeleton', poll_interval=0.01))
+        finally:
+            thread.join()
+        self.assertEqual(matched, [0, 1, 2])
+
+    def test_timeout(self):
+        write(self.output, ["a 1", "b 2", "d"])
+        start = time.monotonic()
+        self.assertFalse(follow_compare(self.output, self.verified, timeout=0.2, engine='skeleton', poll_interval=0.01))
+        self.assertLess(time.monotonic() - start, 5)
+
+    def test_sentinel(self):
+        write(self.output, ["a 1", "END", "b 2", "c 3"])
+        self.assertFalse(follow_compare(self.output, self.verified, sentinel="END", timeout=5, engine='skeleton', poll_interval=0.01))
+
+
+class TestDirectory(unittest.TestCase):
+    def test_compare_many(self):
+        with tempfile.TemporaryDirectory() as directory:
+            verified_dir, out_dir = os.path.join(directory, "verified"), os.path.join(directory, "output")
+            os.makedirs(verified_dir)
+            os.makedirs(out_dir)
+            for name, out_lines in (("match", ["a 1", "b 2"]), ("differ", ["a 1", "c"]), ("binary", None), ("missing", None)):
+                write(os.path.join(verified_dir, name), ["a 1", "", "b 2"])
+                if out_lines is not None:
+                    write(os.path.join(out_dir, name), out_lines)
+            with open(os.path.join(out_dir, "binary"), 'wb') as file:
+                file.write(b"\xff\xfe a 1\n")
+            compile_golden(os.path.join(verified_dir, "match"))
+            for leftover in ("match.golden.tmp", "match.golden.k2x9_0bq.tmp"):  # Saves interrupted by older and current versions
+                write(os.path.join(verified_dir, leftover), ["a 1"])
+
+            pairs = directory_pairs(out_dir, verified_dir)
+            self.assertEqual([os.path.basename(verified) for _, verified in pairs], ["binary", "differ", "match", "missing"])
+            summary = compare_many(pairs, workers=2)
+            results = {os.path.basename(result['verified']): result for result in summary['results']}
+            self.assertFalse(summary['match'])
+            self.assertEqual(summary['mismatched'], 3)
+            self.assertTrue(results['match']['match'])
+            self.assertEqual(results['differ']['first_mismatch'], 3)
+            self.assertIn("decode", results['binary']['error'])
+            self.assertIsNotNone(results['missing']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()